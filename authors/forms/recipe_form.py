@@ -3,6 +3,7 @@ from collections import defaultdict
 from django import forms
 from django.forms import ValidationError
 
+from recipes.jobs import enqueue_cover_job
 from recipes.models import Recipe
 from utils.django_forms import add_attr
 from utils.strings import is_positive_number
@@ -45,6 +46,21 @@ class AuthorRecipeForm(forms.ModelForm):
             ),
         }
 
+    def save(self, commit=True):
+        recipe = super().save(commit=commit)
+
+        if commit:
+            self.enqueue_cover_processing()
+
+        return recipe
+
+    def enqueue_cover_processing(self):
+        # Call it after saving the recipe when using commit=False, the
+        # uploaded cover is only written to the storage then. The cover is
+        # processed by the process_cover_jobs command (recipes.jobs).
+        if "cover" in self.changed_data and self.instance.cover:
+            enqueue_cover_job(self.instance)
+
     def clean(self, *args, **kwargs):
         # sourcery skip: inline-immediately-returned-variable
         super_clean = super().clean(*args, **kwargs)
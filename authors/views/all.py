@@ -94,9 +94,11 @@ def logout_view(request):
 
 @login_required(login_url="authors:login", redirect_field_name="next")
 def dashboard(request):
-    recipes = Recipe.objects.filter(
-        is_published=False, author=request.user
-    ).order_by("-id")
+    recipes = (
+        Recipe.objects.filter(is_published=False, author=request.user)
+        .for_list()
+        .order_by("-id")
+    )
 
     return render(
         request,
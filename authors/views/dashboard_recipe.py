@@ -74,6 +74,7 @@ class DashboardRecipe(View):
             recipe.is_published = False
 
             recipe.save()
+            form.enqueue_cover_processing()
 
             messages.success(request, "Sua receita foi salva com sucesso!")
 
@@ -6,4 +6,7 @@ from dotenv import load_dotenv
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
 load_dotenv()
+# Serve the recipe pages with the async views (recipes.async_views), which
+# run on the event loop instead of a thread per request
+os.environ.setdefault("RECIPES_ASYNC_VIEWS", "1")
 application = get_asgi_application()
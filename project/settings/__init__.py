@@ -0,0 +1,9 @@
+# DJANGO_SETTINGS_MODULE=project.settings loads dev.py when DEBUG=1 and
+# prod.py otherwise. Point it to project.settings.dev or
+# project.settings.prod to pick one explicitly.
+import os
+
+if os.environ.get("DEBUG") == "1":
+    from project.settings.dev import *  # noqa: F401, F403
+else:
+    from project.settings.prod import *  # noqa: F401, F403
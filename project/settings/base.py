@@ -0,0 +1,304 @@
+# sourcery skip: boolean-if-exp-identity, remove-unnecessary-cast
+import os
+from pathlib import Path
+
+from django.contrib.messages import constants
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get("SECRET_KEY", "INSECURE")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# Set by dev.py and prod.py (see project/settings/__init__.py)
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "recipes",
+    "authors",
+]
+
+MIDDLEWARE = [
+    "utils.middleware.ServerTimingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "utils.staticfiles.StaticFilesMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "project.urls"
+
+# Read from disk on every render, prod.py wraps them in the cached loader
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [
+            BASE_DIR / "base_templates",
+        ],
+        "OPTIONS": {
+            "loaders": TEMPLATE_LOADERS,
+            "libraries": {
+                "static_bundles": "utils.staticfiles",
+            },
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "project.wsgi.application"
+
+# Compile every project template when the app starts (utils.templates), so
+# the first requests do not pay for it. The warm_templates command reports
+# the compile time of each template.
+TEMPLATES_WARM_ON_STARTUP = (
+    os.environ.get("TEMPLATES_WARM_ON_STARTUP", "0") == "1"
+)
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": os.environ.get("DATABASE_ENGINE"),
+        "NAME": os.environ.get("DATABASE_NAME"),
+        "USER": os.environ.get("DATABASE_USER"),
+        "PASSWORD": os.environ.get("DATABASE_PASSWORD"),
+        "HOST": os.environ.get("DATABASE_HOST"),
+        "PORT": os.environ.get("DATABASE_PORT"),
+        # Keep connections open between requests (seconds, 0 closes them at
+        # the end of every request) and check them before reusing
+        "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DATABASE_CONN_HEALTH_CHECKS", "1") == "1"
+        ),
+    }
+}
+
+# PostgreSQL connection pool (psycopg[pool]), shared by the threads of each
+# process. Django does not allow it together with persistent connections.
+if os.environ.get("DATABASE_POOL") == "1":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        },
+    }
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Use a shared backend (e.g. Redis or Memcached) in production so
+# invalidations reach every worker process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds a paginator COUNT(*) stays cached (utils.pagination)
+COUNT_CACHE_TIMEOUT = int(os.environ.get("COUNT_CACHE_TIMEOUT", 300))
+
+# PostgreSQL only: above this many estimated rows, use the planner estimate
+# instead of COUNT(*) for listings that allow it
+COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get("COUNT_ESTIMATE_THRESHOLD", 100_000)
+)
+
+# Serve the read-only recipe pages with recipes.async_views instead of
+# recipes.views (project/asgi.py turns it on unless set)
+RECIPES_ASYNC_VIEWS = os.environ.get("RECIPES_ASYNC_VIEWS", "0") == "1"
+
+# Full-page cache of the public recipe pages for anonymous users
+# (utils.cache.AnonymousPageCacheMixin)
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") == "1"
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 600))
+
+# Rendered recipe cards (recipes/templatetags/recipe_tags.py): an LRU of
+# RECIPE_CARD_CACHE_SIZE cards per process in front of the shared cache
+RECIPE_CARD_CACHE_ENABLED = (
+    os.environ.get("RECIPE_CARD_CACHE_ENABLED", "1") == "1"
+)
+RECIPE_CARD_CACHE_SIZE = int(os.environ.get("RECIPE_CARD_CACHE_SIZE", 1000))
+RECIPE_CARD_CACHE_TIMEOUT = int(
+    os.environ.get("RECIPE_CARD_CACHE_TIMEOUT", 86400)
+)
+
+# Slug -> id of the recipe detail URLs (recipes.slugs): an LRU of
+# RECIPE_SLUG_CACHE_SIZE slugs per process in front of the shared cache
+RECIPE_SLUG_CACHE_ENABLED = (
+    os.environ.get("RECIPE_SLUG_CACHE_ENABLED", "1") == "1"
+)
+RECIPE_SLUG_CACHE_SIZE = int(os.environ.get("RECIPE_SLUG_CACHE_SIZE", 10000))
+RECIPE_SLUG_CACHE_TIMEOUT = int(
+    os.environ.get("RECIPE_SLUG_CACHE_TIMEOUT", 86400)
+)
+
+# Sitemaps (recipes.sitemaps) of RECIPE_SITEMAP_CHUNK_SIZE recipe ids each
+# (at most 50000 URLs per sitemap) and feeds (recipes.feeds) of the
+# RECIPE_FEED_SIZE newest recipes. Both are cached for
+# RECIPE_SITEMAP_CACHE_TIMEOUT seconds under keys that change with them.
+RECIPE_SITEMAP_CHUNK_SIZE = int(
+    os.environ.get("RECIPE_SITEMAP_CHUNK_SIZE", 10000)
+)
+RECIPE_FEED_SIZE = int(os.environ.get("RECIPE_FEED_SIZE", 50))
+RECIPE_SITEMAP_CACHE_TIMEOUT = int(
+    os.environ.get("RECIPE_SITEMAP_CACHE_TIMEOUT", 86400)
+)
+
+# Quality (1-95) of the resized WebP/JPEG cover variants (recipes.images)
+RECIPE_COVER_QUALITY = int(os.environ.get("RECIPE_COVER_QUALITY", 80))
+
+# Uploaded covers are processed in the background by the process_cover_jobs
+# command (recipes.jobs): re-encoded without metadata, limited to
+# RECIPE_COVER_MAX_SIZE pixels and thumbnailed. Failed jobs are retried
+# RECIPE_COVER_JOB_MAX_ATTEMPTS times, waiting RECIPE_COVER_JOB_RETRY_DELAY
+# seconds doubled at each attempt. Running jobs not finished after
+# RECIPE_COVER_JOB_TIMEOUT seconds (crashed worker) are run again.
+RECIPE_COVER_MAX_SIZE = int(os.environ.get("RECIPE_COVER_MAX_SIZE", 2048))
+RECIPE_COVER_JOB_MAX_ATTEMPTS = int(
+    os.environ.get("RECIPE_COVER_JOB_MAX_ATTEMPTS", 3)
+)
+RECIPE_COVER_JOB_RETRY_DELAY = int(
+    os.environ.get("RECIPE_COVER_JOB_RETRY_DELAY", 30)
+)
+RECIPE_COVER_JOB_TIMEOUT = int(os.environ.get("RECIPE_COVER_JOB_TIMEOUT", 600))
+
+# Dotted path of the recipes search engine (recipes.search). Empty uses
+# PostgreSQL full-text search or SQLite FTS5 depending on the database.
+RECIPES_SEARCH_ENGINE = os.environ.get("RECIPES_SEARCH_ENGINE", "")
+
+# File written by rebuild_search_index for
+# recipes.search.inverted_index.InvertedIndexSearchEngine
+RECIPES_SEARCH_INDEX_PATH = os.environ.get(
+    "RECIPES_SEARCH_INDEX_PATH", BASE_DIR / "search_index.bin"
+)
+
+AUTH_USER_MODEL = "auth.User"  # pylint:disable=E5141
+
+# Server-Timing header and a JSON log line (logger utils.middleware) with
+# the queries, template, cache and total time of every request. Requests
+# over the thresholds are logged as warnings.
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "0") == "1"
+SERVER_TIMING_MAX_QUERIES = int(
+    os.environ.get("SERVER_TIMING_MAX_QUERIES", 10)
+)
+SERVER_TIMING_MAX_MS = int(os.environ.get("SERVER_TIMING_MAX_MS", 500))
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",  # noqa:E501
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",  # noqa:E501
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",  # noqa:E501
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",  # noqa:E501
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = "pt-br"
+
+TIME_ZONE = "America/Sao_Paulo"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = "static/"
+STATICFILES_DIRS = [
+    BASE_DIR / "base_static",
+]
+STATIC_ROOT = BASE_DIR / "static"
+
+# prod.py switches staticfiles to content-hashed names, the bundles below
+# and .gz/.br variants of every file (utils.staticfiles)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Bundle name -> files concatenated (and minified for CSS) into it, linked
+# with {% stylesheet_bundle %} (the sources themselves while not collected)
+STATIC_BUNDLES = {
+    "global/css/bundle.css": [
+        "global/css/styles.css",
+        "global/css/global-style.css",
+    ],
+}
+
+# Serve STATIC_ROOT from the application (utils.staticfiles
+# .StaticFilesMiddleware, on by default in prod.py). Hashed names are cached
+# for a year, the others STATIC_MAX_AGE seconds.
+STATIC_SERVE = os.environ.get("STATIC_SERVE", "0") == "1"
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", 3600))
+
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+MESSAGE_TAGS = {
+    constants.DEBUG: "message-debug",
+    constants.ERROR: "message-error",
+    constants.INFO: "message-info",
+    constants.SUCCESS: "message-success",
+    constants.WARNING: "message-warning",
+}
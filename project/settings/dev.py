@@ -0,0 +1,28 @@
+# Development: livereload, django_extensions and templates read from disk.
+# Nothing here is loaded in production.
+import os
+
+from project.settings.base import *  # noqa: F401, F403
+from project.settings.base import INSTALLED_APPS, MIDDLEWARE
+from utils.middleware import add_timing_probes
+
+DEBUG = True
+
+INSTALLED_APPS = [
+    *INSTALLED_APPS,
+    "livereload",
+    "django_extensions",
+]
+
+MIDDLEWARE = [
+    *MIDDLEWARE,
+    "livereload.middleware.LiveReloadScript",
+]
+
+SHELL_PLUS = "ptpython"
+
+# Log the time spent in each middleware for every request
+# (utils.middleware). The middleware_report command measures it in any
+# environment.
+if os.environ.get("MIDDLEWARE_TIMING") == "1":
+    MIDDLEWARE = add_timing_probes(MIDDLEWARE)
@@ -0,0 +1,29 @@
+# Production: compiled templates kept in memory and hashed, precompressed
+# static files served by the application.
+import os
+
+from project.settings.base import *  # noqa: F401, F403
+from project.settings.base import STORAGES, TEMPLATE_LOADERS, TEMPLATES
+
+DEBUG = False
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                ("django.template.loaders.cached.Loader", TEMPLATE_LOADERS),
+            ],
+        },
+    },
+]
+
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {
+        "BACKEND": "utils.staticfiles.CompressedManifestStaticFilesStorage",
+    },
+}
+
+STATIC_SERVE = os.environ.get("STATIC_SERVE", "1") == "1"
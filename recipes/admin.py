@@ -6,7 +6,7 @@ from .models import Category, Recipe
 
 
 class CategoryAdmin(admin.ModelAdmin):
-    pass
+    list_display = ["name", "published_count"]
 
 
 @admin.register(Recipe)
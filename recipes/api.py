@@ -0,0 +1,276 @@
+"""JSON read API of the published recipes (list, category, search, detail).
+
+Rows are read with values() and serialized as dicts, never as model
+instances. Lists are paginated with an opaque ?cursor= and return the
+URL of the next page; ?fields= selects the fields of each recipe.
+
+Every response has a strong ETag computed from the id, updated_at,
+category name and author username of the recipes it shows (ETAG_LOOKUPS):
+the same on every worker and across restarts for the same body. A
+request whose If-None-Match matches gets a 304 after querying those
+columns only, without reading or serializing the recipes.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from recipes.models import Category, Recipe
+from recipes.search import get_search_engine
+from recipes.search.base import IdListResults
+from utils.pagination import decode_cursor, encode_cursor
+
+# Public name of each field -> values() lookup
+API_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "slug": "slug",
+    "preparation_time": "preparation_time",
+    "preparation_time_unit": "preparation_time_unit",
+    "servings": "servings",
+    "servings_unit": "servings_unit",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "cover": "cover",
+    "category_id": "category_id",
+    "category": "category__name",
+    "author": "author__username",
+    "preparation_steps": "preparation_steps",
+    "preparation_steps_is_html": "preparation_steps_is_html",
+}
+LIST_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "slug",
+    "preparation_time",
+    "preparation_time_unit",
+    "servings",
+    "servings_unit",
+    "created_at",
+    "updated_at",
+    "cover",
+    "category_id",
+    "category",
+    "author",
+)
+DETAIL_FIELDS = (
+    *LIST_FIELDS,
+    "preparation_steps",
+    "preparation_steps_is_html",
+)
+
+# values() lookups of a recipe that change its serialized values: edits
+# bump updated_at, but renaming its category or author does not
+ETAG_LOOKUPS = ("id", "updated_at", "category__name", "author__username")
+
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+
+cover_storage = Recipe._meta.get_field("cover").storage
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fields(request, default):
+    value = request.GET.get("fields", "").strip()
+    if not value:
+        return default
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",")))
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}.")
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get("limit", API_DEFAULT_LIMIT))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise ApiError(f"limit must be between 1 and {API_MAX_LIMIT}.")
+    return limit
+
+
+def parse_cursor(request):
+    token = request.GET.get("cursor")
+    cursor = decode_cursor(token)
+    if token and cursor is None:
+        raise ApiError("Invalid cursor.")
+    return cursor
+
+
+def make_etag(fields, keys):
+    """Strong ETag of the recipes with these keys (ETAG_LOOKUPS values)
+    shown with these fields."""
+    signature = json.dumps([fields, keys], cls=DjangoJSONEncoder)
+    return f'"{hashlib.md5(signature.encode("utf-8")).hexdigest()}"'
+
+
+def get_rows(queryset, ids, fields):
+    """values() of the recipes of queryset with these ids, in the same
+    order."""
+    lookups = {API_FIELDS[field] for field in fields} | {"id"}
+    rows = {
+        row["id"]: row for row in queryset.filter(pk__in=ids).values(*lookups)
+    }
+    return [serialize(rows[pk], fields) for pk in ids if pk in rows]
+
+
+def serialize(row, fields):
+    recipe = {field: row[API_FIELDS[field]] for field in fields}
+    if "cover" in recipe:
+        cover = recipe["cover"]
+        recipe["cover"] = cover_storage.url(cover) if cover else None
+    return recipe
+
+
+def set_validators(response, etag):
+    response.headers["ETag"] = etag
+    # Clients keep the response but revalidate it before every use
+    response.headers["Cache-Control"] = "max-age=0, must-revalidate"
+    return response
+
+
+def get_not_modified_response(request, etag):
+    response = get_conditional_response(request, etag=etag)
+    return None if response is None else set_validators(response, etag)
+
+
+def json_response(data, etag):
+    response = JsonResponse(data, json_dumps_params={"separators": (",", ":")})
+    return set_validators(response, etag)
+
+
+class RecipeApiView(View):
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse(
+                {"error": error.message}, status=error.status
+            )
+
+    def get_queryset(self):
+        return Recipe.objects.published()
+
+
+class RecipeListApi(RecipeApiView):
+    """Published recipes, newest first. The cursor is the last id seen,
+    so a page costs the same however deep it is."""
+
+    def get_page_keys(self, queryset, cursor, limit):
+        queryset = queryset.order_by("-id")
+        if cursor is not None:
+            queryset = queryset.filter(pk__lt=cursor)
+
+        keys = list(queryset.values_list(*ETAG_LOOKUPS)[: limit + 1])
+        next_cursor = keys[limit - 1][0] if len(keys) > limit else None
+        return keys[:limit], next_cursor
+
+    def get(self, request, *args, **kwargs):
+        fields = parse_fields(request, LIST_FIELDS)
+        limit = parse_limit(request)
+        queryset = self.get_queryset()
+        keys, next_cursor = self.get_page_keys(
+            queryset, parse_cursor(request), limit
+        )
+
+        etag = make_etag(fields, keys)
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        ids = [key[0] for key in keys]
+        return json_response(
+            {
+                "results": get_rows(queryset, ids, fields),
+                "next": self.get_next_url(request, next_cursor),
+            },
+            etag,
+        )
+
+    def get_next_url(self, request, next_cursor):
+        if next_cursor is None:
+            return None
+
+        query = request.GET.copy()
+        query["cursor"] = encode_cursor(next_cursor)
+        return f"{request.path}?{query.urlencode()}"
+
+
+class RecipeCategoryApi(RecipeListApi):
+    def get_queryset(self):
+        category_id = self.kwargs.get("category_id")
+        if not Category.objects.filter(
+            published_count__gt=0, pk=category_id
+        ).exists():
+            raise ApiError("Category not found.", status=404)
+
+        return super().get_queryset().filter(category_id=category_id)
+
+
+class RecipeSearchApi(RecipeListApi):
+    """Search results by relevance. The cursor is the offset of the next
+    page, as the ranking has no key to continue from."""
+
+    def get_page_keys(self, queryset, cursor, limit):
+        search_term = self.request.GET.get("q", "").strip()
+        if not search_term:
+            raise ApiError("Missing the search term (q).")
+
+        results = get_search_engine().search(queryset, search_term)
+        offset = cursor or 0
+
+        if isinstance(results, IdListResults):
+            # Resolved outside the database: only the page is queried,
+            # through the queryset that drops the ids of recipes the index
+            # still holds but that are no longer published
+            ids = results.ids[offset : offset + limit + 1]
+            rows = {
+                key[0]: key
+                for key in results.queryset.filter(
+                    pk__in=ids[:limit]
+                ).values_list(*ETAG_LOOKUPS)
+            }
+            keys = [rows[pk] for pk in ids[:limit] if pk in rows]
+            has_next = len(ids) > limit
+        else:
+            keys = list(
+                results.values_list(*ETAG_LOOKUPS)[offset : offset + limit + 1]
+            )
+            has_next = len(keys) > limit
+
+        next_cursor = offset + limit if has_next else None
+        return keys[:limit], next_cursor
+
+
+class RecipeDetailApi(RecipeApiView):
+    def get(self, request, *args, **kwargs):
+        fields = parse_fields(request, DETAIL_FIELDS)
+        queryset = self.get_queryset().filter(pk=self.kwargs.get("pk"))
+        key = queryset.values_list(*ETAG_LOOKUPS).first()
+        if key is None:
+            raise ApiError("Recipe not found.", status=404)
+
+        etag = make_etag(fields, [key])
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        rows = get_rows(queryset, [self.kwargs.get("pk")], fields)
+        if not rows:
+            raise ApiError("Recipe not found.", status=404)
+        return json_response(rows[0], etag)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RecipesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipes"
+
+    def ready(self):
+        from recipes import signals  # noqa: F401
+
+        if settings.TEMPLATES_WARM_ON_STARTUP:
+            from utils.templates import log_template_warmup
+
+            log_template_warmup()
@@ -0,0 +1,181 @@
+"""Async versions of the read-only views of recipes.views.
+
+Served instead of them when RECIPES_ASYNC_VIEWS is on (the default under
+project.asgi), so that ASGI requests run on the event loop instead of a
+thread. They use the async ORM and cache APIs and the same templates,
+pagination and page cache. Class names match recipes.views, which lets
+recipes.urls swap the modules.
+"""
+
+from django.http.response import Http404, HttpResponsePermanentRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.views import View
+
+from recipes.cache import (
+    CATEGORIES_TAG,
+    RECIPES_TAG,
+    category_tag,
+    recipe_count_provider,
+    recipe_tag,
+)
+from recipes.models import Category, Recipe
+from recipes.search import get_search_engine
+from recipes.slugs import aforget_recipe_slug, aresolve_recipe_slug
+from recipes.views import PER_PAGE
+from utils.cache import AsyncAnonymousPageCacheMixin
+from utils.pagination import (
+    PAGINATION_NUMBERED,
+    KnownCountProvider,
+    amake_pagination,
+)
+
+
+class RecipeListViewBase(AsyncAnonymousPageCacheMixin, View):
+    template_name = "recipes/pages/home.html"
+    pagination_mode = PAGINATION_NUMBERED
+    count_provider = recipe_count_provider
+    estimate_count = False
+
+    def get_page_cache_tags(self):
+        return (RECIPES_TAG, CATEGORIES_TAG)
+
+    async def get_queryset(self):
+        return Recipe.objects.published().order_by("-id")
+
+    async def get_context_data(self, **kwargs):
+        return {"view": self, **kwargs}
+
+    async def get(self, request, *args, **kwargs):
+        page_obj, pagination_range = await amake_pagination(
+            request,
+            await self.get_queryset(),
+            PER_PAGE,
+            mode=self.pagination_mode,
+            count_provider=self.count_provider,
+            estimate_count=self.estimate_count,
+        )
+        context = await self.get_context_data(
+            recipes=page_obj, pagination_range=pagination_range
+        )
+        return TemplateResponse(request, self.template_name, context)
+
+
+class RecipeListViewHome(RecipeListViewBase):
+    template_name = "recipes/pages/home.html"
+    estimate_count = True
+
+
+class RecipeListViewCategory(RecipeListViewBase):
+    template_name = "recipes/pages/category.html"
+
+    def get_page_cache_tags(self):
+        return (category_tag(self.kwargs.get("category_id")),)
+
+    async def get_category(self):
+        try:
+            return await Category.objects.filter(published_count__gt=0).aget(
+                pk=self.kwargs.get("category_id")
+            )
+        except Category.DoesNotExist:
+            raise Http404()
+
+    async def get_queryset(self):
+        self.category = await self.get_category()
+        self.count_provider = KnownCountProvider(self.category.published_count)
+
+        qs = await super().get_queryset()
+        return qs.filter(category=self.category)
+
+    async def get_context_data(self, **kwargs):
+        return await super().get_context_data(
+            category=self.category,
+            title=f"{self.category.name} - Category | ",
+            **kwargs,
+        )
+
+
+class RecipeListViewSearch(RecipeListViewBase):
+    template_name = "recipes/pages/search.html"
+    # Results are ordered by relevance, not by -id
+    pagination_mode = PAGINATION_NUMBERED
+
+    def get_search_term(self):
+        return self.request.GET.get("q", "").strip()
+
+    async def get_queryset(self):
+        search_term = self.get_search_term()
+
+        if not search_term:
+            raise Http404()
+
+        qs = await super().get_queryset()
+        return await get_search_engine().asearch(qs, search_term)
+
+    async def get_context_data(self, **kwargs):
+        search_term = self.get_search_term()
+
+        return await super().get_context_data(
+            page_title=f"Search for '{search_term}' |",
+            search_term=search_term,
+            additional_url_query=f"&q={search_term}",
+            **kwargs,
+        )
+
+
+class RecipeDetail(AsyncAnonymousPageCacheMixin, View):
+    template_name = "recipes/pages/recipe-view.html"
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.recipe_id = await aresolve_recipe_slug(self.kwargs.get("slug"))
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_page_cache_tags(self):
+        if self.recipe_id is None:
+            return ()
+        return (recipe_tag(self.recipe_id), CATEGORIES_TAG)
+
+    async def get_object(self):
+        if self.recipe_id is None:
+            raise Http404()
+
+        slug = self.kwargs.get("slug")
+        qs = Recipe.objects.filter(is_published=True).with_relations()
+        recipe = await qs.filter(pk=self.recipe_id).afirst()
+
+        if recipe is None or recipe.slug != slug:
+            await aforget_recipe_slug(slug)
+            recipe = await qs.filter(slug=slug).afirst()
+            if recipe is None:
+                raise Http404()
+
+        return recipe
+
+    async def get(self, request, *args, **kwargs):
+        recipe = await self.get_object()
+        context = {
+            "view": self,
+            "object": recipe,
+            "recipe": recipe,
+            "is_detail_page": True,
+        }
+        return TemplateResponse(request, self.template_name, context)
+
+
+class RecipeDetailRedirect(View):
+    async def get(self, request, *args, **kwargs):
+        slug = (
+            await Recipe.objects.filter(
+                pk=self.kwargs.get("pk"), is_published=True
+            )
+            .values_list("slug", flat=True)
+            .afirst()
+        )
+        if slug is None:
+            raise Http404()
+
+        url = reverse("recipes:recipe", args=(slug,))
+        query = request.META.get("QUERY_STRING")
+        return HttpResponsePermanentRedirect(
+            f"{url}?{query}" if query else url
+        )
@@ -0,0 +1,169 @@
+"""Latency, query and memory benchmarks of the public recipe endpoints.
+
+Used by manage.py benchmark_recipes, which seeds datasets of growing size
+(recipes.seeding) in a throwaway database and compares the results with
+a budget file.
+"""
+
+from time import perf_counter
+
+from django.core.cache import cache
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.seeding import seed_authors, seed_recipes
+from recipes.slugs import recipe_slug_cache
+from utils.benchmark import measure, summarize_latencies
+
+ENDPOINTS = ("home", "category", "search", "detail", "dashboard")
+
+# The caches would hide the cost of the views after the first request
+BENCHMARK_SETTINGS = {
+    "PAGE_CACHE_ENABLED": False,
+    "RECIPE_CARD_CACHE_ENABLED": False,
+    "SERVER_TIMING_ENABLED": False,
+}
+
+
+def get_endpoint_urls():
+    """{endpoint: url} built from the seeded recipes."""
+    recipe = Recipe.objects.published().order_by("id").first()
+    if recipe is None:
+        raise ValueError("Seed some published recipes first.")
+
+    return {
+        "home": reverse("recipes:home"),
+        "category": reverse("recipes:category", args=(recipe.category_id,)),
+        "search": reverse("recipes:search") + f"?q={recipe.title.split()[0]}",
+        "detail": recipe.get_absolute_url(),
+        "dashboard": reverse("authors:dashboard"),
+    }
+
+
+def get_response(client, url):
+    response = client.get(url)
+    # Force the rendering of lazy content
+    response.content
+    return response
+
+
+def benchmark_url(client, url, rounds):
+    """Requests url `rounds` times after a warm-up request.
+
+    Latencies are measured without tracemalloc, which slows Python down;
+    queries and peak memory come from one extra traced request.
+    """
+    get_response(client, url)
+
+    latencies = []
+    for _ in range(rounds):
+        start = perf_counter()
+        get_response(client, url)
+        latencies.append(perf_counter() - start)
+
+    response, measurement = measure(get_response, client, url)
+    return {
+        "status": response.status_code,
+        **summarize_latencies(latencies),
+        "queries": measurement["queries"],
+        "peak_memory_kib": round(measurement["peak_memory_bytes"] / 1024),
+    }
+
+
+def benchmark_endpoints(rounds=20, endpoints=ENDPOINTS):
+    """{endpoint: result of benchmark_url()} for the current dataset.
+
+    The dashboard is requested by the first seeded author, the other
+    endpoints anonymously.
+    """
+    urls = get_endpoint_urls()
+    anonymous = Client()
+    author = Client()
+    author.force_login(seed_authors(1)[0])
+
+    with override_settings(**BENCHMARK_SETTINGS):
+        cache.clear()
+        return {
+            name: benchmark_url(
+                author if name == "dashboard" else anonymous,
+                urls[name],
+                rounds,
+            )
+            for name in endpoints
+        }
+
+
+def benchmark_slug_resolver(rounds=20):
+    """benchmark_url() of the detail page with the slug resolver cache
+    (recipes.slugs) on and off, with and without the page cache.
+
+    Returns {"page_cache": {"resolver": ..., "no_resolver": ...},
+    "no_page_cache": {...}}.
+    """
+    url = get_endpoint_urls()["detail"]
+    client = Client()
+    results = {}
+
+    for page_cache in (True, False):
+        group = "page_cache" if page_cache else "no_page_cache"
+        results[group] = {}
+
+        for resolver in (True, False):
+            with override_settings(
+                **{
+                    **BENCHMARK_SETTINGS,
+                    "PAGE_CACHE_ENABLED": page_cache,
+                    "RECIPE_SLUG_CACHE_ENABLED": resolver,
+                }
+            ):
+                cache.clear()
+                recipe_slug_cache.clear()
+                name = "resolver" if resolver else "no_resolver"
+                results[group][name] = benchmark_url(client, url, rounds)
+
+    return results
+
+
+def run_benchmarks(sizes, rounds=20, seed=0, progress=None):
+    """Benchmarks the endpoints with each dataset size in `sizes`.
+
+    The dataset grows between sizes, so it must start empty. Returns
+    {"rounds": ..., "seed": ..., "sizes": {size: {endpoint: result}}}.
+    """
+    results = {"rounds": rounds, "seed": seed, "sizes": {}}
+    seeded = 0
+
+    for size in sorted(sizes):
+        seed_recipes(size - seeded, seed=seed, start=seeded)
+        seeded = size
+        results["sizes"][str(size)] = benchmark_endpoints(rounds)
+
+        if progress is not None:
+            progress(size, results["sizes"][str(size)])
+
+    return results
+
+
+def check_budget(results, budget):
+    """Returns a message for each result over the budget.
+
+    `budget` maps endpoints to the maximum value of their metrics
+    (e.g. {"home": {"queries": 4, "p50_ms": 50}}) at every dataset size.
+    """
+    violations = []
+    for size, endpoints in results["sizes"].items():
+        for name, result in endpoints.items():
+            if result["status"] != 200:
+                violations.append(
+                    f"{name} ({size} recipes): status {result['status']}"
+                )
+
+            for metric, limit in budget.get(name, {}).items():
+                if result[metric] > limit:
+                    violations.append(
+                        f"{name} ({size} recipes): {metric} "
+                        f"{result[metric]:.6g} > {limit}"
+                    )
+    return violations
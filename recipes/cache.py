@@ -0,0 +1,20 @@
+from utils.pagination import CachedCountProvider
+
+# Cache tags invalidated by recipes.signals (see utils.cache):
+# - RECIPES_TAG: anything listing published recipes (home, search, counts)
+# - CATEGORIES_TAG: any page showing category names
+# - category_tag(): the page of one category
+# - recipe_tag(): the detail page of one recipe
+RECIPES_TAG = "recipes"
+CATEGORIES_TAG = "categories"
+
+
+def category_tag(pk):
+    return f"category:{pk}"
+
+
+def recipe_tag(pk):
+    return f"recipe:{pk}"
+
+
+recipe_count_provider = CachedCountProvider(tags=(RECIPES_TAG,))
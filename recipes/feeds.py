@@ -0,0 +1,125 @@
+"""RSS and Atom feeds of the RECIPE_FEED_SIZE newest published recipes.
+
+Like the API (recipes.api), a request first reads the ETAG_LOOKUPS of the
+recipes in the feed: they key the cached feed and its ETag, so an edited,
+published or deleted recipe, or a renamed category or author, changes
+both, and a current client gets a 304 after that single query. The feed
+is small and bounded, so it is rendered whole with
+django.utils.feedgenerator instead of streamed.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.views import View
+
+from recipes.api import ETAG_LOOKUPS
+from recipes.models import Recipe
+from recipes.sitemaps import get_base_url, get_not_modified_response
+from utils.cache import set_page_validators
+
+FEED_KEY_PREFIX = "feed"
+FEED_TITLE = "Recipes"
+FEED_DESCRIPTION = "The latest published recipes."
+FEED_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "slug",
+    "created_at",
+    "updated_at",
+    "category__name",
+    "author__username",
+)
+
+
+def get_feed_keys():
+    """ETAG_LOOKUPS values of the recipes in the feed, newest first."""
+    return list(
+        Recipe.objects.filter(is_published=True)
+        .order_by("-id")
+        .values_list(*ETAG_LOOKUPS)[: settings.RECIPE_FEED_SIZE]
+    )
+
+
+def make_feed_key(request, feed_class, keys):
+    signature = json.dumps(
+        [get_base_url(request), feed_class.__name__, keys],
+        cls=DjangoJSONEncoder,
+    )
+    digest = hashlib.md5(signature.encode("utf-8")).hexdigest()
+    return f"{FEED_KEY_PREFIX}:{digest}"
+
+
+def make_feed(feed_class, base_url, feed_url, ids):
+    rows = (
+        Recipe.objects.filter(pk__in=ids)
+        .order_by("-id")
+        .values_list(*FEED_FIELDS)
+    )
+    feed = feed_class(
+        title=FEED_TITLE,
+        link=base_url + reverse("recipes:home"),
+        description=FEED_DESCRIPTION,
+        language="pt-br",
+        feed_url=feed_url,
+    )
+    for row in rows:
+        recipe = dict(zip(FEED_FIELDS, row))
+        link = base_url + reverse(
+            "recipes:recipe", kwargs={"slug": recipe["slug"]}
+        )
+        feed.add_item(
+            title=recipe["title"],
+            link=link,
+            description=recipe["description"],
+            author_name=recipe["author__username"],
+            pubdate=recipe["created_at"],
+            updateddate=recipe["updated_at"],
+            unique_id=link,
+            categories=(
+                [recipe["category__name"]] if recipe["category__name"] else []
+            ),
+        )
+    return feed.writeString("utf-8")
+
+
+class RecipeFeed(View):
+    http_method_names = ["get", "head", "options"]
+    feed_class = Rss201rev2Feed
+
+    def get(self, request, *args, **kwargs):
+        keys = get_feed_keys()
+        key = make_feed_key(request, self.feed_class, keys)
+        etag = f'"{key.rsplit(":", 1)[-1]}"'
+        last_modified = max(
+            (updated_at.timestamp() for _, updated_at, *_ in keys), default=0
+        )
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        content = cache.get(key)
+        if content is None:
+            content = make_feed(
+                self.feed_class,
+                get_base_url(request),
+                get_base_url(request) + request.path,
+                [pk for pk, *_ in keys],
+            )
+            cache.set(key, content, settings.RECIPE_SITEMAP_CACHE_TIMEOUT)
+
+        response = HttpResponse(
+            content, content_type=self.feed_class.content_type
+        )
+        return set_page_validators(response, etag, last_modified)
+
+
+class RecipeAtomFeed(RecipeFeed):
+    feed_class = Atom1Feed
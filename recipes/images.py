@@ -0,0 +1,264 @@
+"""Resized variants of the recipe covers.
+
+Every cover gets, next to the original file, one image per variant
+(COVER_VARIANTS), pixel density (COVER_DENSITIES) and format
+(COVER_FORMATS), e.g. for recipes/covers/2025/05/01/cake.jpg:
+
+    recipes/covers/2025/05/01/cake__list.webp
+    recipes/covers/2025/05/01/cake__list_2x.jpg
+    ...
+
+The widths of the generated files, which small covers make narrower than
+COVER_VARIANTS, are recorded in the cache under the cover name so that
+rendering a card does not open them.
+
+This module only depends on the storage, the cache and Pillow (no
+models), so it can run in the worker processes of the
+generate_cover_variants command.
+"""
+
+import hashlib
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Width in pixels of each variant at 1x and the `sizes` attribute telling
+# the browser how wide it is displayed (a list card is at most 64rem wide)
+COVER_VARIANTS = {
+    "list": 640,
+    "detail": 1024,
+}
+COVER_SIZES = {
+    "list": "(max-width: 600px) 100vw, 640px",
+    "detail": "(max-width: 1024px) 100vw, 1024px",
+}
+COVER_DENSITIES = (1, 2)
+
+# Extension -> (Pillow format, content type), most efficient first
+COVER_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+FALLBACK_COVER_FORMAT = "jpg"
+
+COVER_WIDTHS_KEY_PREFIX = "cover-widths"
+
+
+def get_cover_variant_name(name, variant, density=1, extension="jpg"):
+    path = PurePosixPath(name)
+    suffix = f"__{variant}" if density == 1 else f"__{variant}_{density}x"
+    return str(path.with_name(f"{path.stem}{suffix}.{extension}"))
+
+
+def get_cover_variant_names(name):
+    return [
+        get_cover_variant_name(name, variant, density, extension)
+        for variant in COVER_VARIANTS
+        for density in COVER_DENSITIES
+        for extension in COVER_FORMATS
+    ]
+
+
+def make_cover_widths_key(name):
+    digest = hashlib.md5(name.encode("utf-8")).hexdigest()
+    return f"{COVER_WIDTHS_KEY_PREFIX}:{digest}"
+
+
+def open_cover(name, storage=None):
+    storage = storage or default_storage
+
+    with storage.open(name, "rb") as file:
+        image = Image.open(file)
+        image.load()
+
+    # Phone photos are often stored sideways with an EXIF orientation
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    return image
+
+
+def encode_cover(image, extension):
+    image_format, _ = COVER_FORMATS[extension]
+
+    if image_format == "JPEG" and image.mode == "RGBA":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        image_format,
+        quality=settings.RECIPE_COVER_QUALITY,
+        optimize=True,
+    )
+    return buffer.getvalue()
+
+
+def process_uploaded_cover(name, storage=None):
+    """Re-encodes an uploaded cover as JPEG, upright, without its metadata
+    (EXIF, GPS...) and at most RECIPE_COVER_MAX_SIZE pixels on each side.
+
+    Returns the name of the new file, the upload is left in place.
+    """
+    storage = storage or default_storage
+    image = open_cover(name, storage)
+    max_size = settings.RECIPE_COVER_MAX_SIZE
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    return storage.save(
+        str(PurePosixPath(name).with_suffix(f".{FALLBACK_COVER_FORMAT}")),
+        ContentFile(encode_cover(image, FALLBACK_COVER_FORMAT)),
+    )
+
+
+def generate_cover_variants(name, storage=None, force=False):
+    """Writes the variants of the cover stored as `name`.
+
+    Variants that already exist are kept unless `force` is set. Images are
+    never upscaled, a small cover gives variants of its own size. Returns
+    the names of the files written.
+    """
+    storage = storage or default_storage
+    image = open_cover(name, storage)
+    written = []
+    widths = {}
+
+    for variant, width in COVER_VARIANTS.items():
+        widths[variant] = {}
+        for density in COVER_DENSITIES:
+            resized = image.copy()
+            resized.thumbnail(
+                (width * density, resized.height), Image.Resampling.LANCZOS
+            )
+            widths[variant][density] = resized.width
+
+            for extension in COVER_FORMATS:
+                variant_name = get_cover_variant_name(
+                    name, variant, density, extension
+                )
+
+                if storage.exists(variant_name):
+                    if not force:
+                        continue
+                    storage.delete(variant_name)
+
+                storage.save(
+                    variant_name, ContentFile(encode_cover(resized, extension))
+                )
+                written.append(variant_name)
+
+    cache.set(make_cover_widths_key(name), widths, None)
+    return written
+
+
+def delete_cover_variants(name, storage=None):
+    storage = storage or default_storage
+
+    for variant_name in get_cover_variant_names(name):
+        storage.delete(variant_name)
+    cache.delete(make_cover_widths_key(name))
+
+
+def read_cover_widths(name, storage=None):
+    """Returns {variant: {density: width}} of the generated files, read
+    from the files themselves (Pillow only parses the header)."""
+    storage = storage or default_storage
+    widths = {}
+
+    for variant in COVER_VARIANTS:
+        widths[variant] = {}
+        for density in COVER_DENSITIES:
+            variant_name = get_cover_variant_name(
+                name, variant, density, FALLBACK_COVER_FORMAT
+            )
+            try:
+                with storage.open(variant_name, "rb") as file:
+                    widths[variant][density] = Image.open(file).width
+            except FileNotFoundError:
+                continue
+
+    return widths
+
+
+def get_cover_widths(name, variant, storage=None):
+    """Returns {density: width} of the generated files of the variant.
+
+    The widths recorded by generate_cover_variants() are read from the
+    cache. When they are missing (another cache, or an eviction), the
+    files are read once and recorded again if they all exist. Small
+    covers are not upscaled, so a density whose file is as wide as a
+    lower one is left out.
+    """
+    key = make_cover_widths_key(name)
+    widths = cache.get(key)
+
+    if widths is None:
+        widths = read_cover_widths(name, storage)
+        if all(
+            len(densities) == len(COVER_DENSITIES)
+            for densities in widths.values()
+        ):
+            cache.set(key, widths, None)
+
+    unique = {}
+    for density, width in widths[variant].items():
+        if width not in unique.values():
+            unique[density] = width
+    return unique
+
+
+def get_cover_sources(name, variant, storage=None):
+    """Returns (content type, srcset) pairs for the variant of the cover,
+    the fallback format last, or None while its files have not been
+    generated yet."""
+    storage = storage or default_storage
+    widths = get_cover_widths(name, variant, storage)
+
+    if 1 not in widths:
+        return None
+
+    extensions = sorted(
+        COVER_FORMATS, key=lambda extension: extension == FALLBACK_COVER_FORMAT
+    )
+
+    def srcset(extension):
+        urls = {
+            density: storage.url(
+                get_cover_variant_name(name, variant, density, extension)
+            )
+            for density in widths
+        }
+        return ", ".join(
+            f"{urls[density]} {width}w" for density, width in widths.items()
+        )
+
+    return [
+        (COVER_FORMATS[extension][1], srcset(extension))
+        for extension in extensions
+    ]
+
+
+def setup_worker():
+    # Worker processes that are spawned (not forked) start without Django
+    import django
+
+    django.setup()
+
+
+def generate_cover_variants_task(name, force=False):
+    """Entry point of the worker processes, errors are returned instead of
+    raised so one broken file does not stop the backfill."""
+    try:
+        return name, generate_cover_variants(name, force=force), None
+    except Exception as error:  # noqa: BLE001
+        return name, [], f"{type(error).__name__}: {error}"
@@ -0,0 +1,158 @@
+"""Database backed queue processing the uploaded covers in the background.
+
+The dashboard stores the upload as it is and calls enqueue_cover_job(). The
+process_cover_jobs command (or run_pending_cover_jobs() in tests) claims
+the jobs, re-encodes the upload without its metadata, generates its
+variants (recipes.images) and points the recipe to the new file.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from recipes.images import (
+    delete_cover_variants,
+    generate_cover_variants,
+    process_uploaded_cover,
+)
+from recipes.models import CoverJob, Recipe
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_cover_job(recipe):
+    """Queues the processing of the cover of a saved recipe."""
+    recipe.cover_status = Recipe.CoverStatus.PENDING
+    Recipe.objects.filter(pk=recipe.pk).update(
+        cover_status=recipe.cover_status
+    )
+    return CoverJob.objects.create(recipe=recipe, cover=recipe.cover.name)
+
+
+def get_runnable_cover_jobs():
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.RECIPE_COVER_JOB_TIMEOUT)
+
+    return CoverJob.objects.filter(
+        Q(status=CoverJob.Status.PENDING, run_after__lte=now)
+        | Q(status=CoverJob.Status.RUNNING, updated_at__lt=stale)
+    ).order_by("run_after", "id")
+
+
+def claim_cover_job(job):
+    """Marks the job as running, False if another worker claimed it first.
+
+    The conditional UPDATE only matches the job as it was read, so it works
+    the same on every database without row locks.
+    """
+    now = timezone.now()
+    claimed = CoverJob.objects.filter(
+        pk=job.pk, status=job.status, updated_at=job.updated_at
+    ).update(
+        status=CoverJob.Status.RUNNING,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+
+    if claimed:
+        job.status = CoverJob.Status.RUNNING
+        job.attempts += 1
+        job.updated_at = now
+
+    return bool(claimed)
+
+
+def process_cover_job(job):
+    name = process_uploaded_cover(job.cover)
+    generate_cover_variants(name)
+
+    with transaction.atomic():
+        recipe = (
+            Recipe.objects.select_for_update()
+            .filter(pk=job.recipe_id, cover=job.cover)
+            .first()
+        )
+
+        # The recipe was deleted or got another cover in the meantime
+        if recipe is None:
+            delete_cover_variants(name)
+            default_storage.delete(name)
+        else:
+            recipe.cover = name
+            recipe.cover_status = Recipe.CoverStatus.READY
+            recipe.save(update_fields=["cover", "cover_status", "updated_at"])
+
+    # Replaced by the processed file, or by nothing in the cases above
+    if name != job.cover:
+        default_storage.delete(job.cover)
+
+
+def update_cover_job(job, **fields):
+    """Saves the fields of a claimed job, False if the job is gone.
+
+    A job is deleted with its recipe (CASCADE), which can happen while it
+    runs: then nothing is saved and the upload it held is deleted.
+    """
+    fields["updated_at"] = timezone.now()
+    if not CoverJob.objects.filter(pk=job.pk).update(**fields):
+        default_storage.delete(job.cover)
+        return False
+
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return True
+
+
+def fail_cover_job(job, error):
+    fields = {"last_error": f"{type(error).__name__}: {error}"}
+
+    if job.attempts >= settings.RECIPE_COVER_JOB_MAX_ATTEMPTS:
+        fields["status"] = CoverJob.Status.FAILED
+        Recipe.objects.filter(pk=job.recipe_id, cover=job.cover).update(
+            cover_status=Recipe.CoverStatus.FAILED
+        )
+    else:
+        fields["status"] = CoverJob.Status.PENDING
+        delay = settings.RECIPE_COVER_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        fields["run_after"] = timezone.now() + timedelta(seconds=delay)
+
+    update_cover_job(job, **fields)
+
+
+def run_cover_job(job):
+    """Runs a claimed job, returns whether it succeeded."""
+    try:
+        process_cover_job(job)
+    except Exception as error:  # noqa: BLE001
+        logger.exception(
+            "Cover job %s failed (attempt %s)", job.pk, job.attempts
+        )
+        fail_cover_job(job, error)
+        return False
+
+    update_cover_job(job, status=CoverJob.Status.DONE, last_error="")
+    return True
+
+
+def run_pending_cover_jobs(limit=100):
+    """Claims and runs up to `limit` runnable jobs in this process.
+
+    Returns (succeeded, failed) counts.
+    """
+    succeeded = failed = 0
+
+    for job in get_runnable_cover_jobs()[:limit]:
+        if not claim_cover_job(job):
+            continue
+
+        if run_cover_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+
+    return succeeded, failed
@@ -0,0 +1,100 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from recipes.benchmarks import check_budget, run_benchmarks
+
+
+def parse_sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",")]
+    except ValueError:
+        sizes = []
+    if not sizes or min(sizes) < 1:
+        raise CommandError(f"Invalid --sizes: {value!r}")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds datasets of growing size in a throwaway test database and "
+        "measures the latency, queries and memory of the home, category, "
+        "search, detail and dashboard pages. Fails when the results go "
+        "over the budget file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000",
+            help="Comma separated number of recipes (default: 100,1000).",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=20,
+            help="Requests per endpoint and size (default: 20).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the generated data (default: 0).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this JSON file.",
+        )
+        parser.add_argument(
+            "--budget",
+            default=str(settings.BASE_DIR / "benchmark_budget.json"),
+            help="JSON file with the maximum metrics per endpoint "
+            "(default: benchmark_budget.json, empty to skip).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = parse_sizes(options["sizes"])
+        budget = self.load_budget(options["budget"])
+
+        # Same database engine as the settings, never the real data
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={"default"}
+        )
+        try:
+            results = run_benchmarks(
+                sizes, options["rounds"], options["seed"], self.report
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+
+        violations = check_budget(results, budget)
+        if violations:
+            raise CommandError(
+                "Benchmark budget exceeded:\n" + "\n".join(violations)
+            )
+        self.stdout.write(self.style.SUCCESS("Within the budget."))
+
+    def load_budget(self, path):
+        if not path:
+            return {}
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Could not read the budget: {error}")
+
+    def report(self, size, results):
+        self.stdout.write(f"{size} recipes")
+        for name, result in results.items():
+            self.stdout.write(
+                f"  {name:<10} p50 {result['p50_ms']:7.2f} ms  "
+                f"p99 {result['p99_ms']:7.2f} ms  "
+                f"{result['queries']:3} queries  "
+                f"{result['peak_memory_kib']:6} KiB peak"
+            )
@@ -0,0 +1,194 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from recipes.models import Recipe
+from utils.benchmark import run_http_load, wait_for_server
+
+HOST = "127.0.0.1"
+
+# One process each: gunicorn runs the sync views from a thread per
+# connection, uvicorn the async views (project.asgi) on its event loop
+SERVERS = {
+    "wsgi": [
+        "gunicorn",
+        "project.wsgi:application",
+        "--worker-class=gthread",
+        "--workers=1",
+        "--threads={threads}",
+        "--bind={host}:{port}",
+        "--log-level=warning",
+    ],
+    "asgi": [
+        "uvicorn",
+        "project.asgi:application",
+        "--host={host}",
+        "--port={port}",
+        "--no-access-log",
+        "--log-level=warning",
+    ],
+}
+
+
+def parse_levels(value):
+    try:
+        levels = [int(level) for level in value.split(",")]
+    except ValueError:
+        levels = []
+    if not levels or min(levels) < 1:
+        raise CommandError(f"Invalid --concurrency: {value!r}")
+    return levels
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts the site under gunicorn (WSGI, sync views) and uvicorn "
+        "(ASGI, async views) on a local port and compares their "
+        "throughput and latency with growing numbers of concurrent "
+        "clients. Uses the configured database: seed it first "
+        "(manage.py seed_recipes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            action="append",
+            choices=SERVERS,
+            dest="servers",
+            help="Server to run, may be repeated (default: wsgi and asgi).",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, may be repeated (default: the home, "
+            "category, search and detail pages of the first recipe).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,10,50",
+            help="Comma separated concurrent clients (default: 1,10,50).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per server and concurrency (default: 500).",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Threads of the gunicorn worker (default: 8).",
+        )
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--no-page-cache",
+            action="store_true",
+            help="Turn the page and card caches off, so the views run.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this JSON file.",
+        )
+
+    def handle(self, *args, **options):
+        levels = parse_levels(options["concurrency"])
+        paths = options["paths"] or self.get_default_paths()
+        results = {}
+
+        for server in options["servers"] or list(SERVERS):
+            results[server] = {}
+            with self.run_server(server, options) as process:
+                wait_for_server(HOST, options["port"], paths[0])
+                # Warm-up: compiled templates, opened connections
+                run_http_load(HOST, options["port"], paths, 50, 5)
+
+                for concurrency in levels:
+                    result = run_http_load(
+                        HOST,
+                        options["port"],
+                        paths,
+                        options["requests"],
+                        concurrency,
+                    )
+                    results[server][str(concurrency)] = result
+                    self.report(server, concurrency, result)
+
+                if process.poll() is not None:
+                    raise CommandError(f"The {server} server stopped.")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+
+    def get_default_paths(self):
+        recipe = Recipe.objects.published().order_by("id").first()
+        if recipe is None:
+            raise CommandError(
+                "No published recipes: run manage.py seed_recipes first."
+            )
+
+        return [
+            reverse("recipes:home"),
+            reverse("recipes:category", args=(recipe.category_id,)),
+            f"{reverse('recipes:search')}?q={recipe.title.split()[0]}",
+            recipe.get_absolute_url(),
+        ]
+
+    def run_server(self, server, options):
+        command = [
+            sys.executable,
+            "-m",
+            *(
+                argument.format(
+                    host=HOST, port=options["port"], threads=options["threads"]
+                )
+                for argument in SERVERS[server]
+            ),
+        ]
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "project.settings"}
+        if options["no_page_cache"]:
+            env.update(PAGE_CACHE_ENABLED="0", RECIPE_CARD_CACHE_ENABLED="0")
+
+        return ServerProcess(command, env, cwd=settings.BASE_DIR)
+
+    def report(self, server, concurrency, result):
+        self.stdout.write(
+            f"{server:<5} {concurrency:4} clients  "
+            f"{result['requests_per_second']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:8.2f} ms  "
+            f"p99 {result['p99_ms']:8.2f} ms  "
+            f"{result['errors']} errors"
+        )
+
+
+class ServerProcess:
+    """Context manager running a server command until the block exits."""
+
+    def __init__(self, command, env, cwd):
+        self.command = command
+        self.env = env
+        self.cwd = cwd
+
+    def __enter__(self):
+        try:
+            self.process = subprocess.Popen(
+                self.command, env=self.env, cwd=self.cwd
+            )
+        except OSError as error:
+            raise CommandError(f"Could not start the server: {error}")
+        return self.process
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
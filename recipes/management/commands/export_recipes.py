@@ -0,0 +1,61 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from recipes.transfer import CHUNK_SIZE, FORMATS, export_recipes, get_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes every recipe to a JSONL or CSV file, one row per recipe, "
+        "streaming them from the database in chunks. Categories and "
+        "authors are written by name (see import_recipes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="File to write (default: -, the standard output).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file (default: csv for .csv files, "
+            "else jsonl).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help=f"Recipes read per query (default: {CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        # Reports go to stderr while the recipes go to stdout
+        self.log = self.stderr if path == "-" else self.stdout
+        self.started = perf_counter()
+        export = {
+            "format": get_format(path, options["format"]),
+            "chunk_size": options["chunk_size"],
+            "progress": self.report,
+        }
+
+        if path == "-":
+            count = export_recipes(self.stdout, **export)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                count = export_recipes(file, **export)
+
+        self.log.write(
+            self.style.SUCCESS(
+                f"{count} recipes exported in "
+                f"{perf_counter() - self.started:.1f}s"
+            )
+        )
+
+    def report(self, count):
+        elapsed = perf_counter() - self.started
+        self.log.write(f"{count} recipes ({count / elapsed:.0f}/s)")
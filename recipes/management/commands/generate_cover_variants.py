@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.images import generate_cover_variants_task, setup_worker
+from recipes.models import Recipe
+from recipes.signals import get_recipe_tags
+from utils.cache import invalidate_tags_on_commit
+
+TOUCH_BATCH_SIZE = 500
+
+
+def touch_recipes_with_covers(names):
+    """Bumps updated_at of the recipes with these covers, which keys their
+    cached cards, and invalidates the cached pages showing them: both
+    still point to the original file."""
+    recipes = Recipe.objects.filter(cover__in=names)
+    tags = set()
+    for recipe in recipes.only("id", "is_published", "category_id"):
+        tags |= get_recipe_tags(recipe)
+
+    # update() skips the signals, which would bump one recipe at a time
+    recipes.update(updated_at=timezone.now())
+    invalidate_tags_on_commit(*tags)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the resized WebP/JPEG variants (recipes.images) of every "
+        "recipe cover, in parallel worker processes. Covers whose variants "
+        "already exist are skipped unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Generate the variants again even if they exist.",
+        )
+
+    def handle(self, *args, **options):
+        names = list(
+            Recipe.objects.exclude(cover="")
+            .order_by()
+            .values_list("cover", flat=True)
+            .distinct()
+        )
+        start = perf_counter()
+        written = failed = 0
+        touched = []
+
+        with ProcessPoolExecutor(
+            max_workers=max(options["workers"], 1), initializer=setup_worker
+        ) as executor:
+            results = executor.map(
+                generate_cover_variants_task,
+                names,
+                [options["force"]] * len(names),
+                chunksize=8,
+            )
+
+            for name, variant_names, error in results:
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+
+                written += len(variant_names)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{name}: {len(variant_names)} files")
+
+                if variant_names:
+                    touched.append(name)
+                if len(touched) == TOUCH_BATCH_SIZE:
+                    touch_recipes_with_covers(touched)
+                    touched = []
+
+        if touched:
+            touch_recipes_with_covers(touched)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(names) - failed} covers, {written} variants written "
+                f"in {perf_counter() - start:.2f}s ({failed} failed)"
+            )
+        )
@@ -0,0 +1,76 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.transfer import (
+    BATCH_SIZE,
+    FORMATS,
+    RecipeImportError,
+    get_format,
+    import_recipes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates and updates recipes from a JSONL or CSV file written by "
+        "export_recipes. Recipes are matched by slug, categories by name "
+        "(missing ones are created) and authors by username (unknown "
+        "ones are left empty). Each batch is saved in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="File to read, - for the standard input."
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file (default: csv for .csv files, "
+            "else jsonl).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Recipes per transaction (default: {BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        self.started = perf_counter()
+        import_options = {
+            "format": get_format(path, options["format"]),
+            "batch_size": options["batch_size"],
+            "progress": self.report,
+        }
+
+        try:
+            if path == "-":
+                stats = import_recipes(sys.stdin, **import_options)
+            else:
+                with open(path, encoding="utf-8", newline="") as file:
+                    stats = import_recipes(file, **import_options)
+        except (OSError, RecipeImportError) as error:
+            raise CommandError(f"Import stopped: {error}")
+
+        if stats["unknown_authors"]:
+            self.stderr.write(
+                "Unknown authors, recipes saved without author: "
+                + ", ".join(stats["unknown_authors"])
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{stats['created']} recipes created and {stats['updated']} "
+                f"updated in {perf_counter() - self.started:.1f}s"
+            )
+        )
+
+    def report(self, stats):
+        done = stats["created"] + stats["updated"]
+        elapsed = perf_counter() - self.started
+        self.stdout.write(f"{done} recipes ({done / elapsed:.0f}/s)")
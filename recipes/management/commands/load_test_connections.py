@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from utils.benchmark import summarize_latencies
+
+MODES = ("close", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends GET requests through the WSGI handler from a fixed set of "
+        "worker threads and reports p50/p99 latency and how many database "
+        "connections were opened with connections closed after every "
+        "request, persistent connections and (PostgreSQL) the psycopg pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/", help="Path to request.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE of the persistent mode.",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=MODES,
+            dest="modes",
+            help="Mode to run, may be repeated (default: close, persistent "
+            "and pool when the database is PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        db_settings = connections.settings[DEFAULT_DB_ALIAS]
+        is_postgresql = connections[DEFAULT_DB_ALIAS].vendor == "postgresql"
+        modes = options["modes"] or (
+            MODES if is_postgresql else ("close", "persistent")
+        )
+
+        if "pool" in modes and not is_postgresql:
+            raise CommandError("The pool mode needs a PostgreSQL database.")
+
+        original = {
+            "CONN_MAX_AGE": db_settings["CONN_MAX_AGE"],
+            "OPTIONS": db_settings["OPTIONS"],
+        }
+
+        # Pages served from the caches would not touch the database
+        with override_settings(
+            PAGE_CACHE_ENABLED=False, RECIPE_CARD_CACHE_ENABLED=False
+        ):
+            try:
+                for mode in modes:
+                    self.configure(db_settings, mode, options, original)
+                    self.report(mode, self.run(options))
+            finally:
+                connections.close_all()
+                db_settings.update(original)
+
+    def configure(self, db_settings, mode, options, original):
+        connections.close_all()
+        options_ = dict(original["OPTIONS"])
+        options_.pop("pool", None)
+
+        if mode == "close":
+            db_settings["CONN_MAX_AGE"] = 0
+        elif mode == "persistent":
+            db_settings["CONN_MAX_AGE"] = options["conn_max_age"]
+        else:
+            db_settings["CONN_MAX_AGE"] = 0
+            options_["pool"] = original["OPTIONS"].get("pool") or {
+                "min_size": options["concurrency"],
+                "max_size": options["concurrency"],
+            }
+
+        db_settings["OPTIONS"] = options_
+
+    def run(self, options):
+        handler = WSGIHandler()
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        def request(_):
+            environ = {"PATH_INFO": options["path"], "REQUEST_METHOD": "GET"}
+            setup_testing_defaults(environ)
+
+            start = perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            for _ in response:
+                pass
+            # Fires request_finished, which closes or keeps the connection
+            response.close()
+            return perf_counter() - start
+
+        connection_created.connect(count_connection)
+        try:
+            # Threads are reused like the workers of an application server,
+            # connections being per thread
+            with ThreadPoolExecutor(options["concurrency"]) as executor:
+                latencies = list(
+                    executor.map(request, range(options["requests"]))
+                )
+        finally:
+            connection_created.disconnect(count_connection)
+
+        return {**summarize_latencies(latencies), "connections": len(opened)}
+
+    def report(self, mode, result):
+        self.stdout.write(
+            f"{mode:<10} p50 {result['p50_ms']:7.2f} ms  "
+            f"p99 {result['p99_ms']:7.2f} ms  "
+            f"mean {result['mean_ms']:7.2f} ms  "
+            f"{result['connections']} connections for "
+            f"{result['requests']} requests"
+        )
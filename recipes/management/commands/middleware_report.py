@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from utils.middleware import add_timing_probes, middleware_timings
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends GET requests through the full middleware stack and reports "
+        "the time spent in each middleware and in the view per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, may be repeated (default: /).",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--no-page-cache",
+            action="store_true",
+            help="Turn the page and card caches off, so the views run.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/"]
+        overrides = {"MIDDLEWARE": add_timing_probes(settings.MIDDLEWARE)}
+
+        if options["no_page_cache"]:
+            overrides.update(
+                PAGE_CACHE_ENABLED=False, RECIPE_CARD_CACHE_ENABLED=False
+            )
+
+        with override_settings(**overrides):
+            client = Client()
+            # The first request loads the middleware and compiles templates
+            for path in paths:
+                client.get(path)
+
+            middleware_timings.reset()
+            for _ in range(options["requests"]):
+                for path in paths:
+                    client.get(path)
+
+            self.report(middleware_timings.summary())
+
+    def report(self, summary):
+        total = sum(timing["mean_ms"] for timing in summary.values())
+
+        self.stdout.write(
+            f"{'middleware':<60} {'mean ms':>8} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'share':>6}"
+        )
+        for name, timing in summary.items():
+            share = timing["mean_ms"] / total * 100 if total else 0
+            self.stdout.write(
+                f"{name:<60} {timing['mean_ms']:8.3f} {timing['p50_ms']:8.3f} "
+                f"{timing['p99_ms']:8.3f} {share:5.1f}%"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{total:.3f} ms per request in total")
+        )
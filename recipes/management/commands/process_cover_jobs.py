@@ -0,0 +1,61 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from recipes.jobs import run_pending_cover_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker processing the uploaded recipe covers queued by the "
+        "dashboard (recipes.jobs). Polls the queue until interrupted, or "
+        "only runs the jobs due now with --once. Several workers may run "
+        "at the same time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs due now and exit.",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=20,
+            help="Jobs claimed per query (default: 20).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty (default: 2).",
+        )
+
+    def handle(self, *args, **options):
+        total_succeeded = total_failed = 0
+
+        try:
+            while True:
+                succeeded, failed = run_pending_cover_jobs(options["batch"])
+                total_succeeded += succeeded
+                total_failed += failed
+
+                if succeeded or failed:
+                    self.stdout.write(
+                        f"{succeeded} covers processed, {failed} failed"
+                    )
+                    continue
+
+                if options["once"]:
+                    break
+
+                sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_succeeded} covers processed, {total_failed} failed"
+            )
+        )
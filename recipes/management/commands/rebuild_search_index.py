@@ -0,0 +1,22 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from recipes.search import get_search_engine
+
+
+class Command(BaseCommand):
+    help = "Indexes every recipe again in the configured search engine."
+
+    def handle(self, *args, **options):
+        engine = get_search_engine()
+        start = perf_counter()
+
+        engine.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{type(engine).__name__} rebuilt in "
+                f"{perf_counter() - start:.2f}s"
+            )
+        )
@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from recipes.cache import category_tag
+from recipes.models import Category
+from utils.cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the published recipes of every category and repairs the "
+        "published_count that drifted, e.g. after an update() of recipes "
+        "that skipped the signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the categories whose count is wrong.",
+        )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        if options["dry_run"]:
+            drift = list(Category.objects.get_published_count_drift())
+        else:
+            drift = Category.objects.reconcile_published_counts()
+            # The category pages paginate with the counter
+            invalidate_tags(*(category_tag(pk) for pk, *_ in drift))
+
+        for pk, name, stored, actual in drift:
+            self.stdout.write(f"{name} (#{pk}): {stored} -> {actual}")
+
+        action = "to repair" if options["dry_run"] else "repaired"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(drift)} categories {action} in "
+                f"{perf_counter() - start:.2f}s"
+            )
+        )
@@ -0,0 +1,88 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Recipe
+from recipes.seeding import BATCH_SIZE, seed_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        "Adds synthetic recipes generated with Faker (recipes.seeding), "
+        "spread over a pool of seeded categories and authors. The same "
+        "--seed always generates the same data. Seeded authors log in with "
+        "the password 'seed-password'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Recipes to create.")
+        parser.add_argument(
+            "--categories",
+            type=int,
+            default=10,
+            help="Categories shared by the recipes (default: 10).",
+        )
+        parser.add_argument(
+            "--authors",
+            type=int,
+            default=10,
+            help="Authors shared by the recipes (default: 10).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--published-ratio",
+            type=float,
+            default=0.9,
+            help="Share of published recipes (default: 0.9).",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            help="Number of the first recipe (default: the number of "
+            "recipes in the database, so runs grow the dataset).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Recipes per INSERT (default: {BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        if count < 1 or options["categories"] < 1 or options["authors"] < 1:
+            raise CommandError(
+                "count, --categories and --authors must be at least 1."
+            )
+
+        start = options["start"]
+        if start is None:
+            start = Recipe.objects.count()
+        self.started = perf_counter()
+
+        seed_recipes(
+            count,
+            categories=options["categories"],
+            authors=options["authors"],
+            seed=options["seed"],
+            published_ratio=options["published_ratio"],
+            start=start,
+            batch_size=options["batch_size"],
+            progress=lambda created: self.report(created, count),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{count} recipes seeded and indexed in "
+                f"{perf_counter() - self.started:.1f}s"
+            )
+        )
+
+    def report(self, created, count):
+        # One line every 10% (and for the last batch)
+        step = max(count // 10, 1)
+        if created == count or created // step != (created - 1) // step:
+            elapsed = perf_counter() - self.started
+            self.stdout.write(
+                f"{created}/{count} recipes ({created / elapsed:.0f}/s)"
+            )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from utils.templates import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles every project template and reports the compile time of "
+        "each one, slowest first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=None,
+            help="Only list the N slowest templates.",
+        )
+
+    def handle(self, *args, **options):
+        timings = warm_templates()
+        total = sum(seconds for _, seconds in timings)
+
+        for name, seconds in timings[: options["top"]]:
+            self.stdout.write(f"{seconds * 1000:8.2f} ms  {name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(timings)} templates compiled in {total * 1000:.1f} ms"
+            )
+        )
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+FTS_CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5("
+    "title, description, preparation_steps, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+FTS_FILL_SQL = (
+    "INSERT INTO recipes_recipe_fts "
+    "(rowid, title, description, preparation_steps) "
+    "SELECT id, title, description, preparation_steps FROM recipes_recipe"
+)
+GIN_INDEX_NAME = "recipe_search_vector_gin"
+
+
+def make_gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Same expression as recipes.search.postgres.recipe_search_vector()
+    return GinIndex(
+        SearchVector("title", weight="A", config="portuguese")
+        + SearchVector("description", weight="B", config="portuguese")
+        + SearchVector("preparation_steps", weight="C", config="portuguese"),
+        name=GIN_INDEX_NAME,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        Recipe = apps.get_model("recipes", "Recipe")
+        schema_editor.add_index(Recipe, make_gin_index())
+    elif vendor == "sqlite":
+        schema_editor.execute(FTS_CREATE_SQL)
+        schema_editor.execute(FTS_FILL_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        Recipe = apps.get_model("recipes", "Recipe")
+        schema_editor.remove_index(Recipe, make_gin_index())
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS recipes_recipe_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0002_alter_recipe_category_alter_recipe_cover_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 17:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0003_recipe_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-id"],
+                name="recipe_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["category", "-id"],
+                name="recipe_category_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("is_published", False)),
+                fields=["author", "-id"],
+                name="recipe_author_draft_idx",
+            ),
+        ),
+    ]
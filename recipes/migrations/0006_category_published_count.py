@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_published_recipes(apps, schema_editor):
+    # Same count as recipes.models.count_published_recipes()
+    Category = apps.get_model("recipes", "Category")
+    Recipe = apps.get_model("recipes", "Recipe")
+    counted = (
+        Recipe.objects.filter(category=OuterRef("pk"), is_published=True)
+        .order_by()
+        .values("category")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Category.objects.update(published_count=Coalesce(Subquery(counted), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0005_cover_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="published_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            count_published_recipes, migrations.RunPython.noop
+        ),
+    ]
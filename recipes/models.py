@@ -1,21 +1,212 @@
 # mypy: disable-error-code="var-annotated"
 # from django.contrib.auth.models import User
+from collections import Counter, defaultdict
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
-from django.utils.text import slugify
+from django.utils import timezone
+
+from utils.slugs import SlugAllocator
 
 User = get_user_model()
 
 
+# Largest number of categories per UPDATE of reconcile_published_counts()
+RECONCILE_BATCH_SIZE = 1000
+
+
+def get_published_count_changes(changes):
+    """{category id: change of its published_count} for the (before,
+    after) states of recipes, as (is_published, category_id) pairs: None
+    before a creation or after a deletion."""
+    counts = Counter()
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is not None and state[0] and state[1] is not None:
+                counts[state[1]] += sign
+    return counts
+
+
+def count_published_recipes():
+    """Subquery of the number of published recipes of the OuterRef
+    category."""
+    counted = (
+        Recipe.objects.filter(category=OuterRef("pk"), is_published=True)
+        .order_by()
+        .values("category")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counted), 0)
+
+
+class CategoryQuerySet(models.QuerySet):
+    def update_published_counts(self, changes):
+        """Adds the get_published_count_changes() to published_count, with
+        one UPDATE per distinct change. Call it in the transaction that
+        changes the recipes."""
+        categories = defaultdict(list)
+        for pk, change in changes.items():
+            if change:
+                categories[change].append(pk)
+
+        for change, pks in categories.items():
+            self.filter(pk__in=pks).update(
+                published_count=F("published_count") + change
+            )
+
+    def get_published_count_drift(self):
+        """(id, name, published_count, actual count) of the categories
+        whose counter is wrong."""
+        return (
+            self.annotate(actual=count_published_recipes())
+            .exclude(published_count=F("actual"))
+            .order_by("pk")
+            .values_list("pk", "name", "published_count", "actual")
+        )
+
+    def reconcile_published_counts(self):
+        """Sets published_count from a COUNT of the recipes wherever it
+        drifted (e.g. after a queryset update() of is_published), returning
+        the get_published_count_drift() rows repaired."""
+        with transaction.atomic(using=self.db):
+            # The locks wait for the saves in flight, so the counts below
+            # see them; later saves update the repaired counters
+            drift = list(
+                self.get_published_count_drift().select_for_update(
+                    of=("self",)
+                )
+            )
+            for start in range(0, len(drift), RECONCILE_BATCH_SIZE):
+                batch = drift[start : start + RECONCILE_BATCH_SIZE]
+                self.filter(pk__in=[row[0] for row in batch]).update(
+                    published_count=count_published_recipes()
+                )
+        return drift
+
+
 class Category(models.Model):
     name = models.CharField(max_length=65)
+    # Published recipes of the category, kept by recipes.signals and the
+    # bulk paths (RecipeQuerySet.bulk_create(), recipes.transfer) in the
+    # transaction of the change: the category pages paginate with it
+    # instead of a COUNT. manage.py reconcile_category_counts repairs it.
+    published_count = models.IntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     def __str__(self):  # pylint:disable=E0307
         return self.name
 
+    def save(self, *args, **kwargs):
+        # An instance read before a recipe was published holds a stale
+        # count: updates of the row leave the column to the counters
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "published_count"
+            ]
+        return super().save(*args, **kwargs)
+
+
+# Columns read by the recipe card of the listings
+# (recipes/partials/recipe.html) and by the dashboard. preparation_steps,
+# the heaviest field, is left out.
+RECIPE_LIST_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "slug",
+    "preparation_time",
+    "preparation_time_unit",
+    "servings",
+    "servings_unit",
+    "created_at",
+    "updated_at",
+    "is_published",
+    "cover",
+    "cover_status",
+    "category__id",
+    "category__name",
+    "author__id",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+)
+
+
+# Saves that allocate a slug retry when a concurrent save takes it first
+# (see utils.slugs)
+SLUG_ATTEMPTS = 10
+
+
+def is_reserved_recipe_slug(slug):
+    # Shadowed by the search and old id URLs of recipes.urls
+    return slug == "search" or slug.isdigit()
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_relations(self):
+        return self.select_related("author", "category")
+
+    def for_list(self):
+        return self.with_relations().only(*RECIPE_LIST_FIELDS)
+
+    def published(self):
+        return self.filter(is_published=True).for_list()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Allocates the missing slugs of the whole batch in memory before
+        inserting it, and counts its published recipes in the
+        published_count of their categories."""
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = self._bulk_create_with_slugs(objs, *args, **kwargs)
+            # Rows skipped by ignore_conflicts get no pk
+            Category.objects.using(self.db).update_published_counts(
+                get_published_count_changes(
+                    (None, (recipe.is_published, recipe.category_id))
+                    for recipe in created
+                    if recipe.pk is not None
+                )
+            )
+        return created
+
+    def _bulk_create_with_slugs(self, objs, *args, **kwargs):
+        missing = [recipe for recipe in objs if not recipe.slug]
+        if not missing:
+            return super().bulk_create(objs, *args, **kwargs)
+
+        given = {recipe.slug for recipe in objs if recipe.slug}
+        for attempt in range(SLUG_ATTEMPTS):
+            slugs = recipe_slug_allocator.allocate_many(
+                [recipe.title for recipe in missing], given, attempt
+            )
+            for recipe, slug in zip(missing, slugs):
+                recipe.slug = slug
+
+            try:
+                with transaction.atomic(using=self.db):
+                    return super().bulk_create(objs, *args, **kwargs)
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1:
+                    for recipe in missing:
+                        recipe.slug = ""
+                    raise
+
 
 class Recipe(models.Model):
+    class CoverStatus(models.TextChoices):
+        NONE = "", "No cover"
+        PENDING = "pending", "Processing"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
+    objects = RecipeQuerySet.as_manager()
 
     title = models.CharField(max_length=65)
     description = models.CharField(max_length=165)
@@ -32,20 +223,103 @@ class Recipe(models.Model):
     cover = models.ImageField(
         upload_to="recipes/covers/%Y/%m/%d/", blank=True, default=""
     )
+    # State of the background processing of the uploaded cover (recipes.jobs)
+    cover_status = models.CharField(
+        max_length=10,
+        choices=CoverStatus.choices,
+        blank=True,
+        default=CoverStatus.NONE,
+    )
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, null=True, blank=True, default=None
     )
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        # One index per listing, on its filter and -id ordering (home,
+        # category and dashboard), partial to hold only the rows it reads
+        indexes = [
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(is_published=True),
+                name="recipe_published_idx",
+            ),
+            models.Index(
+                fields=["category", "-id"],
+                condition=models.Q(is_published=True),
+                name="recipe_category_published_idx",
+            ),
+            models.Index(
+                fields=["author", "-id"],
+                condition=models.Q(is_published=False),
+                name="recipe_author_draft_idx",
+            ),
+        ]
+
     def __str__(self):  # pylint: disable=E0307
         return self.title
 
     def get_absolute_url(self):
-        return reverse("recipes:recipe", args=(self.id,))
+        return reverse("recipes:recipe", args=(self.slug,))
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            slug = f"{slugify(self.title)}"
-            self.slug = slug
+        # The signals update the published_count of the categories in the
+        # same transaction as the row (recipes.signals)
+        with transaction.atomic(using=kwargs.get("using")):
+            if self.slug:
+                return super().save(*args, **kwargs)
 
-        return super().save(*args, **kwargs)
+            for attempt in range(SLUG_ATTEMPTS):
+                self.slug = recipe_slug_allocator.allocate(
+                    self.title, attempt
+                )
+                try:
+                    with transaction.atomic(using=kwargs.get("using")):
+                        return super().save(*args, **kwargs)
+                except IntegrityError:
+                    if attempt == SLUG_ATTEMPTS - 1:
+                        self.slug = ""
+                        raise
+
+
+recipe_slug_allocator = SlugAllocator(
+    Recipe, is_reserved=is_reserved_recipe_slug
+)
+
+
+class CoverJob(models.Model):
+    """Processing of an uploaded cover, run by the process_cover_jobs
+    command (recipes.jobs)."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="cover_jobs"
+    )
+    # Storage name of the upload, the job is skipped if the recipe has
+    # another cover by the time it runs
+    cover = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_after"],
+                condition=models.Q(status="pending"),
+                name="coverjob_pending_idx",
+            ),
+        ]
+
+    def __str__(self):  # pylint: disable=E0307
+        return f"{self.cover} ({self.status})"
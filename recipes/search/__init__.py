@@ -0,0 +1,32 @@
+from functools import cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from recipes.search.base import BaseSearchEngine, IContainsSearchEngine
+
+DEFAULT_SEARCH_ENGINES = {
+    "postgresql": "recipes.search.postgres.PostgresSearchEngine",
+    "sqlite": "recipes.search.sqlite.SQLiteSearchEngine",
+}
+FALLBACK_SEARCH_ENGINE = "recipes.search.base.IContainsSearchEngine"
+
+
+def get_search_engine():
+    path = settings.RECIPES_SEARCH_ENGINE or DEFAULT_SEARCH_ENGINES.get(
+        connection.vendor, FALLBACK_SEARCH_ENGINE
+    )
+    return load_search_engine(path)
+
+
+@cache
+def load_search_engine(path):
+    return import_string(path)()
+
+
+__all__ = [
+    "BaseSearchEngine",
+    "IContainsSearchEngine",
+    "get_search_engine",
+]
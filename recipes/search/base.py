@@ -0,0 +1,83 @@
+import re
+
+from django.db.models import Q
+
+# Words (letters and digits, accents included) typed in the search box
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def split_terms(search_term):
+    return TOKEN_RE.findall(search_term.lower())
+
+
+class IdListResults:
+    """Search results resolved to an ordered list of ids outside the database.
+
+    Behaves like a queryset for make_pagination: counting uses the ids and
+    slicing only fetches the recipes of that slice, in the same order.
+    """
+
+    ordered = True
+
+    def __init__(self, queryset, ids):
+        self.queryset = queryset
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def count(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            pk = self.ids[index]
+            recipe = self.queryset.in_bulk([pk]).get(pk)
+            if recipe is None:
+                # Indexed but filtered out by the queryset
+                raise IndexError(f"Recipe {pk} is not in the queryset")
+            return recipe
+
+        ids = self.ids[index]
+        recipes = self.queryset.in_bulk(ids)
+        return [recipes[pk] for pk in ids if pk in recipes]
+
+
+class BaseSearchEngine:
+    """Interface used by RecipeListViewSearch and recipes.signals.
+
+    search() receives the already filtered (published) queryset and returns it
+    restricted to the search term and ordered by relevance. index_recipe() and
+    remove_recipe() keep the engine's index current when a recipe is saved or
+    deleted; rebuild() indexes every recipe again (rebuild_search_index).
+    asearch() is search() for async views.
+    """
+
+    def search(self, queryset, search_term):
+        raise NotImplementedError
+
+    async def asearch(self, queryset, search_term):
+        # Engines returning a lazy queryset do not query the database here
+        return self.search(queryset, search_term)
+
+    def index_recipe(self, recipe):
+        pass
+
+    def remove_recipe(self, pk):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class IContainsSearchEngine(BaseSearchEngine):
+    """LIKE '%term%' on title and description, for databases without FTS."""
+
+    def search(self, queryset, search_term):
+        return queryset.filter(
+            Q(title__icontains=search_term)
+            | Q(description__icontains=search_term),
+        )
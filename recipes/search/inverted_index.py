@@ -0,0 +1,474 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from recipes.search.base import (
+    TOKEN_RE,
+    BaseSearchEngine,
+    IContainsSearchEngine,
+    IdListResults,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process deployments only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("title", "description", "preparation_steps")
+
+# File layout:
+#   header:     magic, version, number of terms, number of postings and
+#               generation (names the update log of this base)
+#   term table: for each term (sorted) -> utf-8 length (H), utf-8 bytes,
+#               offset (I) and size (I) of its slice of the postings
+#   postings:   uint32 recipe ids in native byte order, ascending per term
+MAGIC = b"RIDX"
+VERSION = 2
+HEADER = struct.Struct("<4sIII32s")
+TERM_LENGTH = struct.Struct("<H")
+TERM_SLICE = struct.Struct("<II")
+POSTING_TYPE = "I"
+
+
+def fold(text):
+    # "Pão" -> "pao": decompose the accents and drop the combining marks
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(fold(text))
+
+
+def recipe_terms(*values):
+    terms = set()
+    for value in values:
+        terms.update(tokenize(value or ""))
+    return terms
+
+
+class InvertedIndex:
+    """Term -> recipe ids index with a read-only base and an in-memory delta.
+
+    The base comes from build() or from a file written by save() and read
+    back through mmap, so postings are not copied into Python objects until a
+    query touches them. add() and remove() only change the delta: documents
+    changed after the base was built are tombstoned in it and their current
+    terms kept in small sets.
+    """
+
+    def __init__(self, generation=None):
+        self.generation = generation or uuid4().hex
+        self._lock = threading.Lock()
+        self._terms = {}
+        self._sorted_terms = []
+        self._postings = memoryview(array(POSTING_TYPE))
+        self._mmap = None
+        self._views = ()
+        self._added = defaultdict(set)
+        self._doc_terms = {}
+        self._removed = set()
+
+    def __len__(self):
+        return len(self.document_ids())
+
+    @classmethod
+    def build(cls, documents):
+        """documents: iterable of (pk, title, description, preparation_steps)"""
+        postings = defaultdict(list)
+
+        for pk, *values in documents:
+            for term in recipe_terms(*values):
+                postings[term].append(pk)
+
+        index = cls()
+        index._set_base(
+            {
+                term: array(POSTING_TYPE, sorted(ids))
+                for term, ids in postings.items()
+            }
+        )
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(data) < HEADER.size or data[: len(MAGIC)] != MAGIC:
+            data.close()
+            raise ValueError(f"{path} is not a recipes search index")
+
+        _, version, term_count, _, generation = HEADER.unpack_from(data, 0)
+        if version != VERSION:
+            data.close()
+            raise ValueError(f"{path} is not a recipes search index")
+
+        index = cls(generation.decode("ascii"))
+
+        position = HEADER.size
+        terms = {}
+        for _ in range(term_count):
+            (length,) = TERM_LENGTH.unpack_from(data, position)
+            position += TERM_LENGTH.size
+            term = data[position : position + length].decode("utf-8")
+            position += length
+            terms[term] = TERM_SLICE.unpack_from(data, position)
+            position += TERM_SLICE.size
+
+        whole = memoryview(data)
+        tail = whole[position:]
+
+        index._mmap = data
+        index._views = (tail, whole)
+        index._terms = terms
+        index._sorted_terms = list(terms)
+        index._postings = tail.cast(POSTING_TYPE)
+        return index
+
+    def save(self, path):
+        postings = self.snapshot()
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "wb") as file:
+            total = sum(len(ids) for ids in postings.values())
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    len(postings),
+                    total,
+                    self.generation.encode("ascii"),
+                )
+            )
+
+            offset = 0
+            for term in sorted(postings):
+                encoded = term.encode("utf-8")
+                size = len(postings[term])
+                file.write(TERM_LENGTH.pack(len(encoded)))
+                file.write(encoded)
+                file.write(TERM_SLICE.pack(offset, size))
+                offset += size
+
+            for term in sorted(postings):
+                postings[term].tofile(file)
+
+        # Readers that mapped the old file keep their copy until they reload
+        os.replace(tmp_path, path)
+
+    def close(self):
+        # Windows cannot replace a file that is still mapped
+        for view in (self._postings, *self._views):
+            view.release()
+        self._views = ()
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _set_base(self, postings):
+        sorted_terms = sorted(postings)
+        flat = array(POSTING_TYPE)
+        terms = {}
+
+        for term in sorted_terms:
+            terms[term] = (len(flat), len(postings[term]))
+            flat.extend(postings[term])
+
+        self._terms = terms
+        self._sorted_terms = sorted_terms
+        self._postings = memoryview(flat)
+
+    def _base_ids(self, term):
+        offset, size = self._terms[term]
+        return self._postings[offset : offset + size]
+
+    def add(self, pk, *values):
+        self.add_terms(pk, recipe_terms(*values))
+
+    def add_terms(self, pk, terms):
+        with self._lock:
+            self._remove(pk)
+            terms = set(terms)
+            for term in terms:
+                self._added[term].add(pk)
+            self._doc_terms[pk] = terms
+
+    def remove(self, pk):
+        with self._lock:
+            self._remove(pk)
+
+    def _remove(self, pk):
+        for term in self._doc_terms.pop(pk, ()):
+            self._added[term].discard(pk)
+            if not self._added[term]:
+                del self._added[term]
+        self._removed.add(pk)
+
+    def expand(self, prefix):
+        """Base and delta terms starting with prefix."""
+        terms = set()
+        position = bisect_left(self._sorted_terms, prefix)
+
+        while position < len(self._sorted_terms):
+            term = self._sorted_terms[position]
+            if not term.startswith(prefix):
+                break
+            terms.add(term)
+            position += 1
+
+        terms.update(term for term in self._added if term.startswith(prefix))
+        return terms
+
+    def lookup(self, prefix):
+        base_ids = set()
+        added_ids = set()
+
+        for term in self.expand(prefix):
+            if term in self._terms:
+                base_ids.update(self._base_ids(term))
+            added_ids.update(self._added.get(term, ()))
+
+        return (base_ids - self._removed) | added_ids
+
+    def search(self, query):
+        """Ids of the documents containing every word (as a prefix), newest
+        first."""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return []
+
+        with self._lock:
+            ids = self.lookup(terms[0])
+            for term in terms[1:]:
+                if not ids:
+                    break
+                ids &= self.lookup(term)
+
+        return sorted(ids, reverse=True)
+
+    def document_ids(self):
+        ids = set(self._postings)
+        return (ids - self._removed) | self._doc_terms.keys()
+
+    def snapshot(self):
+        """Base merged with the delta, as term -> sorted array of ids."""
+        with self._lock:
+            postings = {}
+
+            for term in self._terms.keys() | self._added.keys():
+                ids = set()
+                if term in self._terms:
+                    ids.update(self._base_ids(term))
+                ids -= self._removed
+                ids.update(self._added.get(term, ()))
+                if ids:
+                    postings[term] = array(POSTING_TYPE, sorted(ids))
+
+        return postings
+
+
+def get_file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def read_generation(path):
+    """Generation of the index file at path, None if there is none."""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+
+    if len(header) < HEADER.size or header[: len(MAGIC)] != MAGIC:
+        return None
+    return HEADER.unpack(header)[4].decode("ascii")
+
+
+class InvertedIndexSearchEngine(BaseSearchEngine):
+    """Pure Python engine for databases without full-text search.
+
+    The index covers published recipes only and lives in every process.
+    rebuild_search_index writes RECIPES_SEARCH_INDEX_PATH (the base) and
+    processes reload it when the file changes. Saves and deletes are
+    appended, once committed, to the update log of the base, which every
+    process replays into its delta before searching: all the workers see
+    them, and they survive restarts until the next rebuild folds them
+    into a new base. search() resolves the ids without the database,
+    which is only queried for the visible page.
+
+    Until the base exists, searches fall back to IContainsSearchEngine:
+    building it takes a pass over the whole table, which is the job of
+    rebuild_search_index, not of a search request.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.RECIPES_SEARCH_INDEX_PATH)
+        self._index = None
+        self._mtime = None
+        self._log_offset = 0
+        self._lock = threading.Lock()
+        self._fallback = IContainsSearchEngine()
+
+    def get_log_path(self, generation):
+        return f"{self.path}.{generation}.log"
+
+    @contextmanager
+    def file_lock(self):
+        """Serializes the log appends and the swaps of rebuild() among
+        the processes."""
+        with open(f"{self.path}.lock", "a") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    @property
+    def index(self):
+        """The index with the logged updates applied, None without base."""
+        with self._lock:
+            mtime = self._file_mtime()
+            if mtime != self._mtime:
+                self._reload(mtime)
+            if self._index is not None:
+                self._replay_log()
+            return self._index
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _reload(self, mtime):
+        # Searches still running on the old index keep it alive until they
+        # finish: it is dropped, never closed under them
+        self._index = None
+        self._log_offset = 0
+        self._mtime = mtime
+        if mtime is None:
+            logger.warning(
+                "No search index at %s, searching with icontains until "
+                "rebuild_search_index builds it.",
+                self.path,
+            )
+            return
+
+        try:
+            self._index = InvertedIndex.load(self.path)
+        except ValueError:
+            logger.warning(
+                "Unreadable search index at %s, searching with icontains "
+                "until rebuild_search_index builds it again.",
+                self.path,
+            )
+
+    def _replay_log(self):
+        log_path = self.get_log_path(self._index.generation)
+        try:
+            with open(log_path, "rb") as file:
+                file.seek(self._log_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+
+        # A record being appended right now is read on the next search
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            record = json.loads(line)
+            if record["terms"] is None:
+                self._index.remove(record["pk"])
+            else:
+                self._index.add_terms(record["pk"], record["terms"])
+        self._log_offset += end
+
+    def _append_to_log(self, pk, terms):
+        line = json.dumps({"pk": pk, "terms": terms}) + "\n"
+        with self.file_lock():
+            # The current base, even if rebuilt since this process loaded it
+            generation = read_generation(self.path)
+            if generation is None:
+                return
+            with open(self.get_log_path(generation), "a") as file:
+                file.write(line)
+
+    def build_index(self):
+        from recipes.models import Recipe
+
+        documents = (
+            Recipe.objects.filter(is_published=True)
+            .values_list("pk", *INDEXED_FIELDS)
+            .iterator(chunk_size=2000)
+        )
+        return InvertedIndex.build(documents)
+
+    def search(self, queryset, search_term):
+        index = self.index
+        if index is None:
+            return self._fallback.search(queryset, search_term)
+        return IdListResults(queryset, index.search(search_term))
+
+    async def asearch(self, queryset, search_term):
+        # Loading the index and its log reads files
+        return await sync_to_async(self.search)(queryset, search_term)
+
+    def index_recipe(self, recipe):
+        if not recipe.is_published:
+            self.remove_recipe(recipe.pk)
+            return
+
+        terms = sorted(
+            recipe_terms(*(getattr(recipe, field) for field in INDEXED_FIELDS))
+        )
+        pk = recipe.pk
+        # A rolled back save must not reach the log
+        transaction.on_commit(lambda: self._append_to_log(pk, terms))
+
+    def remove_recipe(self, pk):
+        transaction.on_commit(lambda: self._append_to_log(pk, None))
+
+    def rebuild(self):
+        """Writes a new base and log. The updates logged while the base was
+        built are carried over to the new log: replaying the ones already
+        in the base changes nothing."""
+        with self.file_lock():
+            generation = read_generation(self.path)
+            old_log = generation and self.get_log_path(generation)
+            start = get_file_size(old_log) if old_log else 0
+
+        index = self.build_index()
+
+        with self.file_lock():
+            with open(self.get_log_path(index.generation), "wb") as log:
+                if old_log and get_file_size(old_log) > start:
+                    with open(old_log, "rb") as file:
+                        file.seek(start)
+                        log.write(file.read())
+            index.save(self.path)
+            if old_log:
+                with suppress(FileNotFoundError):
+                    os.remove(old_log)
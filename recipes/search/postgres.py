@@ -0,0 +1,37 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+from recipes.search.base import BaseSearchEngine
+
+# LANGUAGE_CODE is pt-br, so stemming uses the portuguese dictionary
+SEARCH_CONFIG = "portuguese"
+
+
+def recipe_search_vector():
+    # Must stay identical to the GIN index expression created by the
+    # 0003_recipe_search_index migration, otherwise PostgreSQL ignores it.
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("preparation_steps", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class PostgresSearchEngine(BaseSearchEngine):
+    """tsvector search ranked with ts_rank.
+
+    The vector is an expression GIN index, so PostgreSQL keeps it current on
+    every INSERT/UPDATE and index_recipe() has nothing to do.
+    """
+
+    def search(self, queryset, search_term):
+        query = SearchQuery(
+            search_term, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        vector = recipe_search_vector()
+
+        return (
+            queryset.alias(search=vector)
+            .filter(search=query)
+            .alias(rank=SearchRank(vector, query))
+            .order_by("-rank", "-id")
+        )
@@ -0,0 +1,71 @@
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from recipes.search.base import BaseSearchEngine, split_terms
+
+FTS_TABLE = "recipes_recipe_fts"
+FTS_COLUMNS = ("title", "description", "preparation_steps")
+
+# bm25() weight of each column in FTS_COLUMNS
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+MATCH_SQL = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+RANK_SQL = (
+    f"SELECT bm25({FTS_TABLE}, {', '.join(map(str, FTS_WEIGHTS))}) "
+    f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+    "AND rowid = recipes_recipe.id"
+)
+
+
+def make_match_query(search_term):
+    # Every word must match (implicit AND), as a prefix so that partial words
+    # keep working like the old icontains search. Quoting each word keeps
+    # FTS5 operators typed by the user from being interpreted.
+    terms = split_terms(search_term)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class SQLiteSearchEngine(BaseSearchEngine):
+    """FTS5 external index for development and tests.
+
+    The recipes_recipe_fts virtual table is created by the
+    0003_recipe_search_index migration and kept current by recipes.signals.
+    """
+
+    def search(self, queryset, search_term):
+        match_query = make_match_query(search_term)
+
+        if not match_query:
+            return queryset.none()
+
+        return (
+            queryset.filter(pk__in=RawSQL(MATCH_SQL, (match_query,)))
+            .alias(rank=RawSQL(RANK_SQL, (match_query,)))
+            .order_by("rank", "-id")
+        )
+
+    def index_recipe(self, recipe):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [recipe.pk]
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+                "VALUES (%s, %s, %s, %s)",
+                [
+                    recipe.pk,
+                    *(getattr(recipe, column) for column in FTS_COLUMNS),
+                ],
+            )
+
+    def remove_recipe(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+                f"SELECT id, {', '.join(FTS_COLUMNS)} FROM recipes_recipe"
+            )
@@ -0,0 +1,168 @@
+"""Synthetic recipes, categories and authors generated with Faker.
+
+The same seed always generates the same data, so benchmark runs on
+different machines or commits compare like with like.
+"""
+
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.text import slugify
+from faker import Faker
+
+from recipes.cache import CATEGORIES_TAG, RECIPES_TAG, category_tag
+from recipes.models import Category, Recipe, User
+from recipes.search import get_search_engine
+from utils.cache import invalidate_tags
+
+SEED_USERNAME_PREFIX = "seed-author-"
+SEED_PASSWORD = "seed-password"
+BATCH_SIZE = 1000
+TEXT_POOL_SIZE = 500
+
+
+def make_faker(seed):
+    faker = Faker("pt_BR")
+    faker.seed_instance(seed)
+    return faker
+
+
+def seed_categories(count, seed=0):
+    """Returns `count` seeded categories, creating the missing ones."""
+    existing = list(Category.objects.order_by("id")[:count])
+    faker = make_faker(seed)
+    names = [f"{faker.word().capitalize()} {i}" for i in range(count)]
+
+    Category.objects.bulk_create(
+        Category(name=name) for name in names[len(existing) :]
+    )
+    return list(Category.objects.order_by("id")[:count])
+
+
+def seed_authors(count, seed=0):
+    """Returns `count` seeded authors, creating the missing ones. They all
+    share SEED_PASSWORD."""
+    usernames = [f"{SEED_USERNAME_PREFIX}{i}" for i in range(count)]
+    existing = set(
+        User.objects.filter(username__in=usernames).values_list(
+            "username", flat=True
+        )
+    )
+    faker = make_faker(seed)
+    password = make_password(SEED_PASSWORD)
+
+    User.objects.bulk_create(
+        User(
+            username=username,
+            first_name=faker.first_name(),
+            last_name=faker.last_name(),
+            email=f"{username}@example.com",
+            password=password,
+        )
+        for username in usernames
+        if username not in existing
+    )
+    return list(User.objects.filter(username__in=usernames).order_by("id"))
+
+
+def make_text_pool(faker, size=TEXT_POOL_SIZE):
+    """Descriptions and preparation steps the recipes pick from.
+
+    Generating paragraphs is the slowest part of Faker; recipes share a
+    pool of them so that only the titles are generated per recipe.
+    """
+    return [
+        (
+            faker.sentence(nb_words=12)[:165],
+            "\n".join(faker.paragraphs(nb=3)),
+        )
+        for _ in range(size)
+    ]
+
+
+def build_recipe(
+    faker, rng, index, categories, authors, texts, published_ratio
+):
+    title = faker.sentence(nb_words=4).rstrip(".")[:50]
+    description, preparation_steps = rng.choice(texts)
+    return Recipe(
+        title=title,
+        description=description,
+        # The index keeps slugs unique whatever the titles
+        slug=f"{slugify(title)[:40]}-{index}",
+        preparation_time=rng.randint(5, 180),
+        preparation_time_unit=rng.choice(("Minutos", "Horas")),
+        servings=rng.randint(1, 12),
+        servings_unit=rng.choice(("Porções", "Pedaços", "Pessoas")),
+        preparation_steps=preparation_steps,
+        is_published=rng.random() < published_ratio,
+        category=rng.choice(categories),
+        author=rng.choice(authors),
+    )
+
+
+def bulk_create_in_batches(objs, batch_size=BATCH_SIZE):
+    """Saves the model instances of the `objs` iterable with one
+    bulk_create() and transaction per batch, yielding each saved batch.
+
+    bulk_create() turns its argument into a list, so calling it once
+    with millions of objects would keep all of them in memory.
+    """
+    objs = iter(objs)
+    while batch := list(islice(objs, batch_size)):
+        with transaction.atomic():
+            yield type(batch[0]).objects.bulk_create(batch)
+
+
+def seed_recipes(
+    count,
+    categories=10,
+    authors=10,
+    seed=0,
+    published_ratio=0.9,
+    start=0,
+    batch_size=BATCH_SIZE,
+    progress=None,
+):
+    """Creates `count` recipes numbered from `start`, spread over pools of
+    `categories` categories and `authors` authors.
+
+    Calling it again with start set to the number of recipes already
+    seeded grows the dataset with the recipes a single larger call would
+    have created. `progress` is called with the number of recipes created
+    so far after each batch. The search index is rebuilt and the cached
+    pages invalidated at the end, as bulk_create skips the signals that
+    maintain them.
+    """
+    category_pool = seed_categories(categories, seed)
+    author_pool = seed_authors(authors, seed)
+    faker = make_faker(seed + start)
+    rng = random.Random(seed + start)
+    texts = make_text_pool(make_faker(seed))
+
+    recipes = (
+        build_recipe(
+            faker,
+            rng,
+            index,
+            category_pool,
+            author_pool,
+            texts,
+            published_ratio,
+        )
+        for index in range(start, start + count)
+    )
+    created = 0
+    for batch in bulk_create_in_batches(recipes, batch_size):
+        created += len(batch)
+        if progress is not None:
+            progress(created)
+
+    invalidate_tags(
+        RECIPES_TAG,
+        CATEGORIES_TAG,
+        *(category_tag(category.pk) for category in category_pool),
+    )
+    get_search_engine().rebuild()
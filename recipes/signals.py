@@ -0,0 +1,112 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from recipes.cache import CATEGORIES_TAG, RECIPES_TAG, category_tag, recipe_tag
+from recipes.models import Category, Recipe, get_published_count_changes
+from recipes.search import get_search_engine
+from recipes.slugs import forget_recipe_slug, remember_recipe_slug
+from utils.cache import invalidate_tags_on_commit
+
+
+def get_recipe_tags(recipe, previous=None):
+    tags = {recipe_tag(recipe.pk)}
+    states = [(recipe.is_published, recipe.category_id)]
+
+    if previous is not None:
+        states.append((previous["is_published"], previous["category_id"]))
+
+    # Drafts only show up in the author dashboard, which is never cached
+    for is_published, category_id in states:
+        if is_published:
+            tags.update({RECIPES_TAG, category_tag(category_id)})
+
+    return tags
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_previous_recipe_state(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+
+    if raw or instance.pk is None:
+        return
+
+    # Locked until Recipe.save() commits, so that concurrent saves of the
+    # recipe count its publication once in the published_count
+    instance._previous_state = (
+        Recipe.objects.filter(pk=instance.pk)
+        .select_for_update()
+        .values("is_published", "category_id", "slug")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_saved_recipe_caches(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_state", None)
+    invalidate_tags_on_commit(*get_recipe_tags(instance, previous))
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_deleted_recipe_caches(sender, instance, **kwargs):
+    invalidate_tags_on_commit(*get_recipe_tags(instance))
+
+
+@receiver(post_save, sender=Recipe)
+def update_saved_recipe_counts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, "_previous_state", None)
+    before = None
+    if previous is not None:
+        before = (previous["is_published"], previous["category_id"])
+
+    Category.objects.update_published_counts(
+        get_published_count_changes(
+            [(before, (instance.is_published, instance.category_id))]
+        )
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def update_deleted_recipe_counts(sender, instance, **kwargs):
+    # Sent in the transaction of the delete
+    Category.objects.update_published_counts(
+        get_published_count_changes(
+            [((instance.is_published, instance.category_id), None)]
+        )
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_slug(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous["slug"] != instance.slug:
+        forget_recipe_slug(previous["slug"])
+    remember_recipe_slug(instance.slug, instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_deleted_recipe_slug(sender, instance, **kwargs):
+    forget_recipe_slug(instance.slug)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    invalidate_tags_on_commit(CATEGORIES_TAG, category_tag(instance.pk))
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_engine().index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_index(sender, instance, **kwargs):
+    get_search_engine().remove_recipe(instance.pk)
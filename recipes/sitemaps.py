@@ -0,0 +1,228 @@
+"""Sitemaps of the published recipes, so crawlers don't have to walk the
+paginated lists (robots.txt keeps them out of the deep pages).
+
+/sitemap.xml is an index of chunks of RECIPE_SITEMAP_CHUNK_SIZE ids each:
+chunk n lists the published recipes with ids in
+[n * size + 1, (n + 1) * size]. The URL of a recipe never moves to
+another chunk, and new recipes only change the last one.
+
+A chunk is streamed from values_list().iterator() the first time, then
+served from the cache. Its key and ETag embed the latest updated_at and
+the number of published recipes in its id range, which the chunk gets
+with one aggregate on the primary key: any save (or delete) of a recipe
+in the range makes them stale. The index is cached until the RECIPES_TAG
+invalidation of recipes.signals.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.html import escape
+from django.views import View
+
+from recipes.cache import RECIPES_TAG
+from recipes.models import Recipe
+from utils.cache import get_tag_versions, set_page_validators
+
+SITEMAP_KEY_PREFIX = "sitemap"
+SITEMAP_CONTENT_TYPE = "application/xml; charset=utf-8"
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ITERATOR_CHUNK_SIZE = 2000
+# Placeholder that reverse() accepts as a slug, replaced by each slug
+SLUG_PLACEHOLDER = "__slug__"
+
+# Crawlers get the sitemaps instead of the paginated lists and the search:
+# numbered pages, the ?after=/?before= links of the cursor pagination
+# (utils.pagination) and the ?cursor= of the API
+ROBOTS_DISALLOW = (
+    "/recipes/search/",
+    "/*?page=",
+    "/*&page=",
+    "/*?after=",
+    "/*&after=",
+    "/*?before=",
+    "/*&before=",
+    "/*?cursor=",
+    "/*&cursor=",
+)
+
+
+def get_chunk_range(chunk, size):
+    return chunk * size + 1, (chunk + 1) * size
+
+
+def get_chunk_state(chunk, size):
+    """(latest updated_at, number of published recipes) of the chunk."""
+    state = Recipe.objects.filter(
+        pk__range=get_chunk_range(chunk, size)
+    ).aggregate(
+        lastmod=Max("updated_at"),
+        published=Count("id", filter=Q(is_published=True)),
+    )
+    return state["lastmod"], state["published"]
+
+
+def get_chunks(size):
+    """[(chunk, lastmod)] of the chunks with published recipes."""
+    return list(
+        Recipe.objects.filter(is_published=True)
+        .annotate(chunk=(F("id") - 1) / size)
+        .values("chunk")
+        .annotate(lastmod=Max("updated_at"))
+        .order_by("chunk")
+        .values_list("chunk", "lastmod")
+    )
+
+
+def get_base_url(request):
+    # Absolute URLs are built once per response, not once per recipe
+    return request.build_absolute_uri("/")[:-1]
+
+
+def make_sitemap_key(request, *parts):
+    signature = ":".join(str(part) for part in (get_base_url(request), *parts))
+    digest = hashlib.md5(signature.encode("utf-8")).hexdigest()
+    return f"{SITEMAP_KEY_PREFIX}:{digest}"
+
+
+def make_etag(key):
+    return f'"{key.rsplit(":", 1)[-1]}"'
+
+
+def iter_recipe_sitemap(base_url, chunk, size):
+    url = base_url + reverse(
+        "recipes:recipe", kwargs={"slug": SLUG_PLACEHOLDER}
+    )
+    rows = (
+        Recipe.objects.filter(
+            is_published=True, pk__range=get_chunk_range(chunk, size)
+        )
+        .order_by("id")
+        .values_list("slug", "updated_at")
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+    )
+    for slug, lastmod in rows:
+        loc = escape(url.replace(SLUG_PLACEHOLDER, slug))
+        yield (
+            f"<url><loc>{loc}</loc>"
+            f"<lastmod>{lastmod.isoformat()}</lastmod></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def make_sitemap_index(base_url, chunks):
+    entries = []
+    for chunk, lastmod in chunks:
+        loc = base_url + reverse("recipes:sitemap_recipes", args=(chunk,))
+        entries.append(
+            f"<sitemap><loc>{escape(loc)}</loc>"
+            f"<lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+        f"{''.join(entries)}</sitemapindex>\n"
+    )
+
+
+def cache_while_streaming(key, pieces, timeout):
+    """Yields the pieces, caching the whole body once all were sent (a
+    response interrupted midway isn't cached)."""
+    body = []
+    for piece in pieces:
+        body.append(piece)
+        yield piece
+    cache.set(key, "".join(body), timeout)
+
+
+def get_not_modified_response(request, etag, last_modified):
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        return None
+    return set_page_validators(response, etag, last_modified)
+
+
+class SitemapIndex(View):
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, *args, **kwargs):
+        size = settings.RECIPE_SITEMAP_CHUNK_SIZE
+        versions = get_tag_versions(RECIPES_TAG)
+        key = make_sitemap_key(request, "index", size, versions[RECIPES_TAG])
+
+        chunks = cache.get(key)
+        if chunks is None:
+            chunks = get_chunks(size)
+            cache.set(key, chunks, settings.RECIPE_SITEMAP_CACHE_TIMEOUT)
+        if not chunks:
+            raise Http404("No published recipes.")
+
+        etag = make_etag(key)
+        last_modified = max(lastmod for _, lastmod in chunks).timestamp()
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = HttpResponse(
+            make_sitemap_index(get_base_url(request), chunks),
+            content_type=SITEMAP_CONTENT_TYPE,
+        )
+        return set_page_validators(response, etag, last_modified)
+
+
+class RecipeSitemap(View):
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, *args, **kwargs):
+        chunk = self.kwargs["chunk"]
+        size = settings.RECIPE_SITEMAP_CHUNK_SIZE
+        lastmod, published = get_chunk_state(chunk, size)
+        if not published:
+            raise Http404("No published recipes in this sitemap.")
+
+        key = make_sitemap_key(
+            request, "recipes", size, chunk, lastmod.isoformat(), published
+        )
+        etag = make_etag(key)
+        last_modified = lastmod.timestamp()
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        content = cache.get(key)
+        if content is not None:
+            response = HttpResponse(content, content_type=SITEMAP_CONTENT_TYPE)
+        else:
+            response = StreamingHttpResponse(
+                cache_while_streaming(
+                    key,
+                    iter_recipe_sitemap(get_base_url(request), chunk, size),
+                    settings.RECIPE_SITEMAP_CACHE_TIMEOUT,
+                ),
+                content_type=SITEMAP_CONTENT_TYPE,
+            )
+        return set_page_validators(response, etag, last_modified)
+
+
+def robots_txt(request):
+    lines = [
+        "User-agent: *",
+        *(f"Disallow: {path}" for path in ROBOTS_DISALLOW),
+        "",
+        f"Sitemap: {request.build_absolute_uri(reverse('recipes:sitemap'))}",
+    ]
+    return HttpResponse(
+        "\n".join(lines) + "\n", content_type="text/plain; charset=utf-8"
+    )
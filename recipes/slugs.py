@@ -0,0 +1,87 @@
+"""Slug -> id resolution of the recipe detail URLs (/recipes/<slug>/).
+
+The detail views need the id of the recipe before running: it picks the
+tags of the cached page. resolve_recipe_slug() finds it in an LRU of
+RECIPE_SLUG_CACHE_SIZE slugs per process in front of the shared cache,
+so warm requests don't query the database at all.
+
+The signals (recipes.signals) keep the shared cache current, but the LRU
+of other processes can't be invalidated: the views check the slug of the
+recipe they load and call forget_recipe_slug() when it doesn't match.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import Recipe
+from utils.cache import LRUCache
+
+SLUG_KEY_PREFIX = "recipe-slug"
+
+recipe_slug_cache = LRUCache(settings.RECIPE_SLUG_CACHE_SIZE)
+
+
+def make_slug_key(slug):
+    return f"{SLUG_KEY_PREFIX}:{slug}"
+
+
+def get_recipe_id_by_slug(slug):
+    return Recipe.objects.filter(slug=slug).values_list("id", flat=True)
+
+
+def resolve_recipe_slug(slug):
+    """Id of the recipe with this slug (published or not), None if none
+    has it. Unknown slugs are not cached."""
+    if not settings.RECIPE_SLUG_CACHE_ENABLED:
+        return get_recipe_id_by_slug(slug).first()
+
+    pk = recipe_slug_cache.get(slug)
+    if pk is not None:
+        return pk
+
+    key = make_slug_key(slug)
+    pk = cache.get(key)
+    if pk is None:
+        pk = get_recipe_id_by_slug(slug).first()
+        if pk is None:
+            return None
+        cache.set(key, pk, settings.RECIPE_SLUG_CACHE_TIMEOUT)
+
+    recipe_slug_cache.set(slug, pk)
+    return pk
+
+
+async def aresolve_recipe_slug(slug):
+    """resolve_recipe_slug() with the async ORM and cache APIs."""
+    if not settings.RECIPE_SLUG_CACHE_ENABLED:
+        return await get_recipe_id_by_slug(slug).afirst()
+
+    pk = recipe_slug_cache.get(slug)
+    if pk is not None:
+        return pk
+
+    key = make_slug_key(slug)
+    pk = await cache.aget(key)
+    if pk is None:
+        pk = await get_recipe_id_by_slug(slug).afirst()
+        if pk is None:
+            return None
+        await cache.aset(key, pk, settings.RECIPE_SLUG_CACHE_TIMEOUT)
+
+    recipe_slug_cache.set(slug, pk)
+    return pk
+
+
+def remember_recipe_slug(slug, pk):
+    recipe_slug_cache.set(slug, pk)
+    cache.set(make_slug_key(slug), pk, settings.RECIPE_SLUG_CACHE_TIMEOUT)
+
+
+def forget_recipe_slug(slug):
+    recipe_slug_cache.delete(slug)
+    cache.delete(make_slug_key(slug))
+
+
+async def aforget_recipe_slug(slug):
+    recipe_slug_cache.delete(slug)
+    await cache.adelete(make_slug_key(slug))
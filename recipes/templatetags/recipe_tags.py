@@ -0,0 +1,93 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.template.loader import get_template
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+from recipes.images import (
+    COVER_SIZES,
+    get_cover_sources,
+    get_cover_variant_name,
+)
+from utils.cache import TwoTierCache
+
+register = template.Library()
+
+RECIPE_CARD_TEMPLATE = "recipes/partials/recipe.html"
+RECIPE_COVER_TEMPLATE = "recipes/partials/recipe_cover.html"
+
+recipe_card_cache = TwoTierCache(
+    max_size=settings.RECIPE_CARD_CACHE_SIZE,
+    timeout=settings.RECIPE_CARD_CACHE_TIMEOUT,
+)
+
+
+def make_recipe_card_key(recipe, is_detail_page):
+    # updated_at changes with every save of the recipe; the author and
+    # category values shown in the card are part of the key because editing
+    # them does not touch the recipe
+    author = recipe.author
+    category = recipe.category
+    related = (
+        (
+            (author.username, author.first_name, author.last_name)
+            if author is not None
+            else None
+        ),
+        (category.id, category.name) if category is not None else None,
+        translation.get_language(),
+    )
+    digest = hashlib.md5(repr(related).encode("utf-8")).hexdigest()
+    return (
+        f"recipe-card:{recipe.id}:{recipe.updated_at.timestamp()}:"
+        f"{int(is_detail_page)}:{digest}"
+    )
+
+
+def render_recipe_card(recipe, is_detail_page):
+    return get_template(RECIPE_CARD_TEMPLATE).render(
+        {"recipe": recipe, "is_detail_page": is_detail_page}
+    )
+
+
+@register.simple_tag(takes_context=True)
+def recipe_card(context, recipe):
+    """Renders recipes/partials/recipe.html, cached when
+    RECIPE_CARD_CACHE_ENABLED is on."""
+    is_detail_page = context.get("is_detail_page") is True
+
+    if not settings.RECIPE_CARD_CACHE_ENABLED:
+        return render_recipe_card(recipe, is_detail_page)
+
+    key = make_recipe_card_key(recipe, is_detail_page)
+    html = recipe_card_cache.get(key)
+
+    if html is None:
+        html = render_recipe_card(recipe, is_detail_page)
+        recipe_card_cache.set(key, str(html))
+
+    return mark_safe(html)
+
+
+@register.inclusion_tag(RECIPE_COVER_TEMPLATE, takes_context=True)
+def recipe_cover(context, recipe):
+    """Renders the cover with the srcset of its resized variants
+    (recipes.images), the original file while they do not exist."""
+    variant = "detail" if context.get("is_detail_page") is True else "list"
+    name = recipe.cover.name
+    sources = get_cover_sources(name, variant)
+
+    return {
+        "recipe": recipe,
+        "is_list": variant == "list",
+        "sources": sources,
+        "sizes": COVER_SIZES[variant],
+        "src": (
+            default_storage.url(get_cover_variant_name(name, variant))
+            if sources
+            else recipe.cover.url
+        ),
+    }
@@ -0,0 +1,271 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.api import API_MAX_LIMIT, DETAIL_FIELDS, LIST_FIELDS
+from recipes.models import Category, Recipe
+from recipes.search import load_search_engine
+
+from .test_recipe_base import RecipeTestBase
+from .test_recipe_search_inverted_index import ENGINE
+
+
+class RecipeApiTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.category = self.make_category(name="Cakes")
+        self.recipes = self.make_recipe_in_bulk(qtd=5, category=self.category)
+        self.draft = self.make_recipe(
+            title="Draft cake",
+            slug="draft",
+            is_published=False,
+            category_data={"name": "Drafts"},
+            author_data={"username": "draft"},
+        )
+        self.list_url = reverse("recipes:api_list")
+
+    def get_json(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return response, response.json()
+
+    def test_list_returns_the_published_recipes_newest_first(self):
+        response, data = self.get_json(self.list_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["id"] for recipe in data["results"]],
+            [recipe.pk for recipe in reversed(self.recipes)],
+        )
+        self.assertEqual(list(data["results"][0]), list(LIST_FIELDS))
+        self.assertEqual(data["results"][0]["category"], "Cakes")
+        self.assertIsNone(data["results"][0]["cover"])
+        self.assertIsNone(data["next"])
+
+    def test_the_body_is_compact(self):
+        response = self.client.get(self.list_url)
+
+        self.assertNotIn(b'", "', response.content)
+        self.assertNotIn(b'": ', response.content)
+
+    def test_cursor_pagination_walks_every_recipe_once(self):
+        url = f"{self.list_url}?limit=2&fields=id"
+        seen = []
+
+        while url:
+            _, data = self.get_json(url)
+            seen += [recipe["id"] for recipe in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(
+            seen, [recipe.pk for recipe in reversed(self.recipes)]
+        )
+
+    def test_the_next_page_keeps_the_query(self):
+        _, data = self.get_json(f"{self.list_url}?limit=2&fields=id,title")
+
+        self.assertIn("fields=id%2Ctitle", data["next"])
+        self.assertIn("limit=2", data["next"])
+
+    def test_field_selection(self):
+        _, data = self.get_json(f"{self.list_url}?fields=title,author")
+
+        self.assertEqual(
+            data["results"][0],
+            {"title": "Recipe 4", "author": self.recipes[0].author.username},
+        )
+
+    def test_invalid_parameters_are_400(self):
+        for query in (
+            "fields=title,password",
+            "limit=0",
+            f"limit={API_MAX_LIMIT + 1}",
+            "limit=many",
+            "cursor=%%%",
+        ):
+            response, data = self.get_json(f"{self.list_url}?{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("error", data)
+
+    def test_category_lists_its_published_recipes(self):
+        other = self.make_recipe(
+            slug="other",
+            category_data={"name": "Other"},
+            author_data={"username": "other"},
+        )
+
+        _, data = self.get_json(
+            reverse("recipes:api_category", args=(self.category.pk,))
+        )
+
+        ids = [recipe["id"] for recipe in data["results"]]
+        self.assertEqual(len(ids), 5)
+        self.assertNotIn(other.pk, ids)
+
+    def test_category_without_published_recipes_is_404(self):
+        for category_id in (self.draft.category_id, 1000):
+            response, data = self.get_json(
+                reverse("recipes:api_category", args=(category_id,))
+            )
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(data, {"error": "Category not found."})
+
+    def test_search_pages_through_the_results(self):
+        url = reverse("recipes:api_search")
+
+        _, first = self.get_json(f"{url}?q=recipe&limit=3&fields=id")
+        _, second = self.get_json(first["next"])
+        _, drafts = self.get_json(f"{url}?q=draft")
+        response, _ = self.get_json(url)
+
+        self.assertEqual(len(first["results"]), 3)
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+        self.assertEqual(drafts["results"], [])
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail(self):
+        recipe = self.recipes[0]
+
+        _, data = self.get_json(
+            reverse("recipes:api_recipe", kwargs={"pk": recipe.pk})
+        )
+        response, _ = self.get_json(
+            reverse("recipes:api_recipe", kwargs={"pk": self.draft.pk})
+        )
+
+        self.assertEqual(list(data), list(DETAIL_FIELDS))
+        self.assertEqual(data["preparation_steps"], recipe.preparation_steps)
+        self.assertEqual(response.status_code, 404)
+
+
+class RecipeApiConditionalGetTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe()
+        self.url = reverse("recipes:api_recipe", kwargs={"pk": self.recipe.pk})
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={"If-None-Match": etag})
+
+    def test_etags_are_strong(self):
+        response = self.client.get(self.url)
+
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]{32}"$')
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+    def test_unchanged_recipes_are_not_sent_again(self):
+        for url in (self.url, reverse("recipes:api_list")):
+            etag = self.client.get(url)["ETag"]
+
+            # Only the ids and updated_at of the page are read
+            with self.assertNumQueries(1):
+                response = self.revalidate(url, etag)
+
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_saving_the_recipe_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.recipe.title = "New title"
+        self.recipe.save()
+        response = self.revalidate(self.url, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["title"], "New title")
+
+    def test_unpublishing_a_recipe_changes_the_list_etag(self):
+        url = reverse("recipes:api_list")
+        etag = self.client.get(url)["ETag"]
+
+        Recipe.objects.filter(pk=self.recipe.pk).update(is_published=False)
+
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_renaming_the_category_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        category = Category.objects.get(pk=self.recipe.category_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = "Renamed"
+            category.save()
+
+        self.assertEqual(self.revalidate(self.url, etag).status_code, 200)
+
+    def test_renaming_the_author_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        get_user_model().objects.filter(pk=self.recipe.author_id).update(
+            username="renamed"
+        )
+        response = self.revalidate(self.url, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["author"], "renamed")
+
+    def test_the_etag_is_the_same_on_every_worker(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        # Another worker, or a restart, with an empty local cache
+        cache.clear()
+
+        self.assertEqual(self.revalidate(self.url, etag).status_code, 304)
+
+    def test_the_etag_depends_on_the_fields(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.revalidate(f"{self.url}?fields=id", etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"id": self.recipe.pk})
+
+
+class RecipeApiInvertedIndexSearchTest(RecipeTestBase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        settings_override = override_settings(
+            RECIPES_SEARCH_ENGINE=ENGINE,
+            RECIPES_SEARCH_INDEX_PATH=Path(tmp_dir.name) / "index.bin",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_search_engine.cache_clear()
+        self.addCleanup(load_search_engine.cache_clear)
+
+        super().setUp()
+        self.recipes = self.make_recipe_in_bulk(qtd=5)
+        self.url = reverse("recipes:api_search") + "?q=recipe&limit=2"
+
+    def walk(self, url):
+        pages = []
+        while url:
+            data = self.client.get(url).json()
+            pages.append([recipe["id"] for recipe in data["results"]])
+            url = data["next"]
+        return pages
+
+    def test_recipes_unpublished_behind_the_index_are_skipped(self):
+        hidden = self.walk(self.url)[0]
+        # update() skips the signals that keep the index current
+        Recipe.objects.filter(pk__in=hidden).update(is_published=False)
+
+        pages = self.walk(self.url)
+
+        # The first page is empty but the pagination goes on
+        self.assertEqual(pages[0], [])
+        self.assertEqual(
+            sorted(pk for page in pages for pk in page),
+            sorted(
+                recipe.pk
+                for recipe in self.recipes
+                if recipe.pk not in hidden
+            ),
+        )
@@ -0,0 +1,179 @@
+from io import StringIO
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import include, path, resolve, reverse
+
+from recipes import async_views
+from recipes.urls import make_urlpatterns
+
+from .test_recipe_base import RecipeTestBase
+
+COMMAND = "recipes.management.commands.benchmark_servers"
+
+# The site with the async recipe views, as served under ASGI
+urlpatterns = [
+    path("", include((make_urlpatterns(async_views), "recipes"))),
+    path("authors/", include("authors.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class RecipeAsyncViewsTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(title="Chocolate cake")
+        self.draft = self.make_recipe(
+            title="Draft",
+            slug="draft",
+            is_published=False,
+            category_data={"name": "Drafts"},
+            author_data={"username": "draft"},
+        )
+
+    def test_urls_resolve_to_the_async_views(self):
+        for name, view_class in (
+            ("home", async_views.RecipeListViewHome),
+            ("search", async_views.RecipeListViewSearch),
+            ("recipe", async_views.RecipeDetail),
+        ):
+            kwargs = {"slug": "cake"} if name == "recipe" else {}
+            func = resolve(reverse(f"recipes:{name}", kwargs=kwargs)).func
+
+            self.assertIs(func.view_class, view_class)
+            self.assertTrue(func.view_class.view_is_async)
+
+    async def test_home_renders_the_same_page_as_the_sync_view(self):
+        response = await self.async_client.get(reverse("recipes:home"))
+
+        with self.settings(ROOT_URLCONF="project.urls"):
+            expected = await self.async_client.get(reverse("recipes:home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "recipes/pages/home.html")
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(list(response.context["recipes"]), [self.recipe])
+
+    async def test_pages_past_the_last_show_the_last_page(self):
+        response = await self.async_client.get(
+            reverse("recipes:home") + "?page=99"
+        )
+
+        self.assertEqual(response.context["recipes"].number, 1)
+        self.assertEqual(list(response.context["recipes"]), [self.recipe])
+
+    async def test_category_lists_its_published_recipes(self):
+        response = await self.async_client.get(
+            reverse("recipes:category", args=(self.recipe.category_id,))
+        )
+
+        self.assertEqual(list(response.context["recipes"]), [self.recipe])
+        self.assertContains(response, "Category - Category | ")
+
+    async def test_category_without_published_recipes_is_404(self):
+        for category_id in (self.draft.category_id, 1000):
+            response = await self.async_client.get(
+                reverse("recipes:category", args=(category_id,))
+            )
+            self.assertEqual(response.status_code, 404)
+
+    async def test_search_finds_published_recipes(self):
+        url = reverse("recipes:search")
+
+        found = await self.async_client.get(url + "?q=choco")
+        draft = await self.async_client.get(url + "?q=draft")
+        empty = await self.async_client.get(url + "?q=")
+
+        self.assertEqual(list(found.context["recipes"]), [self.recipe])
+        self.assertContains(found, "Search for &#x27;choco&#x27;")
+        self.assertEqual(list(draft.context["recipes"]), [])
+        self.assertEqual(empty.status_code, 404)
+
+    async def test_detail_shows_published_recipes_only(self):
+        response = await self.async_client.get(self.recipe.get_absolute_url())
+        draft = await self.async_client.get(self.draft.get_absolute_url())
+
+        self.assertContains(response, "Chocolate cake")
+        self.assertTrue(response.context["is_detail_page"])
+        self.assertEqual(draft.status_code, 404)
+
+    async def test_id_urls_redirect_to_the_slug(self):
+        response = await self.async_client.get(
+            reverse("recipes:recipe_redirect", args=(self.recipe.pk,))
+        )
+        draft = await self.async_client.get(
+            reverse("recipes:recipe_redirect", args=(self.draft.pk,))
+        )
+
+        self.assertRedirects(
+            response,
+            self.recipe.get_absolute_url(),
+            status_code=301,
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(draft.status_code, 404)
+
+    def test_anonymous_pages_are_served_from_the_cache(self):
+        # assertNumQueries() can't be entered from the event loop
+        get = async_to_sync(self.async_client.get)
+        url = self.recipe.get_absolute_url()
+        get(url)
+
+        with self.assertNumQueries(0):
+            response = get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+
+    async def test_logged_in_users_bypass_the_cache(self):
+        await self.async_client.aforce_login(self.recipe.author)
+
+        response = await self.async_client.get(reverse("recipes:home"))
+
+        # Loaded before rendering, so the templates don't query it
+        self.assertEqual(response.context["user"], self.recipe.author)
+        self.assertFalse(response.has_header("ETag"))
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    async def test_server_timing_counts_the_async_queries(self):
+        with self.settings(PAGE_CACHE_ENABLED=False):
+            response = await self.async_client.get(reverse("recipes:home"))
+
+        self.assertRegex(
+            response["Server-Timing"], r'desc="[1-9]\d* queries"'
+        )
+
+
+# A static file server stands in for gunicorn and uvicorn
+@patch.dict(
+    f"{COMMAND}.SERVERS",
+    {"wsgi": ["http.server", "{port}", "--bind={host}"]},
+    clear=True,
+)
+class BenchmarkServersCommandTest(RecipeTestBase):
+    def test_each_concurrency_level_is_reported(self):
+        stdout = StringIO()
+
+        call_command(
+            "benchmark_servers",
+            "--path",
+            "/",
+            "--concurrency",
+            "1,2",
+            "--requests",
+            "4",
+            "--port",
+            "8799",
+            stdout=stdout,
+        )
+
+        self.assertIn("wsgi     1 clients", stdout.getvalue())
+        self.assertIn("wsgi     2 clients", stdout.getvalue())
+        self.assertIn("0 errors", stdout.getvalue())
+
+    def test_default_paths_need_published_recipes(self):
+        with self.assertRaisesMessage(CommandError, "seed_recipes"):
+            call_command("benchmark_servers", stdout=StringIO())
@@ -1,6 +1,10 @@
+from django.core.cache import cache
 from django.test import TestCase
 
 from recipes.models import Category, Recipe, User
+from recipes.search import get_search_engine
+from recipes.seeding import bulk_create_in_batches, seed_authors
+from recipes.slugs import recipe_slug_cache
 
 
 class RecipeMixin:
@@ -71,7 +75,43 @@ class RecipeMixin:
             recipes.append(recipe)
         return recipes
 
+    def make_recipe_in_bulk(
+        self, qtd=10, category=None, author=None, **kwargs
+    ):
+        """Fast make_recipe_in_batch() for large numbers of recipes.
+
+        The recipes are saved with bulk_create() and share one category
+        and author unless given; kwargs override the other fields.
+        """
+        fields = {
+            "description": "Recipe Description",
+            "preparation_time": 10,
+            "preparation_time_unit": "Minutos",
+            "servings": 5,
+            "servings_unit": "Porções",
+            "preparation_steps": "Recipe Preparation Steps",
+            "is_published": True,
+            **kwargs,
+            "category": category or self.make_category(),
+            "author": author or seed_authors(1)[0],
+        }
+        recipes = [
+            recipe
+            for batch in bulk_create_in_batches(
+                Recipe(title=f"Recipe {i}", slug=f"recipe-slug-{i}", **fields)
+                for i in range(qtd)
+            )
+            for recipe in batch
+        ]
+        # bulk_create() skips the signals that index the recipes
+        get_search_engine().rebuild()
+        return recipes
+
 
 class RecipeTestBase(TestCase, RecipeMixin):
     def setUp(self):
+        # Cached counts and pages would leak between tests (the database is
+        # rolled back without firing the invalidation signals)
+        cache.clear()
+        recipe_slug_cache.clear()
         return super().setUp()
@@ -0,0 +1,127 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from recipes.benchmarks import (
+    ENDPOINTS,
+    benchmark_endpoints,
+    benchmark_slug_resolver,
+    check_budget,
+    run_benchmarks,
+)
+from recipes.models import Recipe
+from recipes.seeding import seed_recipes
+
+COMMAND = "recipes.management.commands.benchmark_recipes"
+
+
+class RecipeBenchmarksTest(TestCase):
+    def test_every_endpoint_is_measured(self):
+        seed_recipes(10, published_ratio=0.5)
+
+        results = benchmark_endpoints(rounds=2)
+
+        self.assertEqual(list(results), list(ENDPOINTS))
+        for result in results.values():
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["requests"], 2)
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kib"], 0)
+
+    def test_the_slug_resolver_saves_the_id_query(self):
+        seed_recipes(10)
+
+        results = benchmark_slug_resolver(rounds=2)
+
+        queries = {
+            group: {name: result["queries"] for name, result in row.items()}
+            for group, row in results.items()
+        }
+        self.assertEqual(
+            queries,
+            {
+                "page_cache": {"resolver": 0, "no_resolver": 1},
+                "no_page_cache": {"resolver": 1, "no_resolver": 2},
+            },
+        )
+
+    def test_the_dataset_grows_with_each_size(self):
+        sizes = []
+
+        results = run_benchmarks(
+            [20, 10], rounds=1, progress=lambda size, _: sizes.append(size)
+        )
+
+        self.assertEqual(sizes, [10, 20])
+        self.assertEqual(list(results["sizes"]), ["10", "20"])
+        self.assertEqual(Recipe.objects.count(), 20)
+
+    def test_results_over_the_budget_are_reported(self):
+        results = {
+            "sizes": {
+                "100": {
+                    "home": {"status": 200, "queries": 5, "p50_ms": 1.0},
+                    "detail": {"status": 404, "queries": 1, "p50_ms": 1.0},
+                }
+            }
+        }
+
+        violations = check_budget(
+            results, {"home": {"queries": 4, "p50_ms": 10}}
+        )
+
+        self.assertEqual(
+            violations,
+            [
+                "home (100 recipes): queries 5 > 4",
+                "detail (100 recipes): status 404",
+            ],
+        )
+
+
+# The test database is already set up and rolled back by the TestCase
+@patch(f"{COMMAND}.teardown_databases")
+@patch(f"{COMMAND}.setup_databases")
+class BenchmarkRecipesCommandTest(TestCase):
+    def call(self, *args):
+        stdout = StringIO()
+        call_command(
+            "benchmark_recipes",
+            "--sizes",
+            "10",
+            "--rounds",
+            "1",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_results_are_saved_as_json(self, setup, teardown):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+
+            stdout = self.call("--output", str(output))
+            results = json.loads(output.read_text())
+
+        self.assertIn("Within the budget.", stdout)
+        self.assertEqual(list(results["sizes"]["10"]), list(ENDPOINTS))
+        setup.assert_called_once()
+        teardown.assert_called_once()
+
+    def test_fails_when_the_budget_is_exceeded(self, setup, teardown):
+        with tempfile.TemporaryDirectory() as directory:
+            budget = Path(directory) / "budget.json"
+            budget.write_text(json.dumps({"detail": {"queries": 0}}))
+
+            with self.assertRaisesMessage(
+                CommandError, "detail (10 recipes): queries"
+            ):
+                self.call("--budget", str(budget))
+
+        teardown.assert_called_once()
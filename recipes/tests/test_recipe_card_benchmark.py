@@ -0,0 +1,51 @@
+from statistics import median
+from time import perf_counter
+
+import pytest
+from django.template.loader import render_to_string
+
+from recipes.models import Recipe
+from recipes.templatetags import recipe_tags
+
+from .test_recipe_base import RecipeTestBase
+
+PAGE_SIZES = (6, 24, 96)
+ROUNDS = 20
+
+
+@pytest.mark.slow
+class RecipeCardBenchmarkTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        recipe_tags.recipe_card_cache.clear()
+        self.make_recipe_in_bulk(qtd=max(PAGE_SIZES))
+        self.recipes = list(Recipe.objects.published().order_by("-id"))
+
+    def render_page(self, size):
+        start = perf_counter()
+        html = render_to_string(
+            "recipes/pages/home.html", {"recipes": self.recipes[:size]}
+        )
+        return html, perf_counter() - start
+
+    def time_page(self, size):
+        return median(self.render_page(size)[1] for _ in range(ROUNDS))
+
+    def test_recipe_card_cache_render_time(self):
+        for size in PAGE_SIZES:
+            with self.settings(RECIPE_CARD_CACHE_ENABLED=False):
+                uncached_html, _ = self.render_page(size)
+                uncached = self.time_page(size)
+
+            recipe_tags.recipe_card_cache.clear()
+            cached_html, cold = self.render_page(size)
+            warm = self.time_page(size)
+
+            self.assertEqual(cached_html, uncached_html)
+            self.assertLess(
+                warm,
+                uncached,
+                f"{size} cards: {uncached * 1000:.2f} ms uncached, "
+                f"{cold * 1000:.2f} ms cold cache, "
+                f"{warm * 1000:.2f} ms warm cache",
+            )
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.templatetags import recipe_tags
+
+from .test_recipe_base import RecipeTestBase
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class RecipeCardCacheTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        recipe_tags.recipe_card_cache.clear()
+        self.recipe = self.make_recipe()
+
+    def get_home(self):
+        return self.client.get(reverse("recipes:home")).content.decode("utf-8")
+
+    def test_cached_card_is_the_same_as_the_rendered_one(self):
+        with self.settings(RECIPE_CARD_CACHE_ENABLED=False):
+            uncached = self.get_home()
+
+        self.assertEqual(self.get_home(), uncached)
+        self.assertEqual(self.get_home(), uncached)
+
+    def test_card_is_rendered_once(self):
+        with patch.object(
+            recipe_tags,
+            "render_recipe_card",
+            wraps=recipe_tags.render_recipe_card,
+        ) as render_recipe_card:
+            self.get_home()
+            self.get_home()
+
+        self.assertEqual(render_recipe_card.call_count, 1)
+
+    def test_list_and_detail_cards_are_cached_separately(self):
+        self.get_home()
+        response = self.client.get(self.recipe.get_absolute_url())
+
+        self.assertIn(
+            "Recipe Preparation Steps", response.content.decode("utf-8")
+        )
+
+    def test_saving_the_recipe_renders_a_new_card(self):
+        self.get_home()
+
+        self.recipe.title = "Updated title"
+        self.recipe.save()
+
+        self.assertIn("Updated title", self.get_home())
+
+    def test_related_changes_render_a_new_card(self):
+        self.get_home()
+
+        self.recipe.category.name = "Renamed category"
+        self.recipe.category.save()
+        self.recipe.author.first_name = "Renamed"
+        self.recipe.author.save()
+
+        content = self.get_home()
+        self.assertIn("Renamed category", content)
+        self.assertIn("Renamed name", content)
+
+    def test_card_key_depends_on_recipe_updated_at(self):
+        recipe = Recipe.objects.published().get()
+        key = recipe_tags.make_recipe_card_key(recipe, False)
+
+        self.assertNotEqual(key, recipe_tags.make_recipe_card_key(recipe, True))
+
+        recipe.save()
+        recipe = Recipe.objects.published().get()
+        self.assertNotEqual(
+            key, recipe_tags.make_recipe_card_key(recipe, False)
+        )
@@ -0,0 +1,44 @@
+import pytest
+from django.urls import reverse
+
+from utils.benchmark import format_measurement, measure
+
+from .test_recipe_base import RecipeTestBase
+
+BENCHMARK_RECIPES = 50_000
+
+
+@pytest.mark.slow
+class RecipeCategoryBenchmarkTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.category = self.make_category(name="Benchmark")
+        self.make_recipe_in_bulk(
+            qtd=BENCHMARK_RECIPES,
+            category=self.category,
+            preparation_steps="Recipe Preparation Steps " * 20,
+        )
+
+    def get_category_page(self):
+        response = self.client.get(
+            reverse("recipes:category", args=(self.category.id,)) + "?page=2"
+        )
+        response.content.decode("utf-8")
+        return response
+
+    def test_category_page_with_50k_recipes(self):
+        response, measurement = measure(self.get_category_page)
+        summary = format_measurement(
+            f"category page ({BENCHMARK_RECIPES} recipes)", measurement
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["recipes"].paginator.count, BENCHMARK_RECIPES
+        )
+        # Category with its published_count and the page itself
+        self.assertEqual(measurement["queries"], 2, summary)
+        # Loading every recipe of the category used to take tens of MiB
+        self.assertLess(
+            measurement["peak_memory_bytes"], 5 * 1024 * 1024, summary
+        )
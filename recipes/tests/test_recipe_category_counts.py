@@ -0,0 +1,178 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+
+from recipes.models import Category, Recipe
+from recipes.transfer import import_recipes
+
+from .test_recipe_base import RecipeTestBase
+from .test_recipe_slugs import make_titled_recipe
+from .test_recipe_transfer import make_row, to_jsonl
+
+
+class CategoryPublishedCountTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(category_data={"name": "Cakes"})
+        self.cakes = self.recipe.category
+        self.pies = self.make_category(name="Pies")
+
+    def assertCounts(self, **counts):
+        self.assertEqual(
+            dict(Category.objects.values_list("name", "published_count")),
+            {name.title(): count for name, count in counts.items()},
+        )
+
+    def test_published_recipes_are_counted_when_created(self):
+        self.assertCounts(cakes=1, pies=0)
+
+    def test_publishing_and_unpublishing_update_the_count(self):
+        self.recipe.is_published = False
+        self.recipe.save()
+        self.assertCounts(cakes=0, pies=0)
+
+        self.recipe.is_published = True
+        self.recipe.save()
+        self.assertCounts(cakes=1, pies=0)
+
+    def test_moving_a_recipe_moves_its_count(self):
+        self.recipe.category = self.pies
+        self.recipe.save()
+        self.assertCounts(cakes=0, pies=1)
+
+        self.recipe.category = None
+        self.recipe.save()
+        self.assertCounts(cakes=0, pies=0)
+
+    def test_other_changes_leave_the_count_alone(self):
+        self.recipe.title = "Cheesecake"
+        self.recipe.save()
+
+        self.assertCounts(cakes=1, pies=0)
+
+    def test_deleted_recipes_are_uncounted(self):
+        self.recipe.delete()
+
+        self.assertCounts(cakes=0, pies=0)
+
+    def test_saving_a_stale_category_keeps_the_count(self):
+        stale = Category.objects.get(pk=self.pies.pk)
+        self.recipe.category = self.pies
+        self.recipe.save()
+
+        stale.name = "Tarts"
+        stale.save()
+
+        self.assertCounts(cakes=0, tarts=1)
+        self.assertEqual(Category.objects.get(pk=stale.pk).name, "Tarts")
+
+    def test_failed_saves_leave_the_count_alone(self):
+        other = Recipe(
+            title="Other",
+            slug=self.recipe.slug,
+            category=self.pies,
+            description="Description",
+            preparation_time=1,
+            preparation_time_unit="Minutos",
+            servings=1,
+            servings_unit="Porções",
+            preparation_steps="Steps",
+            is_published=True,
+        )
+
+        with self.assertRaises(IntegrityError):
+            other.save()
+
+        self.assertCounts(cakes=1, pies=0)
+
+    def test_admin_list_editable_updates_the_count(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser("admin", "", "admin")
+        )
+
+        response = self.client.post(
+            reverse("admin:recipes_recipe_changelist"),
+            {
+                "form-TOTAL_FORMS": 1,
+                "form-INITIAL_FORMS": 1,
+                "form-MIN_NUM_FORMS": 0,
+                "form-MAX_NUM_FORMS": 1000,
+                "form-0-id": self.recipe.pk,
+                "form-0-is_published": "",
+                "_save": "Save",
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertCounts(cakes=0, pies=0)
+
+    def test_bulk_created_recipes_are_counted(self):
+        self.make_recipe_in_bulk(qtd=3, category=self.pies)
+        drafts = [make_titled_recipe("Draft", category=self.pies)]
+        drafts.append(make_titled_recipe("Draft", category=self.pies))
+        for draft in drafts:
+            draft.is_published = False
+        Recipe.objects.bulk_create(drafts)
+
+        self.assertCounts(cakes=1, pies=3)
+
+    def test_imported_recipes_are_counted(self):
+        import_recipes(
+            to_jsonl(
+                make_row(slug="new-pie", category="Pies"),
+                make_row(slug=self.recipe.slug, category="Pies"),
+                make_row(slug="draft", category="Cakes", is_published=False),
+            )
+        )
+
+        self.assertCounts(cakes=0, pies=2)
+
+
+class CategoryCountReconciliationTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipes = self.make_recipe_in_bulk(qtd=8)
+        self.category = self.recipes[0].category
+        # update() skips the signals that keep the counter
+        Recipe.objects.filter(
+            pk__in=[recipe.pk for recipe in self.recipes[:2]]
+        ).update(is_published=False)
+
+    def test_the_drift_is_reported_and_repaired(self):
+        drift = Category.objects.reconcile_published_counts()
+
+        self.category.refresh_from_db()
+        self.assertEqual(drift, [(self.category.pk, "Category", 8, 6)])
+        self.assertEqual(self.category.published_count, 6)
+        self.assertEqual(Category.objects.reconcile_published_counts(), [])
+
+    def test_the_command_repairs_the_counts(self):
+        dry_run = StringIO()
+        call_command("reconcile_category_counts", "--dry-run", stdout=dry_run)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.published_count, 8)
+
+        output = StringIO()
+        call_command("reconcile_category_counts", stdout=output)
+        self.category.refresh_from_db()
+
+        self.assertIn("Category", dry_run.getvalue())
+        self.assertIn("8 -> 6", dry_run.getvalue())
+        self.assertIn("1 categories to repair", dry_run.getvalue())
+        self.assertIn("1 categories repaired", output.getvalue())
+        self.assertEqual(self.category.published_count, 6)
+
+    def test_the_category_pages_paginate_with_the_repaired_count(self):
+        url = reverse("recipes:category", args=(self.category.pk,))
+        self.assertEqual(
+            self.client.get(url).context["recipes"].paginator.count, 8
+        )
+
+        call_command("reconcile_category_counts", stdout=StringIO())
+
+        self.assertEqual(
+            self.client.get(url).context["recipes"].paginator.count, 6
+        )
@@ -38,9 +38,7 @@ class RecipeCategoryViewTest(RecipeTestBase):
         """Test recipe is_published False dont show"""
         # Need a recipe for this test
         recipe = self.make_recipe(is_published=False)
-        response = self.client.get(
-            reverse("recipes:recipe", kwargs={"pk": recipe.category.id})
-        )
+        response = self.client.get(recipe.get_absolute_url())
 
         self.assertEqual(response.status_code, 404)
 
@@ -84,3 +82,48 @@ class RecipeCategoryViewTest(RecipeTestBase):
             )
             recipes = response.context["recipes"]
             self.assertEqual(len(recipes), 6)
+
+    def test_recipe_category_does_not_query_author_and_category_per_recipe(
+        self,
+    ):
+        category = self.make_category(name="Category Teste")
+        recipes = self.make_recipe_in_batch(qtd=9)
+        for recipe in recipes:
+            recipe.category = category
+            recipe.save()
+
+        with patch("recipes.views.PER_PAGE", new=9):
+            response = self.client.get(
+                reverse("recipes:category", args=(category.id,))
+            )
+            with self.assertNumQueries(0):
+                response.content.decode("utf-8")
+                for recipe in response.context["recipes"]:
+                    str(recipe.author.username)
+                    str(recipe.category.name)
+
+    def test_recipe_category_returns_404_if_only_unpublished_recipes(self):
+        recipe = self.make_recipe(is_published=False)
+        response = self.client.get(
+            reverse("recipes:category", args=(recipe.category.id,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_recipe_category_is_in_context_and_title(self):
+        recipe = self.make_recipe(category_data={"name": "Sobremesas"})
+        response = self.client.get(
+            reverse("recipes:category", args=(recipe.category.id,))
+        )
+
+        self.assertEqual(response.context["category"], recipe.category)
+        self.assertIn("Sobremesas - Category", response.content.decode("utf-8"))
+
+    def test_recipe_category_only_loads_the_current_page(self):
+        recipe = self.make_recipe()
+
+        # Category with its published_count (no COUNT(*)) and the page
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("recipes:category", args=(recipe.category.id,))
+            )
+            response.content.decode("utf-8")
@@ -0,0 +1,202 @@
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from recipes.images import (
+    COVER_VARIANTS,
+    generate_cover_variants,
+    get_cover_variant_name,
+    get_cover_variant_names,
+)
+from recipes.templatetags import recipe_tags
+
+from .test_recipe_base import RecipeTestBase
+
+
+def make_image_file(name="cover.png", size=(2400, 1200), mode="RGBA"):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 100, 50, 255)[: len(mode)]).save(
+        buffer, "PNG"
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+class RecipeCoverTestBase(RecipeTestBase):
+    """Stores the uploaded files in a temporary MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        recipe_tags.recipe_card_cache.clear()
+
+    def make_recipe_with_cover(self, cover=None, **kwargs):
+        recipe = self.make_recipe(**kwargs)
+        recipe.cover = cover or make_image_file()
+        recipe.save()
+        return recipe
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class RecipeCoverImagesTest(RecipeCoverTestBase):
+    def test_variants_are_written_next_to_the_original(self):
+        recipe = self.make_recipe_with_cover()
+        name = recipe.cover.name
+
+        written = generate_cover_variants(name)
+
+        self.assertEqual(
+            sorted(written), sorted(get_cover_variant_names(name))
+        )
+        self.assertEqual(
+            get_cover_variant_name(name, "list", 2, "webp").rsplit("/", 1)[0],
+            name.rsplit("/", 1)[0],
+        )
+        for variant, width in COVER_VARIANTS.items():
+            for density in (1, 2):
+                for extension in ("webp", "jpg"):
+                    variant_name = get_cover_variant_name(
+                        name, variant, density, extension
+                    )
+                    with default_storage.open(variant_name) as file:
+                        image = Image.open(file)
+                        self.assertEqual(image.width, width * density)
+                        self.assertEqual(image.height, width * density // 2)
+
+    def test_small_covers_are_not_upscaled(self):
+        recipe = self.make_recipe()
+        recipe.cover = make_image_file(size=(300, 200), mode="RGB")
+        recipe.save()
+
+        generate_cover_variants(recipe.cover.name)
+
+        name = get_cover_variant_name(recipe.cover.name, "detail", 2)
+        with default_storage.open(name) as file:
+            self.assertEqual(Image.open(file).size, (300, 200))
+
+    def test_existing_variants_are_kept_unless_forced(self):
+        name = self.make_recipe_with_cover().cover.name
+        generate_cover_variants(name)
+
+        self.assertEqual(generate_cover_variants(name), [])
+        self.assertEqual(
+            len(generate_cover_variants(name, force=True)),
+            len(get_cover_variant_names(name)),
+        )
+
+    def test_card_renders_srcset_of_the_variants(self):
+        recipe = self.make_recipe_with_cover()
+        generate_cover_variants(recipe.cover.name)
+
+        content = self.client.get(reverse("recipes:home")).content.decode()
+        list_webp = default_storage.url(
+            get_cover_variant_name(recipe.cover.name, "list", 1, "webp")
+        )
+
+        self.assertIn('<source type="image/webp"', content)
+        self.assertIn(f"{list_webp} 640w", content)
+        self.assertIn("1280w", content)
+        self.assertIn('sizes="(max-width: 600px) 100vw, 640px"', content)
+        self.assertNotIn(recipe.cover.url + '"', content)
+
+    def test_detail_page_uses_the_detail_variant(self):
+        recipe = self.make_recipe_with_cover()
+        generate_cover_variants(recipe.cover.name)
+
+        content = self.client.get(recipe.get_absolute_url()).content.decode()
+
+        self.assertIn("1024w", content)
+        self.assertIn("2048w", content)
+
+    def test_srcset_lists_the_real_widths_of_small_covers(self):
+        recipe = self.make_recipe_with_cover(
+            cover=make_image_file(size=(800, 400))
+        )
+        generate_cover_variants(recipe.cover.name)
+
+        content = self.client.get(reverse("recipes:home")).content.decode()
+        list_2x = default_storage.url(
+            get_cover_variant_name(recipe.cover.name, "list", 2, "jpg")
+        )
+
+        self.assertIn(f"{list_2x} 800w", content)
+        self.assertNotIn("1280w", content)
+
+        detail = self.client.get(recipe.get_absolute_url()).content.decode()
+        detail_1x = default_storage.url(
+            get_cover_variant_name(recipe.cover.name, "detail", 1, "jpg")
+        )
+
+        # Both densities of the detail variant are 800px wide
+        self.assertIn(f'srcset="{detail_1x} 800w"', detail)
+        self.assertNotIn("1024w", detail)
+
+    def test_rendering_reads_the_widths_recorded_at_generation(self):
+        recipe = self.make_recipe_with_cover(
+            cover=make_image_file(size=(800, 400))
+        )
+        generate_cover_variants(recipe.cover.name)
+        url = reverse("recipes:home")
+
+        with patch("recipes.images.Image.open", side_effect=AssertionError):
+            self.assertIn("800w", self.client.get(url).content.decode())
+
+        # Another cache: the files are read once, then recorded again
+        cache.clear()
+        recipe_tags.recipe_card_cache.clear()
+        self.assertIn("800w", self.client.get(url).content.decode())
+        with patch("recipes.images.Image.open", side_effect=AssertionError):
+            recipe_tags.recipe_card_cache.clear()
+            self.assertIn("800w", self.client.get(url).content.decode())
+
+    def test_card_falls_back_to_the_original_without_variants(self):
+        recipe = self.make_recipe_with_cover()
+
+        content = self.client.get(reverse("recipes:home")).content.decode()
+
+        self.assertIn(f'src="{recipe.cover.url}"', content)
+        self.assertNotIn("srcset", content)
+
+    def test_command_backfills_every_cover(self):
+        names = [
+            self.make_recipe_with_cover(
+                slug=f"slug-{i}",
+                author_data={"username": f"user{i}"},
+            ).cover.name
+            for i in range(3)
+        ]
+        stdout = StringIO()
+
+        call_command("generate_cover_variants", workers=2, stdout=stdout)
+
+        for name in names:
+            for variant_name in get_cover_variant_names(name):
+                self.assertTrue(default_storage.exists(variant_name))
+        self.assertIn("3 covers, 24 variants written", stdout.getvalue())
+
+    @override_settings(PAGE_CACHE_ENABLED=True, RECIPE_CARD_CACHE_ENABLED=True)
+    def test_command_refreshes_the_cached_pages_and_cards(self):
+        recipe = self.make_recipe_with_cover()
+        url = reverse("recipes:home")
+        self.assertNotIn("srcset", self.client.get(url).content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "generate_cover_variants", workers=1, stdout=StringIO()
+            )
+
+        updated_at = recipe.updated_at
+        recipe.refresh_from_db()
+        self.assertGreater(recipe.updated_at, updated_at)
+        self.assertIn("srcset", self.client.get(url).content.decode())
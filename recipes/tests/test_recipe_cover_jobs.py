@@ -0,0 +1,217 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from recipes import jobs
+from recipes.images import get_cover_variant_names, process_uploaded_cover
+from recipes.models import CoverJob, Recipe
+
+from .test_recipe_cover_images import RecipeCoverTestBase, make_image_file
+
+
+def make_phone_photo():
+    # 300x200 JPEG taken sideways: displayed 200x300 (EXIF orientation 6)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = "Phone maker"
+    buffer = BytesIO()
+    Image.new("RGB", (300, 200), (10, 20, 30)).save(
+        buffer, "JPEG", exif=exif
+    )
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+
+
+@override_settings(
+    RECIPE_COVER_JOB_RETRY_DELAY=0, RECIPE_COVER_JOB_MAX_ATTEMPTS=2
+)
+class RecipeCoverJobsTest(RecipeCoverTestBase):
+    def make_cover_job(self, cover=None, **kwargs):
+        recipe = self.make_recipe_with_cover(
+            cover=cover, is_published=False, **kwargs
+        )
+        return recipe, jobs.enqueue_cover_job(recipe)
+
+    def test_dashboard_queues_the_cover_and_redirects(self):
+        self.make_author(username="my_user", password="my_pass")
+        self.client.login(username="my_user", password="my_pass")
+
+        response = self.client.post(
+            reverse("authors:dashboard_recipe_new"),
+            {
+                "title": "Recipe with a cover",
+                "description": "Description",
+                "preparation_time": 10,
+                "preparation_time_unit": "Minutos",
+                "servings": 2,
+                "servings_unit": "Porções",
+                "preparation_steps": "Steps",
+                "cover": make_image_file(),
+            },
+        )
+
+        recipe = Recipe.objects.get(title="Recipe with a cover")
+        self.assertRedirects(response, reverse("authors:dashboard"))
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.PENDING)
+        self.assertEqual(recipe.cover_jobs.get().cover, recipe.cover.name)
+        variant_name = get_cover_variant_names(recipe.cover.name)[0]
+        self.assertFalse(default_storage.exists(variant_name))
+
+        response = self.client.get(reverse("authors:dashboard"))
+        self.assertContains(response, "(Cover: Processing)")
+
+    def test_worker_processes_the_upload_in_process(self):
+        recipe, job = self.make_cover_job(cover=make_phone_photo())
+        upload = recipe.cover.name
+
+        self.assertEqual(jobs.run_pending_cover_jobs(), (1, 0))
+
+        recipe.refresh_from_db()
+        job.refresh_from_db()
+        self.assertEqual(job.status, CoverJob.Status.DONE)
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+        self.assertNotEqual(recipe.cover.name, upload)
+        self.assertFalse(default_storage.exists(upload))
+        for name in get_cover_variant_names(recipe.cover.name):
+            self.assertTrue(default_storage.exists(name), name)
+
+        with default_storage.open(recipe.cover.name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.size, (200, 300))
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_large_uploads_are_resized(self):
+        recipe, _ = self.make_cover_job()
+
+        with self.settings(RECIPE_COVER_MAX_SIZE=1000):
+            jobs.run_pending_cover_jobs()
+
+        recipe.refresh_from_db()
+        with default_storage.open(recipe.cover.name) as file:
+            self.assertEqual(Image.open(file).size, (1000, 500))
+
+    def test_failed_jobs_are_retried_then_marked_as_failed(self):
+        recipe, job = self.make_cover_job()
+
+        with patch.object(
+            jobs, "process_uploaded_cover", side_effect=OSError("broken")
+        ):
+            self.assertEqual(jobs.run_pending_cover_jobs(limit=1), (0, 1))
+            job.refresh_from_db()
+            self.assertEqual(job.status, CoverJob.Status.PENDING)
+            self.assertEqual(job.attempts, 1)
+            self.assertEqual(job.last_error, "OSError: broken")
+
+            self.assertEqual(jobs.run_pending_cover_jobs(limit=1), (0, 1))
+
+        job.refresh_from_db()
+        recipe.refresh_from_db()
+        self.assertEqual(job.status, CoverJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.FAILED)
+        self.assertEqual(jobs.run_pending_cover_jobs(), (0, 0))
+
+    def test_retries_wait_for_the_retry_delay(self):
+        _, job = self.make_cover_job()
+
+        with self.settings(RECIPE_COVER_JOB_RETRY_DELAY=60):
+            with patch.object(
+                jobs, "process_uploaded_cover", side_effect=OSError
+            ):
+                jobs.run_pending_cover_jobs()
+
+        job.refresh_from_db()
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(jobs.run_pending_cover_jobs(), (0, 0))
+
+    def test_a_job_is_claimed_only_once(self):
+        _, job = self.make_cover_job()
+        stale_copy = CoverJob.objects.get(pk=job.pk)
+
+        self.assertTrue(jobs.claim_cover_job(job))
+        self.assertFalse(jobs.claim_cover_job(stale_copy))
+        self.assertEqual(jobs.run_pending_cover_jobs(), (0, 0))
+
+    def test_jobs_of_a_crashed_worker_are_run_again(self):
+        recipe, job = self.make_cover_job()
+        jobs.claim_cover_job(job)
+        CoverJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(jobs.run_pending_cover_jobs(), (1, 0))
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+
+    def test_job_does_not_overwrite_a_newer_cover(self):
+        recipe, _ = self.make_cover_job()
+        recipe.cover = make_image_file("new.png")
+        recipe.save()
+        new_cover = recipe.cover.name
+
+        self.assertEqual(jobs.run_pending_cover_jobs(), (1, 0))
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover.name, new_cover)
+
+    def assertJobDropped(self, job, result, error=None):
+        def delete_recipe(job):
+            Recipe.objects.filter(pk=job.recipe_id).delete()
+            if error is not None:
+                raise error
+
+        with patch.object(
+            jobs, "process_cover_job", side_effect=delete_recipe
+        ):
+            self.assertEqual(jobs.run_pending_cover_jobs(), result)
+
+        self.assertFalse(CoverJob.objects.filter(pk=job.pk).exists())
+        self.assertFalse(default_storage.exists(job.cover))
+
+    def test_jobs_of_a_recipe_deleted_while_they_run_are_dropped(self):
+        _, job = self.make_cover_job()
+
+        self.assertJobDropped(job, (1, 0))
+
+    def test_failed_jobs_of_a_deleted_recipe_are_dropped(self):
+        _, job = self.make_cover_job()
+
+        self.assertJobDropped(job, (0, 1), OSError("broken"))
+
+    def test_files_of_a_replaced_cover_are_deleted(self):
+        recipe, job = self.make_cover_job()
+        recipe.cover = make_image_file("new.png")
+        recipe.save()
+        written = []
+
+        def process(name):
+            written.append(process_uploaded_cover(name))
+            return written[-1]
+
+        with patch.object(
+            jobs, "process_uploaded_cover", side_effect=process
+        ):
+            self.assertEqual(jobs.run_pending_cover_jobs(), (1, 0))
+
+        processed = written[0]
+        deleted = (job.cover, processed, *get_cover_variant_names(processed))
+        for name in deleted:
+            self.assertFalse(default_storage.exists(name), name)
+        self.assertTrue(default_storage.exists(recipe.cover.name))
+
+    def test_command_runs_the_due_jobs(self):
+        recipe, _ = self.make_cover_job()
+        stdout = StringIO()
+
+        call_command("process_cover_jobs", once=True, stdout=stdout)
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+        self.assertIn("1 covers processed, 0 failed", stdout.getvalue())
@@ -9,12 +9,12 @@ class RecipeDetailViewTest(RecipeTestBase):
 
     # Testes para Recipe Detail ------------------------------------------------
     def test_recipe_detail_view_function_is_correct(self):
-        view = resolve(reverse("recipes:recipe", kwargs={"pk": 1}))
+        view = resolve(reverse("recipes:recipe", kwargs={"slug": "a"}))
         self.assertIs(view.func.view_class, views.RecipeDetail)
 
     def test_recipe_detail_view_returns_404_is_no_recipes_found(self):
         response = self.client.get(
-            reverse("recipes:recipe", kwargs={"pk": 1000})
+            reverse("recipes:recipe", kwargs={"slug": "missing"})
         )
         self.assertEqual(response.status_code, 404)
 
@@ -22,9 +22,9 @@ class RecipeDetailViewTest(RecipeTestBase):
         needed_title = "This is a detail page - It load one recipe"
 
         # Need a recipe for this test
-        self.make_recipe(title=needed_title)
+        recipe = self.make_recipe(title=needed_title)
 
-        response = self.client.get(reverse("recipes:recipe", kwargs={"pk": 1}))
+        response = self.client.get(recipe.get_absolute_url())
         content = response.content.decode("utf-8")
 
         # Check if one recipe exists
@@ -35,7 +35,14 @@ class RecipeDetailViewTest(RecipeTestBase):
         # Need a recipe for this test
         recipe = self.make_recipe(is_published=False)
         response = self.client.get(
-            reverse("recipes:recipe", kwargs={"pk": recipe.id})
+            recipe.get_absolute_url()
         )
 
         self.assertEqual(response.status_code, 404)
+
+    def test_recipe_detail_loads_author_and_category_in_one_query(self):
+        recipe = self.make_recipe()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(recipe.get_absolute_url())
+            response.content.decode("utf-8")
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 
+from django.test import override_settings
 from django.urls import resolve, reverse
 
 from recipes import views
@@ -100,3 +101,24 @@ class RecipeHomeViewTest(RecipeTestBase):
 
             response = self.client.get(reverse("recipes:home") + "?page=3")
             self.assertEqual(response.context["recipes"].number, 3)
+
+    def test_recipe_home_does_not_query_author_and_category_per_recipe(self):
+        self.make_recipe_in_batch(qtd=9)
+
+        # One COUNT for the paginator and one SELECT with the JOINs
+        with patch("recipes.views.PER_PAGE", new=9):
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse("recipes:home"))
+                response.content.decode("utf-8")
+
+    @override_settings(PAGE_CACHE_ENABLED=False)
+    def test_recipe_home_count_is_cached_between_requests(self):
+        self.make_recipe_in_batch(qtd=9)
+
+        with patch("recipes.views.PER_PAGE", new=9):
+            self.client.get(reverse("recipes:home"))
+
+            # Only the page SELECT, the COUNT(*) comes from the cache
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("recipes:home"))
+                response.content.decode("utf-8")
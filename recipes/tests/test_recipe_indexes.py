@@ -0,0 +1,64 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .test_recipe_base import RecipeTestBase
+
+
+@skipUnless(
+    connection.vendor in ("postgresql", "sqlite"),
+    "Partial indexes are only created on PostgreSQL and SQLite",
+)
+@override_settings(PAGE_CACHE_ENABLED=False)
+class RecipeIndexesTest(RecipeTestBase):
+    def get_listing_query(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        listing = [
+            query["sql"]
+            for query in queries
+            if 'FROM "recipes_recipe"' in query["sql"]
+            and "ORDER BY" in query["sql"]
+        ]
+        self.assertEqual(len(listing), 1)
+        return listing[0]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables are cheaper to scan sequentially
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertUsesIndex(self, url, index_name):
+        plan = self.explain(self.get_listing_query(url))
+        self.assertIn(index_name, plan)
+
+    def test_home_uses_the_published_index(self):
+        self.make_recipe()
+        self.assertUsesIndex(reverse("recipes:home"), "recipe_published_idx")
+
+    def test_category_uses_the_category_published_index(self):
+        recipe = self.make_recipe()
+        self.assertUsesIndex(
+            reverse("recipes:category", args=(recipe.category.id,)),
+            "recipe_category_published_idx",
+        )
+
+    def test_dashboard_uses_the_author_draft_index(self):
+        recipe = self.make_recipe(
+            is_published=False,
+            author_data={"username": "author", "password": "P4ssw0rd"},
+        )
+        self.client.login(username=recipe.author.username, password="P4ssw0rd")
+        self.assertUsesIndex(
+            reverse("authors:dashboard"), "recipe_author_draft_idx"
+        )
@@ -66,3 +66,23 @@ class RecipeModelTest(RecipeTestBase):
                 f"but '{str(self.recipe)}' was received."
             ),
         )
+
+    def test_recipe_published_queryset_only_returns_published_recipes(self):
+        not_published = self.make_recipe(
+            slug="not-published",
+            author_data={"username": "notpublished"},
+            is_published=False,
+        )
+        recipes = Recipe.objects.published()
+
+        self.assertIn(self.recipe, recipes)
+        self.assertNotIn(not_published, recipes)
+
+    def test_recipe_published_queryset_defers_preparation_steps(self):
+        recipe = Recipe.objects.published().get(pk=self.recipe.pk)
+
+        self.assertIn("preparation_steps", recipe.get_deferred_fields())
+
+        with self.assertNumQueries(0):
+            str(recipe.author.username)
+            str(recipe.category.name)
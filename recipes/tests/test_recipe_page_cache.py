@@ -0,0 +1,190 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.models import Category
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipePageCacheTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe()
+        self.other = self.make_recipe(
+            title="Other recipe",
+            slug="other-recipe",
+            category_data={"name": "Other"},
+            author_data={"username": "other"},
+        )
+        self.home_url = reverse("recipes:home")
+        self.category_url = reverse(
+            "recipes:category", args=(self.recipe.category.id,)
+        )
+        self.detail_url = self.recipe.get_absolute_url()
+
+    def assertCached(self, url):
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertNotCached(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertTrue(queries, f"{url} was served from the cache")
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for url in (
+            self.home_url,
+            self.category_url,
+            self.detail_url,
+            reverse("recipes:search") + "?q=recipe",
+        ):
+            response = self.assertCached(url)
+            self.assertIn("Recipe Title", response.content.decode("utf-8"))
+
+    def test_pages_are_cached_per_query_string(self):
+        self.assertCached(self.home_url)
+
+        response = self.client.get(self.home_url + "?page=2")
+        self.assertEqual(response.context["recipes"].number, 1)
+
+    def test_conditional_request_returns_304_without_rendering(self):
+        response = self.client.get(self.home_url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            self.home_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_logged_in_users_bypass_the_cache(self):
+        self.client.force_login(self.recipe.author)
+        self.client.get(self.home_url)
+
+        self.assertNotCached(self.home_url)
+        self.assertNotIn("ETag", self.client.get(self.home_url).headers)
+
+    def test_publish_toggle_invalidates_list_category_and_detail(self):
+        for url in (self.home_url, self.category_url, self.detail_url):
+            self.assertCached(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.is_published = False
+            self.recipe.save()
+
+        self.assertNotIn(
+            "Recipe Title", self.client.get(self.home_url).content.decode()
+        )
+        self.assertEqual(self.client.get(self.category_url).status_code, 404)
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_pages_are_invalidated_when_the_save_commits(self):
+        self.assertCached(self.detail_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.recipe.title = "New title"
+            self.recipe.save()
+        # Until the commit, other requests can only read the old row: a
+        # page rendered from it must not be cached under new versions
+        response = self.assertCached(self.detail_url)
+        self.assertNotIn("New title", response.content.decode())
+
+        for callback in callbacks:
+            callback()
+
+        self.assertNotCached(self.detail_url)
+        self.assertIn(
+            "New title", self.client.get(self.detail_url).content.decode()
+        )
+
+    def test_draft_changes_do_not_invalidate_public_pages(self):
+        draft = self.make_recipe(
+            slug="draft",
+            is_published=False,
+            author_data={"username": "draft"},
+        )
+        self.assertCached(self.home_url)
+        self.assertCached(self.category_url)
+
+        draft.title = "Still a draft"
+        draft.save()
+
+        self.assertCached(self.home_url)
+        self.assertCached(self.category_url)
+
+    def test_recipe_change_only_invalidates_its_own_category_page(self):
+        other_category_url = reverse(
+            "recipes:category", args=(self.other.category.id,)
+        )
+        self.assertCached(self.category_url)
+        self.assertCached(other_category_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.title = "New title"
+            self.recipe.save()
+
+        self.assertNotCached(self.category_url)
+        self.assertCached(other_category_url)
+
+    def test_moving_recipe_invalidates_both_categories(self):
+        other_category_url = reverse(
+            "recipes:category", args=(self.other.category.id,)
+        )
+        self.assertCached(other_category_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.category = self.other.category
+            self.recipe.save()
+
+        response = self.client.get(other_category_url)
+        self.assertIn("Recipe Title", response.content.decode("utf-8"))
+
+    def test_category_rename_invalidates_pages_showing_it(self):
+        self.assertCached(self.home_url)
+        self.assertCached(self.detail_url)
+
+        category = Category.objects.get(pk=self.recipe.category.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = "Renamed category"
+            category.save()
+
+        for url in (self.home_url, self.category_url, self.detail_url):
+            self.assertIn(
+                "Renamed category", self.client.get(url).content.decode()
+            )
+
+    def test_admin_list_editable_publish_toggle_invalidates_pages(self):
+        get_user_model().objects.create_superuser(
+            username="admin", password="admin", email="admin@email.com"
+        )
+        self.assertCached(self.home_url)
+
+        admin_client = self.client_class()
+        admin_client.login(username="admin", password="admin")
+        with self.captureOnCommitCallbacks(execute=True):
+            admin_client.post(
+                reverse("admin:recipes_recipe_changelist"),
+                {
+                    "form-TOTAL_FORMS": "2",
+                    "form-INITIAL_FORMS": "2",
+                    "form-0-id": str(self.other.id),
+                    "form-0-is_published": "on",
+                    "form-1-id": str(self.recipe.id),
+                    "_save": "Save",
+                },
+            )
+
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.is_published)
+        self.assertNotIn(
+            "Recipe Title", self.client.get(self.home_url).content.decode()
+        )
@@ -0,0 +1,90 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+
+from recipes.models import Recipe
+from recipes.search import get_search_engine
+from recipes.search.sqlite import make_match_query
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeSearchEngineTest(RecipeTestBase):
+    def search(self, search_term):
+        return list(
+            get_search_engine().search(Recipe.objects.published(), search_term)
+        )
+
+    def test_search_finds_words_in_preparation_steps(self):
+        recipe = self.make_recipe(preparation_steps="Asse por 40 minutos")
+
+        self.assertEqual(self.search("asse"), [recipe])
+
+    def test_search_ignores_accents(self):
+        recipe = self.make_recipe(title="Pão de queijo mineiro")
+
+        self.assertEqual(self.search("pao"), [recipe])
+        self.assertEqual(self.search("PÃO"), [recipe])
+
+    def test_search_orders_by_relevance(self):
+        in_description = self.make_recipe(
+            title="Bolo simples",
+            description="Cobertura de chocolate",
+            slug="in-description",
+            author_data={"username": "one"},
+        )
+        in_title = self.make_recipe(
+            title="Chocolate quente",
+            slug="in-title",
+            author_data={"username": "two"},
+        )
+
+        self.assertEqual(self.search("chocolate"), [in_title, in_description])
+
+    def test_index_is_updated_when_recipe_is_saved_and_deleted(self):
+        recipe = self.make_recipe(title="Lasanha de berinjela")
+
+        recipe.title = "Moqueca de peixe"
+        recipe.save()
+
+        self.assertEqual(self.search("lasanha"), [])
+        self.assertEqual(self.search("moqueca"), [recipe])
+
+        recipe.delete()
+        self.assertEqual(self.search("moqueca"), [])
+
+    def test_search_does_not_return_unpublished_recipes(self):
+        self.make_recipe(title="Receita rascunho", is_published=False)
+
+        self.assertEqual(self.search("rascunho"), [])
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite FTS5 only")
+    def test_fts_operators_typed_by_the_user_are_quoted(self):
+        self.assertEqual(
+            make_match_query('bolo OR "cenoura" NEAR(x'),
+            '"bolo"* "or"* "cenoura"* "near"* "x"*',
+        )
+        self.assertEqual(make_match_query("!!!"), "")
+        self.assertEqual(self.search("!!!"), [])
+
+    @override_settings(
+        RECIPES_SEARCH_ENGINE="recipes.search.base.IContainsSearchEngine"
+    )
+    def test_search_engine_can_be_changed_in_settings(self):
+        recipe = self.make_recipe(title="Torta de limão")
+
+        self.assertEqual(
+            type(get_search_engine()).__name__, "IContainsSearchEngine"
+        )
+        self.assertEqual(self.search("orta de li"), [recipe])
+
+    def test_rebuild_search_index_command_indexes_existing_recipes(self):
+        recipe = self.make_recipe(title="Feijoada completa")
+        get_search_engine().remove_recipe(recipe.pk)
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search("feijoada"), [recipe])
@@ -0,0 +1,201 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.db import IntegrityError, transaction
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.search import get_search_engine, load_search_engine
+from recipes.search.base import IdListResults
+from recipes.search.inverted_index import (
+    InvertedIndex,
+    InvertedIndexSearchEngine,
+    fold,
+    tokenize,
+)
+
+from .test_recipe_base import RecipeTestBase
+
+ENGINE = "recipes.search.inverted_index.InvertedIndexSearchEngine"
+
+DOCUMENTS = [
+    (1, "Pão de queijo", "Receita mineira", "Misture o polvilho"),
+    (2, "Bolo de cenoura", "Com cobertura", "Asse por 40 minutos"),
+    (3, "Bolo de chocolate", "Receita da vovó", "Misture e asse"),
+]
+
+
+class InvertedIndexTest(TestCase):
+    def setUp(self):
+        self.index = InvertedIndex.build(DOCUMENTS)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "index.bin"
+        return super().setUp()
+
+    def test_tokenizer_folds_accents_and_case(self):
+        self.assertEqual(fold("Pão À Açúcar"), "pao a acucar")
+        self.assertEqual(tokenize("Pão, de QUEIJO!"), ["pao", "de", "queijo"])
+
+    def test_search_matches_every_word_as_prefix_newest_first(self):
+        self.assertEqual(self.index.search("bolo"), [3, 2])
+        self.assertEqual(self.index.search("bol choc"), [3])
+        self.assertEqual(self.index.search("receita"), [3, 1])
+        self.assertEqual(self.index.search("vovó asse"), [3])
+        self.assertEqual(self.index.search("pizza"), [])
+        self.assertEqual(self.index.search("!!!"), [])
+
+    def test_add_and_remove_update_the_index_incrementally(self):
+        self.index.add(4, "Bolo de fubá", "", "")
+        self.index.add(2, "Torta de limão", "", "")
+        self.index.remove(3)
+
+        self.assertEqual(self.index.search("bolo"), [4])
+        self.assertEqual(self.index.search("torta"), [2])
+        self.assertEqual(self.index.search("cenoura"), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_saved_index_is_loaded_through_mmap(self):
+        self.index.add(4, "Bolo de fubá", "", "")
+        self.index.remove(1)
+        self.index.save(self.path)
+
+        loaded = InvertedIndex.load(self.path)
+        self.addCleanup(loaded.close)
+
+        self.assertEqual(loaded.search("bolo"), [4, 3, 2])
+        self.assertEqual(loaded.search("queijo"), [])
+
+        loaded.add(5, "Queijo quente", "", "")
+        self.assertEqual(loaded.search("queijo"), [5])
+
+    def test_load_rejects_other_files(self):
+        self.path.write_bytes(b"not an index")
+
+        with self.assertRaises(ValueError):
+            InvertedIndex.load(self.path)
+
+
+class InvertedIndexSearchEngineTest(RecipeTestBase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "index.bin"
+
+        settings_override = override_settings(
+            RECIPES_SEARCH_ENGINE=ENGINE, RECIPES_SEARCH_INDEX_PATH=self.path
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        load_search_engine.cache_clear()
+        self.addCleanup(load_search_engine.cache_clear)
+        return super().setUp()
+
+    def search_ids(self, engine, term="recipe"):
+        return engine.search(Recipe.objects.published(), term).ids
+
+    def test_search_view_follows_saves_and_deletes(self):
+        recipes = self.make_recipe_in_batch(qtd=3)
+        get_search_engine().rebuild()
+        url = reverse("recipes:search") + "?q=recipe"
+
+        response = self.client.get(url)
+        self.assertEqual(list(response.context["recipes"]), recipes[::-1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipes[0].is_published = False
+            recipes[0].save()
+            recipes[1].delete()
+
+        response = self.client.get(url)
+        self.assertEqual(list(response.context["recipes"]), [recipes[2]])
+
+    def test_updates_reach_the_other_processes_through_the_log(self):
+        recipe = self.make_recipe()
+        get_search_engine().rebuild()
+        other_process = InvertedIndexSearchEngine(self.path)
+        self.assertEqual(self.search_ids(other_process), [recipe.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = "Bolo de fubá"
+            recipe.save()
+
+        self.assertEqual(self.search_ids(other_process, "fuba"), [recipe.pk])
+        # A restarted process replays the log over the base
+        restarted = InvertedIndexSearchEngine(self.path)
+        self.assertEqual(self.search_ids(restarted, "fuba"), [recipe.pk])
+
+    def test_rolled_back_saves_are_not_indexed(self):
+        recipe = self.make_recipe()
+        get_search_engine().rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    recipe.title = "Bolo de fubá"
+                    recipe.save()
+                    raise IntegrityError
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.search_ids(get_search_engine(), "fuba"), [])
+
+    def test_rebuild_folds_the_log_into_a_new_base(self):
+        recipe = self.make_recipe()
+        engine = get_search_engine()
+        engine.rebuild()
+        old_index, pk = engine.index, recipe.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+        engine.rebuild()
+
+        self.assertEqual(self.search_ids(engine), [])
+        # Searches still holding the previous index are not cut off
+        self.assertEqual(old_index.search("recipe"), [pk])
+        self.assertEqual(
+            [path.name for path in self.path.parent.glob("*.log")],
+            [f"index.bin.{engine.index.generation}.log"],
+        )
+
+    def test_results_are_indexed_like_a_list(self):
+        recipes = self.make_recipe_in_batch(qtd=3)
+        hidden = recipes[1]
+        results = IdListResults(
+            Recipe.objects.published(), [recipe.pk for recipe in recipes]
+        )
+        Recipe.objects.filter(pk=hidden.pk).update(is_published=False)
+
+        self.assertEqual(results[0], recipes[0])
+        self.assertEqual(results[-1], recipes[2])
+        self.assertEqual(results[:], [recipes[0], recipes[2]])
+        for index in (1, 3):
+            with self.assertRaises(IndexError):
+                results[index]
+
+    def test_searches_fall_back_to_icontains_until_the_index_is_built(self):
+        recipe = self.make_recipe()
+        engine = get_search_engine()
+
+        results = engine.search(Recipe.objects.published(), "recipe")
+
+        self.assertEqual(list(results), [recipe])
+        self.assertFalse(self.path.exists())
+
+    @override_settings(PAGE_CACHE_ENABLED=False)
+    def test_search_view_only_queries_the_visible_page(self):
+        self.make_recipe_in_batch(qtd=9)
+        get_search_engine().rebuild()
+        url = reverse("recipes:search") + "?q=recipe&page=2"
+        self.client.get(url)
+
+        with patch("recipes.views.PER_PAGE", new=4):
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+                response.content.decode("utf-8")
+
+        self.assertEqual(response.context["recipes"].paginator.count, 9)
+        self.assertEqual(len(response.context["recipes"]), 4)
@@ -103,6 +103,16 @@ class RecipeSearchViewTest(RecipeTestBase):
             self.assertEqual(len(recipes__2_1), 1)
             self.assertIn(recipes_all[1], response__3.context["recipes"])
 
+    def test_recipe_search_does_not_query_author_and_category_per_recipe(self):
+        self.make_recipe_in_batch(qtd=9)
+
+        with patch("recipes.views.PER_PAGE", new=9):
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    reverse("recipes:search") + "?q=Recipe"
+                )
+                response.content.decode("utf-8")
+
     # def test_recipe_search_if_shows_amount_recipes_found(self):
     #     # sourcery skip: extract-method
     #     # Creates 15 recipes com títulos variados
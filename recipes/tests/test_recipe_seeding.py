@@ -0,0 +1,137 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Category, Recipe, User
+from recipes.search import get_search_engine
+from recipes.seeding import SEED_PASSWORD, bulk_create_in_batches, seed_recipes
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeSeedingTest(TestCase):
+    def test_recipes_are_spread_over_the_pools(self):
+        seed_recipes(30, categories=3, authors=2)
+
+        self.assertEqual(Recipe.objects.count(), 30)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(
+            Recipe.objects.values("slug").distinct().count(), 30
+        )
+
+    def test_the_same_seed_generates_the_same_data(self):
+        seed_recipes(5, seed=1)
+        first = list(Recipe.objects.order_by("id").values_list("slug"))
+        Recipe.objects.all().delete()
+
+        seed_recipes(5, seed=1)
+        second = list(Recipe.objects.order_by("id").values_list("slug"))
+
+        self.assertEqual(first, second)
+
+    def test_growing_the_dataset_reuses_the_pools(self):
+        seed_recipes(5, categories=2, authors=2)
+        seed_recipes(5, categories=2, authors=2, start=5)
+
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_seeded_recipes_are_searchable(self):
+        seed_recipes(5, published_ratio=1)
+        recipe = Recipe.objects.first()
+
+        found = get_search_engine().search(
+            Recipe.objects.all(), recipe.title.split()[0]
+        )
+
+        self.assertIn(recipe, list(found))
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_seeded_recipes_invalidate_the_cached_pages(self):
+        seed_recipes(1, categories=1, published_ratio=1)
+        category = Category.objects.get()
+        urls = [
+            reverse("recipes:home"),
+            reverse("recipes:category", args=(category.pk,)),
+        ]
+        for url in urls:
+            self.client.get(url)
+
+        seed_recipes(1, categories=1, published_ratio=1, start=1)
+
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(len(response.context["recipes"]), 2, url)
+
+    def test_objects_are_saved_in_batches(self):
+        category = Category.objects.create(name="Category")
+
+        batches = list(
+            bulk_create_in_batches(
+                (Category(name=f"Category {i}") for i in range(5)),
+                batch_size=2,
+            )
+        )
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertTrue(all(c.pk > category.pk for c in batches[-1]))
+
+    def test_seeded_authors_can_log_in(self):
+        seed_recipes(1)
+        author = User.objects.first()
+
+        self.assertTrue(
+            self.client.login(username=author.username, password=SEED_PASSWORD)
+        )
+
+
+class SeedRecipesCommandTest(TestCase):
+    def call(self, *args):
+        stdout = StringIO()
+        call_command("seed_recipes", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_progress_is_reported(self):
+        stdout = self.call("25", "--batch-size", "10", "--authors", "3")
+
+        self.assertIn("10/25 recipes", stdout)
+        self.assertIn("25/25 recipes", stdout)
+        self.assertIn("25 recipes seeded", stdout)
+        self.assertEqual(User.objects.count(), 3)
+
+    def test_each_run_grows_the_dataset(self):
+        self.call("5")
+        self.call("5")
+
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertEqual(Category.objects.count(), 10)
+
+    def test_the_count_must_be_positive(self):
+        with self.assertRaises(CommandError):
+            self.call("0")
+
+
+class RecipeMixinBulkTest(RecipeTestBase):
+    def test_recipes_share_one_category_and_author(self):
+        recipes = self.make_recipe_in_bulk(qtd=3, is_published=False)
+
+        self.assertEqual(
+            [recipe.slug for recipe in recipes],
+            ["recipe-slug-0", "recipe-slug-1", "recipe-slug-2"],
+        )
+        self.assertEqual(Category.objects.count(), 1)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertFalse(Recipe.objects.filter(is_published=True).exists())
+
+    def test_recipes_are_indexed(self):
+        category = self.make_category(name="Desserts")
+        self.make_recipe_in_bulk(qtd=2, category=category)
+
+        found = get_search_engine().search(Recipe.objects.all(), "Recipe")
+
+        self.assertEqual(len(list(found)), 2)
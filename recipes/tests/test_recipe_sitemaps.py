@@ -0,0 +1,207 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+
+from .test_recipe_base import RecipeTestBase
+
+
+def get_chunk(recipe, size):
+    return (recipe.pk - 1) // size
+
+
+def read(response):
+    if response.streaming:
+        return b"".join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+@override_settings(RECIPE_SITEMAP_CHUNK_SIZE=2)
+class RecipeSitemapTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipes = self.make_recipe_in_bulk(qtd=5)
+
+    def get_chunk_url(self, recipe):
+        return reverse("recipes:sitemap_recipes", args=(get_chunk(recipe, 2),))
+
+    def test_the_index_lists_the_chunks_with_published_recipes(self):
+        draft = self.recipes[0]
+        Recipe.objects.filter(pk=draft.pk).update(is_published=False)
+        chunks = {get_chunk(recipe, 2) for recipe in self.recipes[1:]}
+
+        content = read(self.client.get(reverse("recipes:sitemap")))
+
+        self.assertEqual(content.count("<sitemap>"), len(chunks))
+        for recipe in self.recipes[1:]:
+            self.assertIn(
+                f"http://testserver{self.get_chunk_url(recipe)}", content
+            )
+
+    def test_the_index_is_cached_until_recipes_change(self):
+        url = reverse("recipes:sitemap")
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_recipe(
+                slug="new-recipe", author_data={"username": "new"}
+            )
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_chunks_list_the_urls_of_their_published_recipes(self):
+        first, second = self.recipes[0], self.recipes[1]
+        if get_chunk(first, 2) != get_chunk(second, 2):
+            first, second = self.recipes[1], self.recipes[2]
+        Recipe.objects.filter(pk=second.pk).update(is_published=False)
+
+        response = self.client.get(self.get_chunk_url(first))
+        content = read(response)
+
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            f"<loc>http://testserver{first.get_absolute_url()}</loc>", content
+        )
+        self.assertNotIn(second.get_absolute_url(), content)
+        self.assertEqual(content.count("<url>"), 1)
+
+    def test_chunks_are_served_from_the_cache_until_a_recipe_changes(self):
+        recipe = self.recipes[0]
+        url = self.get_chunk_url(recipe)
+        first = read(self.client.get(url))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content.decode(), first)
+
+        recipe.slug = "renamed"
+        recipe.save()
+
+        content = read(self.client.get(url))
+        self.assertIn("/recipes/renamed/", content)
+
+    def test_current_chunks_are_not_modified(self):
+        url = self.get_chunk_url(self.recipes[0])
+        response = self.client.get(url)
+        read(response)
+
+        not_modified = self.client.get(
+            url, headers={"if-none-match": response.headers["ETag"]}
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_chunks_without_published_recipes_are_404(self):
+        chunk = get_chunk(self.recipes[-1], 2) + 1
+
+        response = self.client.get(
+            reverse("recipes:sitemap_recipes", args=(chunk,))
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_robots_txt_points_to_the_sitemap(self):
+        response = self.client.get("/robots.txt")
+
+        for disallowed in (
+            "/*?page=",
+            "/*?after=",
+            "/*&after=",
+            "/*?before=",
+            "/*&before=",
+        ):
+            self.assertContains(response, f"Disallow: {disallowed}\n")
+        self.assertContains(
+            response, "Sitemap: http://testserver/sitemap.xml"
+        )
+
+
+class RecipeFeedTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(title="Bolo & café", slug="bolo")
+
+    def test_feeds_list_the_newest_published_recipes(self):
+        self.make_recipe(
+            title="Draft",
+            slug="draft",
+            is_published=False,
+            author_data={"username": "draft"},
+        )
+
+        rss = self.client.get(reverse("recipes:feed"))
+        atom = self.client.get(reverse("recipes:feed_atom"))
+
+        self.assertEqual(
+            rss["Content-Type"], "application/rss+xml; charset=utf-8"
+        )
+        self.assertContains(rss, "Bolo &amp; café")
+        self.assertContains(rss, "http://testserver/recipes/bolo/")
+        self.assertNotContains(rss, "Draft")
+        self.assertContains(atom, "<feed")
+        self.assertContains(atom, "http://testserver/recipes/bolo/")
+
+    @override_settings(RECIPE_FEED_SIZE=1)
+    def test_the_feed_is_limited_to_the_newest_recipes(self):
+        self.make_recipe(
+            title="Newest", slug="newest", author_data={"username": "new"}
+        )
+
+        response = self.client.get(reverse("recipes:feed"))
+
+        self.assertContains(response, "Newest")
+        self.assertNotContains(response, "Bolo")
+
+    def test_the_feed_is_cached_until_a_recipe_changes(self):
+        url = reverse("recipes:feed")
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.recipe.title = "Bolo de fubá"
+        self.recipe.save()
+
+        self.assertContains(self.client.get(url), "Bolo de fubá")
+
+    def test_current_feeds_are_not_modified(self):
+        url = reverse("recipes:feed")
+        response = self.client.get(url)
+
+        not_modified = self.client.get(
+            url, headers={"if-none-match": response.headers["ETag"]}
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_renaming_the_author_changes_the_feed(self):
+        url = reverse("recipes:feed")
+        etag = self.client.get(url)["ETag"]
+
+        get_user_model().objects.filter(pk=self.recipe.author_id).update(
+            username="renamed"
+        )
+        response = self.client.get(url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "renamed")
+
+    def test_the_etag_is_the_same_on_every_worker(self):
+        url = reverse("recipes:feed")
+        etag = self.client.get(url)["ETag"]
+
+        cache.clear()
+        response = self.client.get(url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_pages_link_to_the_feeds(self):
+        response = self.client.get(reverse("recipes:home"))
+
+        self.assertContains(response, 'href="/feeds/recipes.rss"')
@@ -0,0 +1,349 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from recipes.benchmarks import benchmark_slug_resolver
+from recipes.models import Recipe, recipe_slug_allocator
+from recipes.seeding import seed_recipes
+from recipes.slugs import (
+    aresolve_recipe_slug,
+    make_slug_key,
+    recipe_slug_cache,
+    resolve_recipe_slug,
+)
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeSlugResolverTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(slug="cake")
+
+    def test_saved_recipes_resolve_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_recipe_slug("cake"), self.recipe.pk)
+
+    def test_the_local_tier_is_filled_from_the_shared_cache(self):
+        recipe_slug_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_recipe_slug("cake"), self.recipe.pk)
+        self.assertEqual(recipe_slug_cache.get("cake"), self.recipe.pk)
+
+    def test_cold_slugs_are_read_from_the_database_once(self):
+        recipe_slug_cache.clear()
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            resolve_recipe_slug("cake")
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_recipe_slug("cake"), self.recipe.pk)
+
+    def test_unknown_slugs_are_not_cached(self):
+        self.assertIsNone(resolve_recipe_slug("pie"))
+
+        pie = self.make_recipe(
+            slug="pie",
+            category_data={"name": "Pies"},
+            author_data={"username": "pie"},
+        )
+
+        self.assertEqual(resolve_recipe_slug("pie"), pie.pk)
+
+    def test_changing_the_slug_forgets_the_old_one(self):
+        self.recipe.slug = "chocolate-cake"
+        self.recipe.save()
+
+        self.assertIsNone(recipe_slug_cache.get("cake"))
+        self.assertIsNone(cache.get(make_slug_key("cake")))
+        self.assertIsNone(resolve_recipe_slug("cake"))
+        self.assertEqual(
+            resolve_recipe_slug("chocolate-cake"), self.recipe.pk
+        )
+
+    def test_deleting_the_recipe_forgets_its_slug(self):
+        self.recipe.delete()
+
+        self.assertIsNone(resolve_recipe_slug("cake"))
+
+    @override_settings(RECIPE_SLUG_CACHE_ENABLED=False)
+    def test_disabled_cache_queries_every_time(self):
+        with self.assertNumQueries(2):
+            resolve_recipe_slug("cake")
+            resolve_recipe_slug("cake")
+
+    def test_async_resolution(self):
+        resolve = async_to_sync(aresolve_recipe_slug)
+        recipe_slug_cache.clear()
+        cache.clear()
+
+        self.assertEqual(resolve("cake"), self.recipe.pk)
+        self.assertIsNone(resolve("pie"))
+        self.assertEqual(recipe_slug_cache.get("cake"), self.recipe.pk)
+
+
+class RecipeSlugUrlsTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(title="Cake", slug="cake")
+
+    def test_recipes_are_served_by_slug(self):
+        response = self.client.get("/recipes/cake/")
+
+        self.assertEqual(self.recipe.get_absolute_url(), "/recipes/cake/")
+        self.assertEqual(response.context["recipe"], self.recipe)
+
+    def test_cached_pages_are_served_without_queries(self):
+        self.client.get(self.recipe.get_absolute_url())
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.recipe.get_absolute_url())
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_id_urls_are_moved_permanently(self):
+        url = reverse("recipes:recipe_redirect", args=(self.recipe.pk,))
+
+        response = self.client.get(f"{url}?ref=feed")
+
+        self.assertRedirects(
+            response,
+            "/recipes/cake/?ref=feed",
+            status_code=301,
+            fetch_redirect_response=False,
+        )
+
+    def test_id_urls_of_missing_recipes_are_404(self):
+        draft = self.make_recipe(
+            slug="draft",
+            is_published=False,
+            category_data={"name": "Drafts"},
+            author_data={"username": "draft"},
+        )
+
+        for pk in (draft.pk, 1000):
+            response = self.client.get(
+                reverse("recipes:recipe_redirect", args=(pk,))
+            )
+            self.assertEqual(response.status_code, 404)
+
+    def test_stale_local_entries_are_corrected(self):
+        # Another process renamed the recipe and gave its slug to a new one
+        other = self.make_recipe(
+            title="Pie",
+            slug="pie",
+            category_data={"name": "Pies"},
+            author_data={"username": "pie"},
+        )
+        recipe_slug_cache.set("pie", self.recipe.pk)
+        cache.delete(make_slug_key("pie"))
+
+        response = self.client.get("/recipes/pie/")
+
+        self.assertEqual(response.context["recipe"], other)
+        self.assertEqual(resolve_recipe_slug("pie"), other.pk)
+
+    def test_stale_entries_of_deleted_recipes_are_corrected(self):
+        recipe_slug_cache.set("gone", 1000)
+
+        response = self.client.get("/recipes/gone/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(recipe_slug_cache.get("gone"))
+
+
+@pytest.mark.slow
+class RecipeSlugResolverBenchmarkTest(RecipeTestBase):
+    def test_detail_latency_with_and_without_the_resolver(self):
+        seed_recipes(1000)
+
+        results = benchmark_slug_resolver(rounds=200)
+
+        for group, row in results.items():
+            summary = ", ".join(
+                f"{name}: p50 {result['p50_ms']:.2f} ms "
+                f"p99 {result['p99_ms']:.2f} ms {result['queries']} queries"
+                for name, result in row.items()
+            )
+            self.assertLess(
+                row["resolver"]["queries"],
+                row["no_resolver"]["queries"],
+                f"{group}: {summary}",
+            )
+
+
+def make_titled_recipe(title, **kwargs):
+    return Recipe(
+        title=title,
+        description="Recipe Description",
+        preparation_time=10,
+        preparation_time_unit="Minutos",
+        servings=5,
+        servings_unit="Porções",
+        preparation_steps="Recipe Preparation Steps",
+        is_published=True,
+        **kwargs,
+    )
+
+
+class RecipeSlugAllocationTest(RecipeTestBase):
+    def save_titled(self, *titles):
+        slugs = []
+        for title in titles:
+            recipe = make_titled_recipe(title)
+            recipe.save()
+            slugs.append(recipe.slug)
+        return slugs
+
+    def test_alike_titles_get_numeric_suffixes(self):
+        slugs = self.save_titled("Bolo de Cenoura", "Bolo de cenoura!", "BOLO")
+
+        self.assertEqual(
+            slugs, ["bolo-de-cenoura", "bolo-de-cenoura-2", "bolo"]
+        )
+
+    def test_the_suffix_follows_the_highest_one(self):
+        self.save_titled("Cake", "Cake", "Cake", "Cake pie", "Cake 02")
+        Recipe.objects.filter(slug="cake-2").delete()
+
+        with self.assertNumQueries(1):
+            slug = recipe_slug_allocator.allocate("Cake")
+
+        # Deleted slugs are not handed out again: old links stay dead
+        self.assertEqual(slug, "cake-4")
+
+    def test_titles_shadowed_by_other_urls_start_at_suffix_2(self):
+        slugs = self.save_titled("Search", "2024", "!!!", "!!!")
+
+        self.assertEqual(slugs, ["search-2", "2024-2", "recipe", "recipe-2"])
+
+    def test_long_titles_leave_room_for_the_suffix(self):
+        slugs = self.save_titled("a" * 65, "a" * 65)
+
+        self.assertEqual(slugs, ["a" * 42, f"{'a' * 42}-2"])
+
+    def test_given_slugs_are_kept(self):
+        self.save_titled("Cake")
+        recipe = make_titled_recipe("Cake", slug="my-cake")
+        recipe.save()
+
+        self.assertEqual(recipe.slug, "my-cake")
+
+    def test_bulk_create_allocates_the_batch_in_memory(self):
+        self.save_titled("Cake")
+        titles = ["Cake", "Pie", "Cake", *(f"Tart {i}" for i in range(497))]
+
+        # One query for the free titles, one for the taken "cake"
+        with self.assertNumQueries(2):
+            slugs = recipe_slug_allocator.allocate_many(titles)
+
+        self.assertEqual(slugs[:4], ["cake-2", "pie", "cake-3", "tart-0"])
+        self.assertEqual(len(set(slugs)), len(titles))
+
+    def test_bulk_create_avoids_the_slugs_given_in_the_batch(self):
+        recipes = Recipe.objects.bulk_create(
+            [
+                make_titled_recipe("Cake", slug="cake-2"),
+                make_titled_recipe("Cake"),
+                make_titled_recipe("Cake"),
+            ]
+        )
+
+        self.assertEqual(
+            [recipe.slug for recipe in recipes], ["cake-2", "cake", "cake-3"]
+        )
+
+    def test_saves_that_lose_a_race_allocate_again(self):
+        self.save_titled("Cake")
+        highest = recipe_slug_allocator.get_highest_suffix
+
+        # The first allocation misses the "cake" saved concurrently
+        with patch.object(
+            recipe_slug_allocator,
+            "get_highest_suffix",
+            side_effect=[0, highest("cake")],
+        ):
+            (slug,) = self.save_titled("Cake")
+
+        self.assertIn(slug, ("cake-2", "cake-3"))
+
+    def test_bulk_creates_that_lose_a_race_allocate_again(self):
+        self.save_titled("Cake")
+        highest = recipe_slug_allocator.get_highest_suffix
+
+        with patch.object(
+            recipe_slug_allocator,
+            "get_highest_suffix",
+            side_effect=[0, highest("cake")],
+        ):
+            recipes = Recipe.objects.bulk_create(
+                [make_titled_recipe("Cake"), make_titled_recipe("Cake")]
+            )
+
+        self.assertEqual(Recipe.objects.count(), 3)
+        self.assertNotIn("cake", [recipe.slug for recipe in recipes])
+
+    @patch("utils.slugs.get_suffix_jump", return_value=0)
+    def test_the_error_is_raised_after_the_last_attempt(self, _):
+        self.save_titled("Cake")
+        recipe = make_titled_recipe("Cake")
+
+        with patch.object(
+            recipe_slug_allocator, "get_highest_suffix", return_value=0
+        ):
+            with self.assertRaises(IntegrityError):
+                recipe.save()
+
+        self.assertEqual(recipe.slug, "")
+
+
+@pytest.mark.slow
+class RecipeSlugStressTest(TransactionTestCase):
+    THREADS = 8
+    RECIPES_PER_THREAD = 500
+    BATCH_SIZE = 50
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("The in-memory SQLite database is single writer")
+        return super().setUp()
+
+    def save_one_by_one(self):
+        try:
+            for _ in range(self.RECIPES_PER_THREAD):
+                make_titled_recipe("Bolo de Cenoura").save()
+        finally:
+            connection.close()
+
+    def save_in_batches(self):
+        try:
+            for _ in range(self.RECIPES_PER_THREAD // self.BATCH_SIZE):
+                Recipe.objects.bulk_create(
+                    make_titled_recipe("Bolo de Cenoura")
+                    for _ in range(self.BATCH_SIZE)
+                )
+        finally:
+            connection.close()
+
+    def test_concurrent_alike_titles_get_unique_slugs(self):
+        with ThreadPoolExecutor(self.THREADS) as executor:
+            futures = [
+                executor.submit(
+                    self.save_one_by_one if i % 2 else self.save_in_batches
+                )
+                for i in range(self.THREADS)
+            ]
+            for future in futures:
+                future.result()
+
+        slugs = list(Recipe.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), self.THREADS * self.RECIPES_PER_THREAD)
+        for slug in slugs:
+            self.assertRegex(slug, r"^bolo-de-cenoura(-[1-9][0-9]*)?$")
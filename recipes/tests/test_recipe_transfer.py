@@ -0,0 +1,242 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from recipes.models import Category, Recipe
+from recipes.search import get_search_engine
+from recipes.seeding import seed_recipes
+from recipes.transfer import (
+    EXPORT_FIELDS,
+    RecipeImportError,
+    export_recipes,
+    import_recipes,
+)
+from utils.benchmark import measure
+
+from .test_recipe_base import RecipeTestBase
+
+
+def make_row(**fields):
+    return {
+        "slug": "cake",
+        "title": "Cake",
+        "description": "A cake",
+        "preparation_time": 30,
+        "preparation_time_unit": "Minutos",
+        "servings": 8,
+        "servings_unit": "Pedaços",
+        "preparation_steps": "Mix\nBake",
+        "preparation_steps_is_html": False,
+        "is_published": True,
+        "cover": "",
+        "category": "Cakes",
+        "author": "username",
+        **fields,
+    }
+
+
+def to_jsonl(*rows):
+    return StringIO("".join(json.dumps(row) + "\n" for row in rows))
+
+
+class RecipeExportTest(RecipeTestBase):
+    def test_recipes_are_written_one_json_object_per_line(self):
+        recipe = self.make_recipe(title="Pão de queijo")
+        file = StringIO()
+
+        count = export_recipes(file)
+
+        (line,) = file.getvalue().splitlines()
+        row = json.loads(line)
+        self.assertEqual(count, 1)
+        self.assertEqual(list(row), list(EXPORT_FIELDS))
+        self.assertEqual(row["title"], "Pão de queijo")
+        self.assertEqual(row["category"], recipe.category.name)
+        self.assertEqual(row["author"], recipe.author.username)
+        self.assertIn("Pão", line)
+
+    def test_csv_has_a_header_and_a_row_per_recipe(self):
+        self.make_recipe_in_bulk(qtd=3)
+        file = StringIO()
+
+        export_recipes(file, format="csv")
+
+        lines = file.getvalue().splitlines()
+        self.assertEqual(lines[0], ",".join(EXPORT_FIELDS))
+        self.assertEqual(len(lines), 4)
+
+    def test_recipes_are_read_in_chunks(self):
+        self.make_recipe_in_bulk(qtd=5)
+        reports = []
+
+        export_recipes(StringIO(), chunk_size=2, progress=reports.append)
+
+        self.assertEqual(reports, [2, 4])
+
+
+class RecipeImportTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.make_author()
+
+    def test_rows_create_recipes(self):
+        stats = import_recipes(to_jsonl(make_row()))
+
+        recipe = Recipe.objects.get(slug="cake")
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(recipe.preparation_steps, "Mix\nBake")
+        self.assertEqual(recipe.category.name, "Cakes")
+        self.assertEqual(recipe.author, self.author)
+
+    def test_rows_with_a_known_slug_update_the_recipe(self):
+        recipe = self.make_recipe(
+            slug="cake", author_data={"username": "other"}
+        )
+
+        stats = import_recipes(to_jsonl(make_row(title="New cake")))
+
+        updated = Recipe.objects.get(pk=recipe.pk)
+        self.assertEqual((stats["created"], stats["updated"]), (0, 1))
+        self.assertEqual(updated.title, "New cake")
+        self.assertGreater(updated.updated_at, recipe.updated_at)
+
+    def test_categories_and_authors_are_resolved_once_per_batch(self):
+        existing = self.make_category(name="Pies")
+        rows = [
+            make_row(slug=f"cake-{i}", category=("Pies", "Tarts")[i % 2])
+            for i in range(10)
+        ]
+
+        stats = import_recipes(to_jsonl(*rows), batch_size=5)
+
+        self.assertEqual(stats["created"], 10)
+        self.assertEqual(Category.objects.filter(name="Tarts").count(), 1)
+        self.assertEqual(
+            Recipe.objects.filter(category=existing).count(), 5
+        )
+
+    def test_unknown_authors_are_reported(self):
+        stats = import_recipes(to_jsonl(make_row(author="nobody")))
+
+        self.assertEqual(stats["unknown_authors"], ["nobody"])
+        self.assertIsNone(Recipe.objects.get(slug="cake").author)
+
+    def test_rows_without_slug_get_one_allocated(self):
+        import_recipes(to_jsonl(make_row(slug=""), make_row(slug=None)))
+
+        self.assertEqual(
+            sorted(Recipe.objects.values_list("slug", flat=True)),
+            ["cake", "cake-2"],
+        )
+
+    def test_the_last_row_wins_when_a_slug_repeats(self):
+        import_recipes(to_jsonl(make_row(), make_row(title="Last")))
+
+        self.assertEqual(Recipe.objects.get(slug="cake").title, "Last")
+
+    def test_invalid_rows_stop_the_import(self):
+        for file, message in (
+            (StringIO('{"slug": "cake"\n'), "Line 1: invalid JSON"),
+            (to_jsonl(make_row(), make_row(servings="many")), "Line 2"),
+            (to_jsonl(make_row(title="")), "title"),
+            (to_jsonl(make_row(slug="not a slug")), "slug"),
+        ):
+            with self.assertRaisesMessage(RecipeImportError, message):
+                import_recipes(file)
+
+    def test_imported_recipes_are_indexed_and_invalidate_the_caches(self):
+        self.client.get(reverse("recipes:home"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_recipes(to_jsonl(make_row(title="Chocolate cake")))
+
+        response = self.client.get(reverse("recipes:home"))
+        self.assertContains(response, "Chocolate cake")
+        self.assertEqual(
+            len(get_search_engine().search(Recipe.objects.all(), "chocolate")),
+            1,
+        )
+
+    def test_csv_round_trip(self):
+        self.make_recipe_in_bulk(qtd=3, preparation_steps="One\nTwo, three")
+        file = StringIO()
+        export_recipes(file, format="csv")
+        before = list(Recipe.objects.order_by("id").values())
+        Recipe.objects.all().delete()
+        cache.clear()
+
+        file.seek(0)
+        stats = import_recipes(file, format="csv")
+
+        after = list(Recipe.objects.order_by("id").values())
+        ignored = {"id", "created_at", "updated_at"}
+        self.assertEqual(stats["created"], 3)
+        for row in (*before, *after):
+            for field in ignored:
+                del row[field]
+        self.assertEqual(after, before)
+
+
+class RecipeTransferCommandsTest(RecipeTestBase):
+    def test_export_then_import_through_files(self):
+        self.make_recipe_in_bulk(qtd=3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "recipes.jsonl")
+            exported = StringIO()
+            call_command("export_recipes", path, stdout=exported)
+            Recipe.objects.filter(slug="recipe-slug-0").update(title="Old")
+
+            imported = StringIO()
+            call_command("import_recipes", path, stdout=imported)
+
+        self.assertIn("3 recipes exported", exported.getvalue())
+        self.assertIn("0 recipes created and 3 updated", imported.getvalue())
+        self.assertEqual(
+            Recipe.objects.get(slug="recipe-slug-0").title, "Recipe 0"
+        )
+
+    def test_export_to_stdout_reports_to_stderr(self):
+        self.make_recipe()
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("export_recipes", stdout=stdout, stderr=stderr)
+
+        self.assertEqual(len(stdout.getvalue().splitlines()), 1)
+        self.assertIn("1 recipes exported", stderr.getvalue())
+
+    def test_import_errors_are_command_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "recipes.csv"
+            path.write_text("slug,title\ncake,\n", encoding="utf-8")
+
+            with self.assertRaisesMessage(CommandError, "Line 2: title"):
+                call_command("import_recipes", str(path), stdout=StringIO())
+            with self.assertRaisesMessage(CommandError, "No such file"):
+                call_command(
+                    "import_recipes", f"{path}.missing", stdout=StringIO()
+                )
+
+
+@pytest.mark.slow
+class RecipeExportMemoryTest(RecipeTestBase):
+    def test_export_memory_does_not_grow_with_the_recipes(self):
+        peaks = {}
+        for count in (1000, 4000):
+            start = Recipe.objects.count()
+            seed_recipes(count - start, start=start)
+            with open(os.devnull, "w", encoding="utf-8") as file:
+                _, measurement = measure(export_recipes, file, chunk_size=500)
+            peaks[count] = measurement["peak_memory_bytes"]
+
+        self.assertLess(
+            peaks[4000], peaks[1000] * 1.5, f"Export peak memory: {peaks}"
+        )
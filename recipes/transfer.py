@@ -0,0 +1,303 @@
+"""Streaming export and import of recipes as JSONL or CSV.
+
+Used by manage.py export_recipes and import_recipes. Rows are written and
+read one at a time: exports go through the database in chunks with
+iterator(chunk_size=...) and imports save batches with bulk_create() and
+bulk_update(), so memory stays flat whatever the number of recipes.
+
+Recipes are matched by slug: imported rows update the recipe with their
+slug and create the others (a row without slug gets one allocated).
+Categories are referenced by name and authors by username, resolved to
+ids through in-memory maps filled with one query per batch.
+"""
+
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.models import (
+    Category,
+    Recipe,
+    User,
+    get_published_count_changes,
+)
+from recipes.search import get_search_engine
+from recipes.signals import get_recipe_tags
+from utils.cache import invalidate_tags_on_commit
+
+FORMATS = ("jsonl", "csv")
+CHUNK_SIZE = 2000
+BATCH_SIZE = 1000
+
+# Recipe fields set by the import, in the order of the exported columns
+IMPORT_FIELDS = (
+    "title",
+    "description",
+    "preparation_time",
+    "preparation_time_unit",
+    "servings",
+    "servings_unit",
+    "preparation_steps",
+    "preparation_steps_is_html",
+    "is_published",
+    "cover",
+)
+# Exported column -> values() lookup
+EXPORT_FIELDS = {
+    "slug": "slug",
+    **{field: field for field in IMPORT_FIELDS},
+    "category": "category__name",
+    "author": "author__username",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+class RecipeImportError(Exception):
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def get_format(path, format=None):
+    """`format` if given, else guessed from the extension of path."""
+    if format:
+        return format
+    return "csv" if str(path).lower().endswith(".csv") else "jsonl"
+
+
+def iter_export_rows(queryset=None, chunk_size=CHUNK_SIZE):
+    """Yields a dict per recipe (EXPORT_FIELDS), reading chunk_size rows
+    at a time (a server-side cursor on PostgreSQL)."""
+    if queryset is None:
+        queryset = Recipe.objects.all()
+
+    rows = (
+        queryset.order_by("id")
+        .values_list(*EXPORT_FIELDS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    for values in rows:
+        yield dict(zip(EXPORT_FIELDS, values))
+
+
+def export_recipes(
+    file, format="jsonl", queryset=None, chunk_size=CHUNK_SIZE, progress=None
+):
+    """Writes the recipes to the text file `file`, returning how many.
+
+    `progress` is called with the number of recipes written so far after
+    every chunk_size recipes.
+    """
+    if format == "csv":
+        writer = csv.DictWriter(file, fieldnames=list(EXPORT_FIELDS))
+        writer.writeheader()
+        write = writer.writerow
+    else:
+
+        def write(row):
+            line = json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+            file.write(f"{line}\n")
+
+    count = 0
+    for row in iter_export_rows(queryset, chunk_size):
+        write(row)
+        count += 1
+        if progress is not None and count % chunk_size == 0:
+            progress(count)
+    return count
+
+
+def read_rows(file, format="jsonl"):
+    """Yields (line number, dict) for each row of the text file `file`."""
+    if format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as error:
+            raise RecipeImportError(line, f"invalid JSON ({error})")
+        if not isinstance(row, dict):
+            raise RecipeImportError(line, "expected a JSON object")
+        yield line, row
+
+
+class ReferenceMap:
+    """Name -> id of the rows of a model, filled with one query for the
+    names of each batch not seen yet. Missing names are created when
+    `create` is set, else map to None."""
+
+    def __init__(self, model, field, create=False):
+        self.model = model
+        self.field = field
+        self.create = create
+        self.ids = {}
+
+    def __getitem__(self, name):
+        return self.ids.get(name) if name else None
+
+    def load(self, names):
+        names = {name for name in names if name and name not in self.ids}
+        if not names:
+            return set()
+
+        # Ordered by -id, so the oldest row wins with repeated names
+        self.ids.update(
+            self.model.objects.filter(**{f"{self.field}__in": names})
+            .order_by("-id")
+            .values_list(self.field, "id")
+        )
+        missing = names - self.ids.keys()
+
+        if self.create:
+            for obj in self.model.objects.bulk_create(
+                self.model(**{self.field: name}) for name in sorted(missing)
+            ):
+                self.ids[getattr(obj, self.field)] = obj.pk
+        else:
+            self.ids.update(dict.fromkeys(missing))
+        return missing
+
+
+def clean_value(name, value):
+    field = Recipe._meta.get_field(name)
+    if name == "cover":
+        return value or ""
+    if value is None and field.has_default():
+        return field.get_default()
+    return field.clean(value, None)
+
+
+def parse_row(line, row):
+    """Recipe field values of an imported row, with the category and
+    author names under "category" and "author"."""
+    values = {}
+    for name in ("slug", *IMPORT_FIELDS):
+        value = row.get(name)
+        if name == "slug" and not value:
+            values[name] = ""
+            continue
+        try:
+            values[name] = clean_value(name, value)
+        except ValidationError as error:
+            raise RecipeImportError(line, f"{name}: {' '.join(error)}")
+
+    values["category"] = (row.get("category") or "").strip()
+    values["author"] = (row.get("author") or "").strip()
+    if len(values["category"]) > Category._meta.get_field("name").max_length:
+        raise RecipeImportError(line, "category: name too long")
+    return values
+
+
+def save_batch(rows, categories, authors):
+    """Creates or updates the recipes of a batch of parse_row() values.
+
+    Returns (created, updated, names of the unknown authors).
+    """
+    # The last row wins when a slug repeats in the batch
+    by_slug = {row["slug"]: row for row in rows if row["slug"]}
+    rows = [row for row in rows if not row["slug"]] + list(by_slug.values())
+
+    categories.load(row["category"] for row in rows)
+    unknown_authors = authors.load(row["author"] for row in rows)
+    # Locked like the saves of recipes.signals, for the published counts
+    rows_in_db = (
+        Recipe.objects.filter(slug__in=list(by_slug))
+        .select_for_update()
+        .values_list("slug", "id", "is_published", "category_id")
+    )
+    existing = {
+        slug: (pk, {"is_published": is_published, "category_id": category})
+        for slug, pk, is_published, category in rows_in_db
+    }
+
+    now = timezone.now()
+    new, updated, previous = [], [], []
+    for row in rows:
+        recipe = Recipe(
+            **{field: row[field] for field in ("slug", *IMPORT_FIELDS)},
+            category_id=categories[row["category"]],
+            author_id=authors[row["author"]],
+        )
+        if recipe.slug in existing:
+            recipe.pk, state = existing[recipe.slug]
+            # bulk_update() doesn't touch auto_now fields
+            recipe.updated_at = now
+            updated.append(recipe)
+            previous.append(state)
+        else:
+            new.append(recipe)
+
+    # bulk_create() counts the new recipes in their categories itself
+    Recipe.objects.bulk_create(new)
+    Recipe.objects.bulk_update(
+        updated, [*IMPORT_FIELDS, "category", "author", "updated_at"]
+    )
+
+    # bulk_update() skips the signals that keep the counters and the caches
+    Category.objects.update_published_counts(
+        get_published_count_changes(
+            (
+                (state["is_published"], state["category_id"]),
+                (recipe.is_published, recipe.category_id),
+            )
+            for recipe, state in zip(updated, previous)
+        )
+    )
+    tags = set()
+    for recipe in new:
+        tags |= get_recipe_tags(recipe)
+    for recipe, state in zip(updated, previous):
+        tags |= get_recipe_tags(recipe, state)
+    invalidate_tags_on_commit(*tags)
+
+    return len(new), len(updated), unknown_authors
+
+
+def import_recipes(file, format="jsonl", batch_size=BATCH_SIZE, progress=None):
+    """Creates and updates recipes from the rows of the text file `file`.
+
+    Each batch of batch_size rows is saved in its own transaction, so an
+    invalid row (RecipeImportError) stops the import after the batches
+    before it. `progress` is called with the stats after each batch.
+    Returns {"created": ..., "updated": ..., "unknown_authors": [...]}.
+    """
+    categories = ReferenceMap(Category, "name", create=True)
+    authors = ReferenceMap(User, "username")
+    stats = {"created": 0, "updated": 0, "unknown_authors": set()}
+
+    def save(batch):
+        with transaction.atomic():
+            created, updated, unknown = save_batch(batch, categories, authors)
+        stats["created"] += created
+        stats["updated"] += updated
+        stats["unknown_authors"] |= unknown
+        if progress is not None:
+            progress(stats)
+
+    batch = []
+    for line, row in read_rows(file, format):
+        batch.append(parse_row(line, row))
+        if len(batch) == batch_size:
+            save(batch)
+            batch = []
+    if batch:
+        save(batch)
+
+    # Also skipped by bulk_create() and bulk_update(): the signals that
+    # index the recipes
+    if stats["created"] or stats["updated"]:
+        get_search_engine().rebuild()
+
+    stats["unknown_authors"] = sorted(stats["unknown_authors"])
+    return stats
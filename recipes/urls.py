@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path
 
-from recipes import views
+from recipes import api, async_views, feeds, sitemaps, views
 
 # Usado para quando der um nome a URL
 # utiliza app_name para simplificar o atributo name logo a baixo de
@@ -8,15 +9,67 @@ from recipes import views
 # e depois coloca no template na url da tag "a" dessa forma -> recipes:home
 app_name = "recipes"
 
+
+def make_urlpatterns(views_module):
+    """Patterns of the read-only pages served by views_module
+    (recipes.views or recipes.async_views)."""
+    return [
+        path("", views_module.RecipeListViewHome.as_view(), name="home"),
+        path(
+            "recipes/search/",
+            views_module.RecipeListViewSearch.as_view(),
+            name="search",
+        ),
+        path(
+            "recipes/category/<int:category_id>/",
+            views_module.RecipeListViewCategory.as_view(),
+            name="category",
+        ),
+        # Old id URLs, before the slug route that would match them too
+        path(
+            "recipes/<int:pk>/",
+            views_module.RecipeDetailRedirect.as_view(),
+            name="recipe_redirect",
+        ),
+        path(
+            "recipes/<slug:slug>/",
+            views_module.RecipeDetail.as_view(),
+            name="recipe",
+        ),
+        # Served by the same (sync) views with either module; the pages
+        # link to the feeds
+        path("sitemap.xml", sitemaps.SitemapIndex.as_view(), name="sitemap"),
+        path(
+            "sitemap-recipes-<int:chunk>.xml",
+            sitemaps.RecipeSitemap.as_view(),
+            name="sitemap_recipes",
+        ),
+        path("feeds/recipes.rss", feeds.RecipeFeed.as_view(), name="feed"),
+        path(
+            "feeds/recipes.atom",
+            feeds.RecipeAtomFeed.as_view(),
+            name="feed_atom",
+        ),
+        path("robots.txt", sitemaps.robots_txt, name="robots"),
+    ]
+
+
 urlpatterns = [
-    path("", views.RecipeListViewHome.as_view(), name="home"),
+    *make_urlpatterns(async_views if settings.RECIPES_ASYNC_VIEWS else views),
+    path("api/recipes/", api.RecipeListApi.as_view(), name="api_list"),
+    path(
+        "api/recipes/search/",
+        api.RecipeSearchApi.as_view(),
+        name="api_search",
+    ),
     path(
-        "recipes/search/", views.RecipeListViewSearch.as_view(), name="search"
+        "api/recipes/category/<int:category_id>/",
+        api.RecipeCategoryApi.as_view(),
+        name="api_category",
     ),
     path(
-        "recipes/category/<int:category_id>/",
-        views.RecipeListViewCategory.as_view(),
-        name="category",
+        "api/recipes/<int:pk>/",
+        api.RecipeDetailApi.as_view(),
+        name="api_recipe",
     ),
-    path("recipes/<int:pk>/", views.RecipeDetail.as_view(), name="recipe"),
 ]
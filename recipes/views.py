@@ -1,26 +1,49 @@
 # {# djlint:off H014 #}
 import os
 
-from django.db.models import Q
 from django.http.response import Http404
-from django.views.generic import DetailView, ListView
-
-from recipes.models import Recipe
-from utils.pagination import make_pagination
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.generic import DetailView, ListView, RedirectView
+
+from recipes.cache import (
+    CATEGORIES_TAG,
+    RECIPES_TAG,
+    category_tag,
+    recipe_count_provider,
+    recipe_tag,
+)
+from recipes.models import Category, Recipe
+from recipes.search import get_search_engine
+from recipes.slugs import forget_recipe_slug, resolve_recipe_slug
+from utils.cache import AnonymousPageCacheMixin
+from utils.pagination import (
+    PAGINATION_NUMBERED,
+    KnownCountProvider,
+    make_pagination,
+)
 
 PER_PAGE = int(os.environ.get("PER_PAGE", 6))  # noqa: PLW1508
 
 
-class RecipeListViewBase(ListView):
+class RecipeListViewBase(AnonymousPageCacheMixin, ListView):
     model = Recipe
     context_object_name = "recipes"
     paginate_by = None
     ordering = ["-id"]
     template_name = "recipes/pages/home.html"
+    # PAGINATION_CURSOR replaces the numbered pages with ?after=/?before=
+    # links, without COUNT(*) or OFFSET (needs the ordering by -id)
+    pagination_mode = PAGINATION_NUMBERED
+    count_provider = recipe_count_provider
+    estimate_count = False
+
+    def get_page_cache_tags(self):
+        return (RECIPES_TAG, CATEGORIES_TAG)
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(is_published=True)
+        qs = qs.published()
         return qs
 
     def get_context_data(self, *args, **kwargs):
@@ -29,6 +52,9 @@ class RecipeListViewBase(ListView):
             self.request,
             ctx.get("recipes"),
             PER_PAGE,
+            mode=self.pagination_mode,
+            count_provider=self.count_provider,
+            estimate_count=self.estimate_count,
         )
         ctx.update(
             {
@@ -41,19 +67,29 @@ class RecipeListViewBase(ListView):
 
 class RecipeListViewHome(RecipeListViewBase):
     template_name = "recipes/pages/home.html"
+    estimate_count = True
 
 
 class RecipeListViewCategory(RecipeListViewBase):
     template_name = "recipes/pages/category.html"
 
-    def get_queryset(self, *args, **kwargs):
-        # sourcery skip: reintroduce-else, swap-if-else-branches
-        qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(category__id=self.kwargs.get("category_id"))
+    def get_page_cache_tags(self):
+        return (category_tag(self.kwargs.get("category_id")),)
 
-        if not qs:
-            raise Http404()
+    def get_category(self):
+        # The counter tells without touching the recipes whether the
+        # category has published ones, and how many pages they fill
+        return get_object_or_404(
+            Category.objects.filter(published_count__gt=0),
+            pk=self.kwargs.get("category_id"),
+        )
 
+    def get_queryset(self, *args, **kwargs):
+        self.category = self.get_category()
+        self.count_provider = KnownCountProvider(self.category.published_count)
+
+        qs = super().get_queryset(*args, **kwargs)
+        qs = qs.filter(category=self.category)
         return qs
 
     def get_context_data(self, *args, **kwargs):
@@ -61,7 +97,8 @@ class RecipeListViewCategory(RecipeListViewBase):
 
         ctx.update(
             {
-                "title": f"{ctx.get('recipes')[0].category.name} - Category | ",
+                "category": self.category,
+                "title": f"{self.category.name} - Category | ",
             }
         )
 
@@ -70,6 +107,8 @@ class RecipeListViewCategory(RecipeListViewBase):
 
 class RecipeListViewSearch(RecipeListViewBase):
     template_name = "recipes/pages/search.html"
+    # Results are ordered by relevance, not by -id
+    pagination_mode = PAGINATION_NUMBERED
 
     def get_queryset(self, *args, **kwargs):
         search_term = self.request.GET.get("q", "").strip()
@@ -78,13 +117,7 @@ class RecipeListViewSearch(RecipeListViewBase):
             raise Http404()
 
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(
-            Q(
-                Q(title__icontains=search_term)
-                | Q(description__icontains=search_term),
-            ),
-            Q(is_published=True),
-        )
+        qs = get_search_engine().search(qs, search_term)
         return qs
 
     def get_context_data(self, *args, **kwargs):
@@ -102,16 +135,42 @@ class RecipeListViewSearch(RecipeListViewBase):
         return ctx
 
 
-class RecipeDetail(DetailView):
+class RecipeDetail(AnonymousPageCacheMixin, DetailView):
     model = Recipe
     context_object_name = "recipe"
     template_name = "recipes/pages/recipe-view.html"
 
+    def dispatch(self, request, *args, **kwargs):
+        # The page cache needs the id for the tags before the view runs
+        self.recipe_id = resolve_recipe_slug(self.kwargs.get("slug"))
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_page_cache_tags(self):
+        if self.recipe_id is None:
+            return ()
+        return (recipe_tag(self.recipe_id), CATEGORIES_TAG)
+
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(is_published=True)
+        qs = qs.filter(is_published=True).with_relations()
         return qs
 
+    def get_object(self, queryset=None):
+        if self.recipe_id is None:
+            raise Http404()
+
+        slug = self.kwargs.get("slug")
+        qs = self.get_queryset() if queryset is None else queryset
+        recipe = qs.filter(pk=self.recipe_id).first()
+
+        if recipe is None or recipe.slug != slug:
+            # The id may come from a stale entry of the local LRU, the
+            # slug having moved to another recipe since
+            forget_recipe_slug(slug)
+            recipe = get_object_or_404(qs, slug=slug)
+
+        return recipe
+
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
 
@@ -122,3 +181,22 @@ class RecipeDetail(DetailView):
         )
 
         return ctx
+
+
+class RecipeDetailRedirect(RedirectView):
+    """Old /recipes/<pk>/ URLs, moved permanently to /recipes/<slug>/."""
+
+    permanent = True
+
+    def get_redirect_url(self, *args, **kwargs):
+        slug = (
+            Recipe.objects.filter(pk=self.kwargs.get("pk"), is_published=True)
+            .values_list("slug", flat=True)
+            .first()
+        )
+        if slug is None:
+            raise Http404()
+
+        url = reverse("recipes:recipe", args=(slug,))
+        query = self.request.META.get("QUERY_STRING")
+        return f"{url}?{query}" if query else url
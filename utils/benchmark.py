@@ -0,0 +1,129 @@
+import http.client
+import math
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+from time import perf_counter, sleep
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def measure(func, *args, **kwargs):
+    """Run func once and return its result with time, queries and memory.
+
+    Memory is the peak of Python allocations (tracemalloc) while func runs,
+    so it shows how many rows/objects a view materializes.
+    """
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, {
+        "seconds": elapsed,
+        "queries": len(queries),
+        "peak_memory_bytes": peak,
+    }
+
+
+def format_measurement(label, measurement):
+    return (
+        f"{label}: {measurement['seconds'] * 1000:.1f} ms, "
+        f"{measurement['queries']} queries, "
+        f"{measurement['peak_memory_bytes'] / 1024:.0f} KiB peak"
+    )
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct between 0 and 100) of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies):
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0,
+    }
+
+
+def wait_for_server(host, port, path="/", timeout=30.0):
+    """Returns once host:port answers a GET of path, or raises
+    TimeoutError after `timeout` seconds."""
+    deadline = perf_counter() + timeout
+    while True:
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        try:
+            connection.request("GET", path)
+            connection.getresponse().read()
+            return
+        except OSError:
+            if perf_counter() > deadline:
+                raise TimeoutError(f"{host}:{port} is not answering")
+            sleep(0.1)
+        finally:
+            connection.close()
+
+
+def run_http_load(host, port, paths, requests, concurrency):
+    """GETs `requests` requests of paths (in turn) from `concurrency`
+    threads, each one keeping its connection open like a browser.
+
+    Returns summarize_latencies() of the successful requests with the
+    requests per second and the number of errors (status >= 500 and
+    connection failures).
+    """
+    local = threading.local()
+    paths = cycle(paths)
+    paths_lock = threading.Lock()
+
+    def get(_):
+        with paths_lock:
+            path = next(paths)
+
+        if getattr(local, "connection", None) is None:
+            local.connection = http.client.HTTPConnection(
+                host, port, timeout=30
+            )
+
+        start = perf_counter()
+        try:
+            local.connection.request("GET", path)
+            response = local.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            local.connection = None
+            return None
+
+        if response.will_close:
+            local.connection.close()
+            local.connection = None
+        if response.status >= 500:
+            return None
+        return perf_counter() - start
+
+    start = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(get, range(requests)))
+    elapsed = perf_counter() - start
+
+    latencies = [latency for latency in results if latency is not None]
+    return {
+        **summarize_latencies(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "errors": requests - len(latencies),
+    }
@@ -0,0 +1,283 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from utils.instrumentation import record_cache_lookup
+
+TAG_KEY_PREFIX = "tag-version"
+
+
+def make_tag_key(tag):
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def get_tag_versions(*tags):
+    """Return the current version of each tag, creating the missing ones.
+
+    Cache entries that depend on a tag store or embed its version; bumping
+    the version with invalidate_tags() makes all of them stale at once.
+    """
+    keys = {make_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(list(keys))
+
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    for key, version in missing.items():
+        # add() keeps a version created by another process in the meantime
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+        versions[key] = version
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aget_tag_versions(*tags):
+    """get_tag_versions() with the async cache API."""
+    keys = {make_tag_key(tag): tag for tag in tags}
+    versions = await cache.aget_many(list(keys))
+
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    for key, version in missing.items():
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+        versions[key] = version
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_tags(*tags):
+    cache.set_many(
+        {make_tag_key(tag): uuid4().hex for tag in tags},
+        timeout=None,
+    )
+
+
+def invalidate_tags_on_commit(*tags):
+    """invalidate_tags() once the current transaction commits.
+
+    Bumped before the commit, the versions could be read by a request
+    that still sees the old rows and caches them under the new versions.
+    """
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def make_page_cache_key(request):
+    # The full path carries the query string, page number included
+    digest = hashlib.md5(request.get_full_path().encode("utf-8")).hexdigest()
+    return f"page:{digest}"
+
+
+def is_page_cacheable_request(request):
+    if not settings.PAGE_CACHE_ENABLED or request.method not in ("GET", "HEAD"):
+        return False
+
+    if request.user.is_authenticated:
+        return False
+
+    # A flash message would be rendered into the page shared by everybody
+    return not len(messages.get_messages(request))
+
+
+def is_page_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header("Cache-Control")
+    )
+
+
+def set_page_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    # Browsers revalidate every time and get a 304 while the page is current
+    patch_cache_control(response, max_age=0, must_revalidate=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def make_page_cache_entry(response, versions):
+    return {
+        "content": response.content,
+        "content_type": response.headers["Content-Type"],
+        "etag": f'"{hashlib.md5(response.content).hexdigest()}"',
+        "last_modified": int(time.time()),
+        "versions": versions,
+    }
+
+
+def get_cached_page_response(request, entry, response=None):
+    response = get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=entry["last_modified"],
+        response=response,
+    )
+
+    if response is None:
+        response = HttpResponse(
+            entry["content"], content_type=entry["content_type"]
+        )
+
+    return set_page_validators(response, entry["etag"], entry["last_modified"])
+
+
+class AnonymousPageCacheMixin:
+    """Serves anonymous GET requests of a view from the cache.
+
+    Pages are cached per full path for PAGE_CACHE_TIMEOUT seconds together
+    with the versions of the tags returned by get_page_cache_tags(), so an
+    invalidate_tags() call on any of them makes the page stale. Responses
+    carry ETag and Last-Modified, and conditional requests for a cached page
+    get a 304 without running the view. Logged in users bypass the cache.
+    """
+
+    def get_page_cache_tags(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_page_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = make_page_cache_key(request)
+        versions = get_tag_versions(*self.get_page_cache_tags())
+        entry = cache.get(key)
+        is_hit = entry is not None and entry["versions"] == versions
+        record_cache_lookup(is_hit)
+
+        if is_hit:
+            return get_cached_page_response(request, entry)
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        if hasattr(response, "render") and callable(response.render):
+            response = response.render()
+
+        if not is_page_cacheable_response(response):
+            return response
+
+        entry = make_page_cache_entry(response, versions)
+        cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+
+        return get_cached_page_response(request, entry, response)
+
+
+class AsyncAnonymousPageCacheMixin(AnonymousPageCacheMixin):
+    """AnonymousPageCacheMixin for views with async handlers.
+
+    Uses the async cache API and resolves request.user up front: the lazy
+    user would load the session and the user synchronously when read by
+    the cacheability check or the templates, which the event loop forbids.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        # View.dispatch(), skipping the synchronous page cache
+        view_dispatch = super(AnonymousPageCacheMixin, self).dispatch
+
+        if not is_page_cacheable_request(request):
+            return await view_dispatch(request, *args, **kwargs)
+
+        key = make_page_cache_key(request)
+        versions = await aget_tag_versions(*self.get_page_cache_tags())
+        entry = await cache.aget(key)
+        is_hit = entry is not None and entry["versions"] == versions
+        record_cache_lookup(is_hit)
+
+        if is_hit:
+            return get_cached_page_response(request, entry)
+
+        response = await view_dispatch(request, *args, **kwargs)
+
+        if hasattr(response, "render") and callable(response.render):
+            # Templates may query the database, which the event loop forbids
+            response = await sync_to_async(response.render)()
+
+        if not is_page_cacheable_response(response):
+            return response
+
+        entry = make_page_cache_entry(response, versions)
+        await cache.aset(key, entry, settings.PAGE_CACHE_TIMEOUT)
+
+        return get_cached_page_response(request, entry, response)
+
+
+class LRUCache:
+    """Small thread safe in-process cache that evicts the least recently
+    used key once max_size keys are stored."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TwoTierCache:
+    """LRUCache in front of the shared Django cache.
+
+    Only meant for keys whose value never changes (e.g. keys carrying an
+    updated_at), as the local tier of other processes is not invalidated.
+    """
+
+    def __init__(self, max_size, timeout=None):
+        self.local = LRUCache(max_size)
+        self.timeout = timeout
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            record_cache_lookup(True)
+            return value
+
+        value = cache.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        record_cache_lookup(value is not None)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        cache.set(key, value, self.timeout)
+
+    def clear(self):
+        self.local.clear()
@@ -0,0 +1,107 @@
+"""Per-request metrics collected by utils.middleware.ServerTimingMiddleware.
+
+Metrics are only gathered while a RequestMetrics is active in the current
+context (the middleware is on); otherwise every hook is a ContextVar
+lookup returning None.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+from django.template.base import Template
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+_template_timer_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper (connection.execute_wrapper())
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_seconds += perf_counter() - start
+
+
+@contextmanager
+def collect_request_metrics():
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+
+    try:
+        yield metrics
+    finally:
+        current_metrics.reset(token)
+
+
+def count_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def add_query_counters():
+    """Adds count_query() to the database connections of the current
+    thread, which counts the queries of the active RequestMetrics.
+
+    The wrapper stays on the connections. Async views query from threads
+    with their own connections, so the middleware calls it from there;
+    the RequestMetrics is found through the copied ContextVar.
+    """
+    for connection in connections.all():
+        if count_query not in connection.execute_wrappers:
+            # First, as connection.execute_wrapper() pops the last one
+            connection.execute_wrappers.insert(0, count_query)
+
+
+def record_cache_lookup(hit):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return
+
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def install_template_timer():
+    """Wraps Template.render to add the render time of the outermost
+    template to the active RequestMetrics. Templates rendered inside it
+    (includes, recipe cards) are part of that time."""
+    with _template_timer_lock:
+        if getattr(Template.render, "is_timed", False):
+            return
+
+        render = Template.render
+
+        def timed_render(self, context):
+            metrics = current_metrics.get()
+            if metrics is None or metrics._template_depth:
+                return render(self, context)
+
+            metrics._template_depth += 1
+            start = perf_counter()
+            try:
+                return render(self, context)
+            finally:
+                metrics.template_seconds += perf_counter() - start
+                metrics._template_depth -= 1
+
+        timed_render.is_timed = True
+        Template.render = timed_render
@@ -0,0 +1,210 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from utils.benchmark import summarize_latencies
+from utils.instrumentation import (
+    add_query_counters,
+    collect_request_metrics,
+    install_template_timer,
+)
+
+logger = logging.getLogger(__name__)
+
+TIMING_PROBE = "utils.middleware.MiddlewareTimingProbe"
+VIEW = "view"
+
+
+def add_timing_probes(middleware):
+    """Returns the MIDDLEWARE list with a MiddlewareTimingProbe before each
+    entry and one before the view."""
+    probed = []
+    for path in middleware:
+        if path != TIMING_PROBE:
+            probed += [TIMING_PROBE, path]
+    return [*probed, TIMING_PROBE]
+
+
+def get_probed_name(get_response):
+    # Django wraps each middleware with convert_exception_to_response(),
+    # which keeps the instance in __wrapped__. The innermost probe gets
+    # the handler method that resolves and runs the view.
+    wrapped = getattr(get_response, "__wrapped__", get_response)
+    if getattr(wrapped, "__self__", None) is not None:
+        return VIEW
+    # The middleware after this probe raised MiddlewareNotUsed
+    if isinstance(wrapped, MiddlewareTimingProbe):
+        return None
+    return f"{type(wrapped).__module__}.{type(wrapped).__qualname__}"
+
+
+class MiddlewareTimings:
+    """Thread safe store of the time spent in each middleware per request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, timings):
+        with self._lock:
+            for name, seconds in timings.items():
+                self._timings[name].append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._timings = defaultdict(list)
+
+    def summary(self):
+        """{name: summarize_latencies()} in the middleware order."""
+        with self._lock:
+            return {
+                name: summarize_latencies(seconds)
+                for name, seconds in self._timings.items()
+            }
+
+
+middleware_timings = MiddlewareTimings()
+
+
+class MiddlewareTimingProbe:
+    """Measures the middleware (or the view) right after it.
+
+    Each probe times everything below it, so the cost of a middleware is
+    its probe's time minus the next probe's time. The outermost probe does
+    the subtraction and records the result in `middleware_timings`. The
+    process_view() hooks run with the view, so they are counted in "view".
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.name = get_probed_name(get_response)
+
+    def __call__(self, request):
+        probes = request.__dict__.setdefault("_middleware_probes", [])
+        is_outermost = not probes
+        index = len(probes)
+        probes.append([self.name, 0.0])
+
+        start = perf_counter()
+        response = self.get_response(request)
+        probes[index][1] = perf_counter() - start
+
+        if is_outermost:
+            self.record(request, probes)
+
+        return response
+
+    def record(self, request, probes):
+        timings = {}
+        for index, (name, inclusive) in enumerate(probes):
+            inner = probes[index + 1][1] if index + 1 < len(probes) else 0.0
+            if name is not None:
+                timings[name] = inclusive - inner
+
+        middleware_timings.record(timings)
+        logger.debug(
+            "%s %s middleware: %s",
+            request.method,
+            request.path,
+            ", ".join(
+                f"{name.rsplit('.', 1)[-1]} {seconds * 1000:.2f} ms"
+                for name, seconds in timings.items()
+            ),
+        )
+
+
+class ServerTimingMiddleware:
+    """Reports where the time of each request goes (SERVER_TIMING_ENABLED).
+
+    Sends the database queries and time, the template render time, the
+    cache hits/misses and the total time in a Server-Timing header and a
+    JSON log line. Requests over SERVER_TIMING_MAX_QUERIES queries or
+    SERVER_TIMING_MAX_MS milliseconds are logged as warnings. When
+    disabled it is removed from the stack (MiddlewareNotUsed).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        install_template_timer()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        add_query_counters()
+        with collect_request_metrics() as metrics:
+            start = perf_counter()
+            response = self.get_response(request)
+            total = perf_counter() - start
+
+        return self.add_timing(request, response, metrics, total)
+
+    async def __acall__(self, request):
+        # The async ORM queries from the thread of sync_to_async()
+        await sync_to_async(add_query_counters)()
+        with collect_request_metrics() as metrics:
+            start = perf_counter()
+            response = await self.get_response(request)
+            total = perf_counter() - start
+
+        return self.add_timing(request, response, metrics, total)
+
+    def add_timing(self, request, response, metrics, total):
+        response.headers["Server-Timing"] = ", ".join(
+            (
+                f"db;dur={metrics.query_seconds * 1000:.2f};"
+                f'desc="{metrics.queries} queries"',
+                f"tpl;dur={metrics.template_seconds * 1000:.2f}",
+                f'cache;desc="{metrics.cache_hits} hits '
+                f'{metrics.cache_misses} misses"',
+                f"total;dur={total * 1000:.2f}",
+            )
+        )
+        self.log(request, response, metrics, total)
+        return response
+
+    def get_exceeded_thresholds(self, metrics, total):
+        exceeded = []
+        if metrics.queries > settings.SERVER_TIMING_MAX_QUERIES:
+            exceeded.append("queries")
+        if total * 1000 > settings.SERVER_TIMING_MAX_MS:
+            exceeded.append("time")
+        return exceeded
+
+    def log(self, request, response, metrics, total):
+        exceeded = self.get_exceeded_thresholds(metrics, total)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "db_queries": metrics.queries,
+            "db_ms": round(metrics.query_seconds * 1000, 2),
+            "template_ms": round(metrics.template_seconds * 1000, 2),
+            "cache_hits": metrics.cache_hits,
+            "cache_misses": metrics.cache_misses,
+            "exceeded": exceeded,
+        }
+
+        logger.log(
+            logging.WARNING if exceeded else logging.INFO,
+            json.dumps(record),
+        )
@@ -1,6 +1,26 @@
+import hashlib
+import json
 import math
+import threading
+from collections.abc import Sequence
 
-from django.core.paginator import Paginator
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.encoding import force_bytes, force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from utils.cache import aget_tag_versions, get_tag_versions, invalidate_tags
+from utils.instrumentation import record_cache_lookup
+
+PAGINATION_NUMBERED = "numbered"
+PAGINATION_CURSOR = "cursor"
+# Orderings the cursor (a pk) can page through, () being unordered
+CURSOR_ORDERINGS = ((), ("-pk",), ("-id",))
 
 
 def make_pagination_range(page_range, qty_pages, current_page):
@@ -34,13 +54,180 @@ def make_pagination_range(page_range, qty_pages, current_page):
     }
 
 
-def make_pagination(request, queryset, per_page, qty_pages=4):
+class CachedCountProvider:
+    """Caches COUNT(*) results per filter signature (the SQL and its params).
+
+    Entries expire after `timeout` seconds and are dropped at once when any of
+    `tags` is invalidated (see utils.cache). On PostgreSQL, counts allowed to
+    be estimated use the planner row estimate when it is above
+    `estimate_threshold`, avoiding a full count on very large sets.
+    """
+
+    def __init__(self, tags=(), timeout=None, estimate_threshold=None):
+        self.tags = tuple(tags)
+        self.timeout = timeout
+        self.estimate_threshold = estimate_threshold
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def get_timeout(self):
+        if self.timeout is not None:
+            return self.timeout
+        return settings.COUNT_CACHE_TIMEOUT
+
+    def get_estimate_threshold(self):
+        if self.estimate_threshold is not None:
+            return self.estimate_threshold
+        return settings.COUNT_ESTIMATE_THRESHOLD
+
+    def make_key(self, queryset, versions=None):
+        if versions is None:
+            versions = get_tag_versions(*self.tags)
+
+        sql, params = queryset.query.sql_with_params()
+        signature = json.dumps(
+            [queryset.db, sql, [str(param) for param in params], versions],
+            sort_keys=True,
+        )
+        digest = hashlib.md5(signature.encode("utf-8")).hexdigest()
+        return f"count:{queryset.model._meta.label_lower}:{digest}"
+
+    def count(self, queryset, estimate=False):
+        key = self.make_key(queryset)
+        value = cache.get(key)
+
+        record_cache_lookup(value is not None)
+
+        if value is not None:
+            self._record("hits")
+            return value
+
+        self._record("misses")
+        value = self.estimate(queryset) if estimate else None
+
+        if value is None:
+            value = queryset.count()
+        else:
+            self._record("estimates")
+
+        cache.set(key, value, self.get_timeout())
+        return value
+
+    async def acount(self, queryset, estimate=False):
+        """count() for async views."""
+        versions = await aget_tag_versions(*self.tags)
+        key = self.make_key(queryset, versions)
+        value = await cache.aget(key)
+
+        record_cache_lookup(value is not None)
+
+        if value is not None:
+            self._record("hits")
+            return value
+
+        self._record("misses")
+        if estimate:
+            value = await sync_to_async(self.estimate)(queryset)
+
+        if value is None:
+            value = await queryset.acount()
+        else:
+            self._record("estimates")
+
+        await cache.aset(key, value, self.get_timeout())
+        return value
+
+    def estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        rows = int(plan[0]["Plan"]["Plan Rows"])
+        if rows < self.get_estimate_threshold():
+            return None
+        return rows
+
+    def invalidate(self):
+        invalidate_tags(*self.tags)
+
+    def _record(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {"hits": 0, "misses": 0, "estimates": 0}
+
+
+class KnownCountProvider:
+    """Count provider of a count known beforehand, e.g. a counter kept on
+    another row (recipes.models.Category.published_count): no query."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def count(self, queryset, estimate=False):
+        return self.value
+
+    async def acount(self, queryset, estimate=False):
+        return self.value
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(
+        self, *args, count_provider=None, estimate_count=False, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.count_provider = count_provider
+        self.estimate_count = estimate_count
+
+    @cached_property
+    def count(self):
+        if self.count_provider is None or not hasattr(
+            self.object_list, "query"
+        ):
+            return super().count
+
+        return self.count_provider.count(
+            self.object_list, estimate=self.estimate_count
+        )
+
+
+def make_pagination(
+    request,
+    queryset,
+    per_page,
+    qty_pages=4,
+    mode=PAGINATION_NUMBERED,
+    count_provider=None,
+    estimate_count=False,
+):
+    if mode == PAGINATION_CURSOR:
+        return make_cursor_pagination(request, queryset, per_page)
+
     try:
         current_page = int(request.GET.get("page", 1))
     except ValueError:
         current_page = 1
 
-    paginator = Paginator(queryset, per_page)
+    paginator = CachedCountPaginator(
+        queryset,
+        per_page,
+        count_provider=count_provider,
+        estimate_count=estimate_count,
+    )
     page_obj = paginator.get_page(current_page)
 
     pagination_range = make_pagination_range(
@@ -48,3 +235,178 @@ def make_pagination(request, queryset, per_page, qty_pages=4):
     )
 
     return page_obj, pagination_range
+
+
+async def aslice(object_list, start, stop):
+    """Evaluates object_list[start:stop] from async code."""
+    if isinstance(object_list, QuerySet):
+        return [obj async for obj in object_list[start:stop]]
+
+    # Other sequences (e.g. search results) may query synchronously
+    return await sync_to_async(object_list.__getitem__)(slice(start, stop))
+
+
+async def amake_pagination(
+    request,
+    queryset,
+    per_page,
+    qty_pages=4,
+    mode=PAGINATION_NUMBERED,
+    count_provider=None,
+    estimate_count=False,
+):
+    """make_pagination() for async views. The page is a list, so the
+    templates render it without querying the database."""
+    if mode == PAGINATION_CURSOR:
+        return await amake_cursor_pagination(request, queryset, per_page)
+
+    try:
+        current_page = int(request.GET.get("page", 1))
+    except ValueError:
+        current_page = 1
+
+    if count_provider is not None and hasattr(queryset, "query"):
+        count = await count_provider.acount(queryset, estimate=estimate_count)
+    elif isinstance(queryset, QuerySet):
+        count = await queryset.acount()
+    else:
+        count = len(queryset)
+
+    paginator = Paginator(queryset, per_page)
+    paginator.count = count
+
+    # Same fallbacks as Paginator.get_page()
+    try:
+        number = paginator.validate_number(current_page)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+
+    bottom = (number - 1) * per_page
+    object_list = await aslice(queryset, bottom, bottom + per_page)
+    page_obj = paginator._get_page(object_list, number, paginator)
+
+    pagination_range = make_pagination_range(
+        paginator.page_range, qty_pages, current_page
+    )
+
+    return page_obj, pagination_range
+
+
+def encode_cursor(pk):
+    return urlsafe_base64_encode(force_bytes(pk))
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+
+    try:
+        return int(force_str(urlsafe_base64_decode(token)))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+class CursorPage(Sequence):
+    """Page of a keyset pagination, without a paginator or a total count.
+
+    Mimics the parts of django.core.paginator.Page used by the templates.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage after {self.previous_cursor or 'start'}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def get_cursor_slice(request, queryset, per_page):
+    # Keyset pagination on -pk: no COUNT(*) and no OFFSET, so the cost of a
+    # page does not depend on how deep it is. One extra row tells if there
+    # is a page after it.
+    if (
+        not isinstance(queryset, QuerySet)
+        or tuple(queryset.query.order_by) not in CURSOR_ORDERINGS
+    ):
+        # Paging by pk would silently drop their order, e.g. the relevance
+        # of search results
+        raise ValueError(
+            "Cursor pagination needs a queryset ordered by -pk, use "
+            "numbered pagination for other orderings."
+        )
+
+    after = decode_cursor(request.GET.get("after"))
+    before = decode_cursor(request.GET.get("before"))
+
+    queryset = queryset.order_by("-pk")
+
+    if before is not None:
+        queryset = queryset.filter(pk__gt=before).order_by("pk")
+    elif after is not None:
+        queryset = queryset.filter(pk__lt=after)
+
+    return queryset[: per_page + 1], after, before
+
+
+def make_cursor_page(rows, per_page, after, before):
+    if before is not None:
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = after is not None
+
+    next_cursor = encode_cursor(rows[-1].pk) if has_next and rows else None
+    previous_cursor = (
+        encode_cursor(rows[0].pk) if has_previous and rows else None
+    )
+
+    page_obj = CursorPage(rows, next_cursor, previous_cursor)
+
+    pagination_range = {
+        "pagination": [],
+        "page_range": [],
+        "qty_pages": 0,
+        "current_page": None,
+        "total_pages": None,
+        "start_range": 0,
+        "stop_range": 0,
+        "first_page_out_of_range": False,
+        "last_page_out_of_range": False,
+        "is_cursor": True,
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor,
+    }
+
+    return page_obj, pagination_range
+
+
+def make_cursor_pagination(request, queryset, per_page):
+    rows, after, before = get_cursor_slice(request, queryset, per_page)
+    return make_cursor_page(list(rows), per_page, after, before)
+
+
+async def amake_cursor_pagination(request, queryset, per_page):
+    rows, after, before = get_cursor_slice(request, queryset, per_page)
+    rows = [row async for row in rows]
+    return make_cursor_page(rows, per_page, after, before)
@@ -0,0 +1,143 @@
+"""Unique slugs generated from titles (e.g. recipes.models.Recipe).
+
+Titles that slugify alike get numeric suffixes: "cake", "cake-2",
+"cake-3"... SlugAllocator.allocate() picks the next one with a single
+query for the highest suffix in use, never reusing the slugs of deleted
+rows below it. allocate_many() does it for a whole batch of titles in
+memory (bulk_create), with one query for the batch plus one per title
+that is repeated in it or already taken.
+
+Allocation is optimistic: a concurrent save can take the same slug
+first, which the unique constraint turns into an IntegrityError. Callers
+save in a savepoint and allocate again with the number of the attempt
+(see Recipe.save()). Retries skip a random number of suffixes, growing
+with the attempts, so that the saves that lost the same race don't all
+pick the same next slug again.
+"""
+
+import random
+import re
+from collections import Counter
+
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+# Room left in the field for the "-<n>" suffix
+SUFFIX_LENGTH = 8
+# Largest number of slugs per IN (...) query
+QUERY_BATCH_SIZE = 500
+# Retries skip up to 2 ** attempt suffixes, at most 2 ** MAX_JUMP_BITS
+MAX_JUMP_BITS = 10
+
+
+def get_suffix_jump(attempt):
+    if attempt == 0:
+        return 0
+    return random.randrange(2 ** min(attempt, MAX_JUMP_BITS))
+
+
+class SlugAllocator:
+    """Allocates unique values of the slug `field` of `model`.
+
+    Bare bases for which is_reserved(base) is true are never allocated,
+    e.g. the ones a URL pattern would shadow: their titles start at
+    suffix 2. Titles without any letter or digit get the model name.
+    """
+
+    def __init__(self, model, field="slug", is_reserved=None):
+        self.model = model
+        self.field = field
+        self.is_reserved = is_reserved
+
+    @property
+    def max_length(self):
+        return self.model._meta.get_field(self.field).max_length
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def make_base(self, title):
+        base = slugify(title)[: self.max_length - SUFFIX_LENGTH].strip("-_")
+        return base or self.model._meta.model_name
+
+    def make_slug(self, base, suffix):
+        return base if suffix == 1 else f"{base}-{suffix}"
+
+    def get_min_suffix(self, base):
+        """Highest suffix to consider taken whatever the database has."""
+        if self.is_reserved is not None and self.is_reserved(base):
+            return 1
+        return 0
+
+    def get_highest_suffix(self, base):
+        """Highest suffix of base in use: 0 if free, 1 if only the bare
+        base is taken.
+
+        One query returns the longest, then greatest, slug made of base
+        and a suffix: the one with the highest suffix. The prefix filter
+        lets PostgreSQL use the index of the field.
+        """
+        pattern = rf"^{re.escape(base)}(-[1-9][0-9]*)?$"
+        slug = (
+            self.get_queryset()
+            .filter(
+                **{
+                    f"{self.field}__startswith": base,
+                    f"{self.field}__regex": pattern,
+                }
+            )
+            .order_by(Length(self.field).desc(), f"-{self.field}")
+            .values_list(self.field, flat=True)
+            .first()
+        )
+        if slug is None:
+            return self.get_min_suffix(base)
+        return max(int(slug[len(base) + 1 :] or 1), self.get_min_suffix(base))
+
+    def get_taken_slugs(self, slugs):
+        slugs = list(slugs)
+        lookup = f"{self.field}__in"
+        taken = set()
+        for start in range(0, len(slugs), QUERY_BATCH_SIZE):
+            batch = slugs[start : start + QUERY_BATCH_SIZE]
+            taken.update(
+                self.get_queryset()
+                .filter(**{lookup: batch})
+                .values_list(self.field, flat=True)
+            )
+        return taken
+
+    def allocate(self, title, attempt=0):
+        base = self.make_base(title)
+        suffix = self.get_highest_suffix(base) + 1 + get_suffix_jump(attempt)
+        return self.make_slug(base, suffix)
+
+    def allocate_many(self, titles, taken=(), attempt=0):
+        """Slugs for each of `titles`, unique among themselves and with
+        the slugs in `taken` (e.g. the ones already set in the batch)."""
+        bases = [self.make_base(title) for title in titles]
+        counts = Counter(bases)
+        in_use = self.get_taken_slugs(counts)
+        taken = set(taken)
+
+        # Free bases used once are the common case and need no query
+        highest = {
+            base: (
+                self.get_highest_suffix(base) + get_suffix_jump(attempt)
+                if attempt or count > 1 or base in in_use or base in taken
+                else self.get_min_suffix(base)
+            )
+            for base, count in counts.items()
+        }
+
+        slugs = []
+        for base in bases:
+            suffix = highest[base] + 1
+            while self.make_slug(base, suffix) in taken:
+                suffix += 1
+
+            highest[base] = suffix
+            slug = self.make_slug(base, suffix)
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
@@ -0,0 +1,274 @@
+"""Production static files: bundled, content-hashed and precompressed.
+
+collectstatic with CompressedManifestStaticFilesStorage:
+1. writes each STATIC_BUNDLES entry (CSS concatenated and minified);
+2. copies every file with its content hash in the name (the manifest);
+3. writes a .gz and, when the brotli package is installed, a .br next to
+   every compressible file.
+
+StaticFilesMiddleware serves STATIC_ROOT from the application when
+STATIC_SERVE is on: hashed names are cached for a year, and the
+precompressed variant accepted by the browser is sent.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.html import format_html_join
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # Optional, only gzip files are written without it
+    brotli = None
+
+register = template.Library()
+
+COMPRESSIBLE_EXTENSIONS = (
+    ".css",
+    ".js",
+    ".mjs",
+    ".map",
+    ".json",
+    ".svg",
+    ".txt",
+    ".xml",
+    ".html",
+    ".ico",
+    ".ttf",
+    ".eot",
+)
+
+# Content-Encoding -> suffix of the precompressed file, preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+CSS_COMMENTS = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_WHITESPACE = re.compile(r"\s+")
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Drops comments and the whitespace that does not change meaning.
+
+    Deliberately conservative: spaces around ":" (descendant selectors
+    such as `a :hover`), "+" and "-" (calc()) are kept.
+    """
+    css = CSS_COMMENTS.sub("", css)
+    css = CSS_WHITESPACE.sub(" ", css)
+    css = CSS_PUNCTUATION.sub(r"\1", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def compress_file(path):
+    """Writes the .gz/.br variants of the file at path, only when they are
+    smaller. Returns the paths written."""
+    data = path.read_bytes()
+    compressed = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+
+    if brotli is not None:
+        compressed.append((".br", brotli.compress(data)))
+
+    written = []
+    for suffix, content in compressed:
+        if len(content) < len(data) * 0.95:
+            target = path.with_name(path.name + suffix)
+            target.write_bytes(content)
+            written.append(target)
+
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Files that were not collected keep their plain name instead of
+    # raising (e.g. tests, or DEBUG off without collectstatic)
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in self.build_bundles():
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        if not dry_run:
+            self.compress_files()
+
+    def build_bundles(self):
+        for bundle, sources in settings.STATIC_BUNDLES.items():
+            contents = []
+            for source in sources:
+                with self.open(source) as file:
+                    contents.append(file.read().decode("utf-8"))
+
+            content = "\n".join(contents)
+            if bundle.endswith(".css"):
+                content = minify_css(content)
+
+            if self.exists(bundle):
+                self.delete(bundle)
+            self._save(bundle, ContentFile(content.encode("utf-8")))
+            yield bundle
+
+    def compress_files(self):
+        for root, _, files in os.walk(self.location):
+            for name in files:
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    compress_file(Path(root) / name)
+
+
+def get_bundle_urls(bundle):
+    """URL of the collected bundle, or of each of its sources when it was
+    not collected (DEBUG, tests)."""
+    if bundle in getattr(staticfiles_storage, "hashed_files", {}):
+        names = [bundle]
+    else:
+        names = settings.STATIC_BUNDLES[bundle]
+
+    return [staticfiles_storage.url(name) for name in names]
+
+
+@register.simple_tag
+def stylesheet_bundle(bundle):
+    return format_html_join(
+        "\n",
+        '<link rel="stylesheet" href="{}">',
+        ((url,) for url in get_bundle_urls(bundle)),
+    )
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        )
+        self.last_modified = int(path.stat().st_mtime)
+        self.encoded = {
+            encoding: path.with_name(path.name + suffix)
+            for encoding, suffix in ENCODINGS
+            if path.with_name(path.name + suffix).is_file()
+        }
+
+    def get_path(self, accept_encoding):
+        accepted = {
+            value.split(";", 1)[0].strip().lower()
+            for value in accept_encoding.split(",")
+        }
+
+        for encoding, _ in ENCODINGS:
+            if encoding in accepted and encoding in self.encoded:
+                return self.encoded[encoding], encoding
+
+        return self.path, None
+
+
+class StaticFilesMiddleware:
+    """Serves the files of STATIC_ROOT when STATIC_SERVE is on.
+
+    STATIC_ROOT is listed once at startup, so a request costs a dict
+    lookup. Names from the manifest (content hashed) get a one year
+    Cache-Control, the others STATIC_MAX_AGE seconds.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = self.find_files(Path(settings.STATIC_ROOT))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def find_files(self, root):
+        if not root.is_dir():
+            return {}
+
+        hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+
+        for path in root.rglob("*"):
+            if not path.is_file() or path.name.endswith(suffixes):
+                continue
+
+            name = path.relative_to(root).as_posix()
+            files[name] = StaticFile(path, immutable=name in hashed)
+
+        return files
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        static_file = self.get_static_file(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        static_file = self.get_static_file(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+
+        return await self.get_response(request)
+
+    def get_static_file(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(
+            self.prefix
+        ):
+            return self.files.get(request.path[len(self.prefix) :])
+        return None
+
+    def serve(self, request, static_file):
+        response = get_conditional_response(
+            request, last_modified=static_file.last_modified
+        )
+
+        if response is None:
+            path, encoding = static_file.get_path(
+                request.headers.get("Accept-Encoding", "")
+            )
+            response = FileResponse(
+                path.open("rb"), content_type=static_file.content_type
+            )
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+
+        last_modified = http_date(static_file.last_modified)
+        response.headers["Last-Modified"] = last_modified
+        response.headers["Cache-Control"] = (
+            "public, max-age=31536000, immutable"
+            if static_file.immutable
+            else f"public, max-age={settings.STATIC_MAX_AGE}"
+        )
+        if static_file.encoded:
+            patch_vary_headers(response, ("Accept-Encoding",))
+
+        return response
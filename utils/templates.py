@@ -0,0 +1,70 @@
+import logging
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = (".html", ".txt", ".xml")
+
+
+def get_project_template_dirs():
+    """DIRS of the template settings plus the templates/ folder of the apps
+    that live inside the project (third party and Django apps are skipped)."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(path) for path in settings.TEMPLATES[0]["DIRS"]]
+    dirs += [Path(path) for path in get_app_template_dirs("templates")]
+
+    return [
+        path
+        for path in dirs
+        if path.is_dir()
+        and path.resolve().is_relative_to(base_dir)
+        and "site-packages" not in path.parts
+    ]
+
+
+def get_project_template_names():
+    names = set()
+
+    for template_dir in get_project_template_dirs():
+        for path in template_dir.rglob("*"):
+            if path.suffix in TEMPLATE_EXTENSIONS:
+                names.add(path.relative_to(template_dir).as_posix())
+
+    return sorted(names)
+
+
+def warm_templates(engine_name="django"):
+    """Compiles every project template, filling the cached loader.
+
+    Returns (template name, seconds) pairs, slowest first.
+    """
+    engine = engines[engine_name]
+    timings = []
+
+    for name in get_project_template_names():
+        start = perf_counter()
+        engine.get_template(name)
+        timings.append((name, perf_counter() - start))
+
+    timings.sort(key=lambda timing: timing[1], reverse=True)
+    return timings
+
+
+def log_template_warmup():
+    timings = warm_templates()
+    total = sum(seconds for _, seconds in timings)
+
+    logger.info(
+        "Compiled %d templates in %.1f ms (slowest: %s)",
+        len(timings),
+        total * 1000,
+        ", ".join(
+            f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings[:3]
+        ),
+    )
+    return timings
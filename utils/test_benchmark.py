@@ -0,0 +1,72 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from utils.benchmark import (
+    percentile,
+    run_http_load,
+    summarize_latencies,
+    wait_for_server,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 500 if self.path == "/error" else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile_uses_the_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([3, 1, 2], 0), 1)
+
+    def test_percentile_of_no_values_is_zero(self):
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_summarize_latencies_reports_milliseconds(self):
+        summary = summarize_latencies([0.001, 0.002, 0.003, 0.010])
+        self.assertEqual(summary["requests"], 4)
+        self.assertAlmostEqual(summary["p50_ms"], 2)
+        self.assertAlmostEqual(summary["p99_ms"], 10)
+        self.assertAlmostEqual(summary["mean_ms"], 4)
+
+
+class HttpLoadTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_requests_are_spread_over_the_paths(self):
+        wait_for_server("127.0.0.1", self.port)
+
+        result = run_http_load(
+            "127.0.0.1", self.port, ["/", "/error"], 20, concurrency=4
+        )
+
+        self.assertEqual(result["requests"], 10)
+        self.assertEqual(result["errors"], 10)
+        self.assertGreater(result["requests_per_second"], 0)
+
+    def test_waiting_for_a_closed_port_times_out(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+        with self.assertRaises(TimeoutError):
+            wait_for_server("127.0.0.1", self.port, timeout=0.2)
@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import TestCase as DjangoTestCase
+
+from utils.cache import (
+    LRUCache,
+    TwoTierCache,
+    get_tag_versions,
+    invalidate_tags,
+    invalidate_tags_on_commit,
+)
+
+
+class LRUCacheTest(TestCase):
+    def test_least_recently_used_key_is_evicted(self):
+        lru = LRUCache(max_size=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), 3)
+        self.assertEqual(len(lru), 2)
+
+    def test_delete_removes_the_key(self):
+        lru = LRUCache(max_size=2)
+        lru.set("a", 1)
+
+        lru.delete("a")
+        lru.delete("missing")
+
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
+
+
+class SharedCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        return super().setUp()
+
+    def test_invalidate_tags_only_changes_the_given_tags(self):
+        before = get_tag_versions("a", "b")
+        self.assertEqual(get_tag_versions("a", "b"), before)
+
+        invalidate_tags("a")
+        after = get_tag_versions("a", "b")
+
+        self.assertNotEqual(after["a"], before["a"])
+        self.assertEqual(after["b"], before["b"])
+
+    def test_two_tier_cache_fills_the_local_tier_from_the_shared_cache(self):
+        tiered = TwoTierCache(max_size=10)
+        cache.set("key", "value")
+
+        self.assertEqual(tiered.get("key"), "value")
+        cache.delete("key")
+        self.assertEqual(tiered.get("key"), "value")
+
+        tiered.set("other", "value")
+        self.assertEqual(cache.get("other"), "value")
+
+
+class InvalidateTagsOnCommitTest(DjangoTestCase):
+    def setUp(self):
+        cache.clear()
+        return super().setUp()
+
+    def test_tags_are_invalidated_when_the_transaction_commits(self):
+        before = get_tag_versions("a")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_tags_on_commit("a")
+            self.assertEqual(get_tag_versions("a"), before)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_tag_versions("a"), before)
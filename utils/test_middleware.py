@@ -0,0 +1,160 @@
+import importlib
+import json
+import re
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.tests.test_recipe_base import RecipeMixin
+from utils.middleware import (
+    TIMING_PROBE,
+    VIEW,
+    add_timing_probes,
+    middleware_timings,
+)
+
+
+class SettingsSplitTest(TestCase):
+    def test_tests_run_with_the_production_settings(self):
+        self.assertFalse(settings.DEBUG)
+        self.assertNotIn("livereload", settings.INSTALLED_APPS)
+        self.assertNotIn("django_extensions", settings.INSTALLED_APPS)
+        self.assertNotIn(
+            "livereload.middleware.LiveReloadScript", settings.MIDDLEWARE
+        )
+
+    def test_development_settings_add_the_dev_tools(self):
+        dev = importlib.import_module("project.settings.dev")
+        base = importlib.import_module("project.settings.base")
+
+        self.assertTrue(dev.DEBUG)
+        self.assertIn("livereload", dev.INSTALLED_APPS)
+        self.assertIn("django_extensions", dev.INSTALLED_APPS)
+        self.assertEqual(
+            dev.MIDDLEWARE[-1], "livereload.middleware.LiveReloadScript"
+        )
+        self.assertNotIn("livereload", base.INSTALLED_APPS)
+        self.assertEqual(
+            dev.TEMPLATES[0]["OPTIONS"]["loaders"], base.TEMPLATE_LOADERS
+        )
+
+    def test_production_settings_cache_compiled_templates(self):
+        (loader, _), *_ = settings.TEMPLATES[0]["OPTIONS"]["loaders"]
+        self.assertEqual(loader, "django.template.loaders.cached.Loader")
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class MiddlewareTimingTest(TestCase):
+    def test_a_probe_is_added_around_each_middleware(self):
+        probed = add_timing_probes(["a.A", "b.B"])
+
+        self.assertEqual(
+            probed, [TIMING_PROBE, "a.A", TIMING_PROBE, "b.B", TIMING_PROBE]
+        )
+        self.assertEqual(add_timing_probes(probed), probed)
+
+    def test_each_middleware_and_the_view_are_timed(self):
+        middleware_timings.reset()
+
+        with self.settings(MIDDLEWARE=add_timing_probes(settings.MIDDLEWARE)):
+            self.client.get("/")
+            self.client.get("/")
+
+        summary = middleware_timings.summary()
+        # Middleware switched off by their setting are not in the stack
+        not_used = {
+            "utils.staticfiles.StaticFilesMiddleware": settings.STATIC_SERVE,
+            "utils.middleware.ServerTimingMiddleware": (
+                settings.SERVER_TIMING_ENABLED
+            ),
+        }
+        expected = [
+            path
+            for path in settings.MIDDLEWARE
+            if not_used.get(path, True)
+        ]
+        self.assertEqual(list(summary), [*expected, VIEW])
+        for timing in summary.values():
+            self.assertEqual(timing["requests"], 2)
+            self.assertGreaterEqual(timing["p50_ms"], 0)
+
+    def test_middleware_report_command(self):
+        stdout = StringIO()
+
+        call_command(
+            "middleware_report",
+            "--requests",
+            "3",
+            "--no-page-cache",
+            stdout=stdout,
+        )
+        output = stdout.getvalue()
+
+        self.assertIn("django.middleware.csrf.CsrfViewMiddleware", output)
+        self.assertIn(VIEW, output)
+        self.assertIn("ms per request in total", output)
+
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r"tpl;dur=(?P<tpl>[\d.]+), "
+    r'cache;desc="(?P<hits>\d+) hits (?P<misses>\d+) misses", '
+    r"total;dur=(?P<total>[\d.]+)$"
+)
+
+
+@override_settings(SERVER_TIMING_ENABLED=True)
+class ServerTimingTest(TestCase, RecipeMixin):
+    def setUp(self):
+        cache.clear()
+        self.recipe = self.make_recipe()
+
+    def get_timing(self, url):
+        with self.assertLogs("utils.middleware", "INFO") as logs:
+            response = self.client.get(url)
+
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        return match.groupdict(), json.loads(logs.records[-1].getMessage())
+
+    def test_header_is_not_sent_when_disabled(self):
+        with self.settings(SERVER_TIMING_ENABLED=False):
+            response = self.client.get(reverse("recipes:home"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_queries_and_template_time_are_reported(self):
+        timing, record = self.get_timing(self.recipe.get_absolute_url())
+
+        self.assertGreater(int(timing["queries"]), 0)
+        self.assertGreater(float(timing["tpl"]), 0)
+        self.assertGreaterEqual(float(timing["total"]), float(timing["tpl"]))
+        self.assertEqual(record["db_queries"], int(timing["queries"]))
+        self.assertEqual(record["path"], self.recipe.get_absolute_url())
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["exceeded"], [])
+
+    def test_cache_hits_and_misses_are_reported(self):
+        url = reverse("recipes:home")
+
+        first, _ = self.get_timing(url)
+        second, _ = self.get_timing(url)
+
+        self.assertGreater(int(first["misses"]), 0)
+        self.assertEqual(second["hits"], "1")
+        self.assertEqual(second["misses"], "0")
+        self.assertEqual(second["queries"], "0")
+
+    def test_requests_over_the_thresholds_are_warnings(self):
+        with (
+            self.settings(SERVER_TIMING_MAX_QUERIES=0, SERVER_TIMING_MAX_MS=0),
+            self.assertLogs("utils.middleware", "WARNING") as logs,
+        ):
+            self.client.get(reverse("recipes:home"))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["exceeded"], ["queries", "time"])
@@ -1,6 +1,23 @@
 from unittest import TestCase
+from unittest.mock import patch
 
-from utils.pagination import make_pagination_range
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.test import TestCase as DjangoTestCase
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.search.base import IdListResults
+from recipes.tests.test_recipe_base import RecipeMixin
+from recipes.views import RecipeListViewHome
+from utils.pagination import (
+    PAGINATION_CURSOR,
+    CachedCountProvider,
+    decode_cursor,
+    encode_cursor,
+    make_pagination,
+    make_pagination_range,
+)
 
 
 class PaginationTest(TestCase):
@@ -104,3 +121,174 @@ class PaginationTest(TestCase):
             current_page=21,
         )["pagination"]
         self.assertEqual([17, 18, 19, 20], pagination)
+
+
+class CursorPaginationTest(DjangoTestCase, RecipeMixin):
+    def setUp(self):
+        cache.clear()
+        self.recipes = self.make_recipe_in_batch(qtd=10)
+        self.factory = RequestFactory()
+        return super().setUp()
+
+    def paginate(self, query=""):
+        request = self.factory.get(f"/{query}")
+        return make_pagination(
+            request,
+            Recipe.objects.published(),
+            per_page=4,
+            mode=PAGINATION_CURSOR,
+        )
+
+    def test_other_orderings_are_rejected(self):
+        request = self.factory.get("/")
+        ids = [recipe.pk for recipe in self.recipes]
+
+        for queryset in (
+            Recipe.objects.published().order_by("title"),
+            IdListResults(Recipe.objects.published(), ids),
+        ):
+            with self.assertRaises(ValueError):
+                make_pagination(
+                    request, queryset, per_page=4, mode=PAGINATION_CURSOR
+                )
+
+    def test_cursor_is_opaque_and_round_trips(self):
+        token = encode_cursor(123)
+        self.assertNotIn("123", token)
+        self.assertEqual(decode_cursor(token), 123)
+
+    def test_invalid_cursor_is_ignored(self):
+        self.assertIsNone(decode_cursor("not a cursor"))
+        self.assertIsNone(decode_cursor(""))
+        self.assertIsNone(decode_cursor(None))
+
+    def test_first_page_has_next_but_no_previous(self):
+        page_obj, pagination_range = self.paginate()
+
+        self.assertEqual(
+            [recipe.pk for recipe in page_obj],
+            [recipe.pk for recipe in self.recipes[::-1][:4]],
+        )
+        self.assertTrue(page_obj.has_next())
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(pagination_range["is_cursor"])
+        self.assertIsNone(pagination_range["previous_cursor"])
+
+    def test_after_and_before_tokens_walk_the_pages(self):
+        page_1, range_1 = self.paginate()
+        page_2, range_2 = self.paginate(f"?after={range_1['next_cursor']}")
+        page_3, range_3 = self.paginate(f"?after={range_2['next_cursor']}")
+
+        self.assertEqual(len(page_2), 4)
+        self.assertEqual(len(page_3), 2)
+        self.assertFalse(page_3.has_next())
+        self.assertTrue(page_3.has_previous())
+
+        back_to_2, _ = self.paginate(f"?before={range_3['previous_cursor']}")
+        back_to_1, _ = self.paginate(f"?before={range_2['previous_cursor']}")
+
+        self.assertEqual(list(back_to_2), list(page_2))
+        self.assertEqual(list(back_to_1), list(page_1))
+        self.assertFalse(back_to_1.has_previous())
+
+    def test_cursor_pagination_does_not_count(self):
+        _, range_1 = self.paginate()
+
+        with self.assertNumQueries(1):
+            self.paginate(f"?after={range_1['next_cursor']}")
+
+    def test_view_can_switch_to_cursor_pagination(self):
+        with (
+            patch("recipes.views.PER_PAGE", new=4),
+            patch.object(
+                RecipeListViewHome, "pagination_mode", PAGINATION_CURSOR
+            ),
+        ):
+            response = self.client.get(reverse("recipes:home"))
+
+        content = response.content.decode("utf-8")
+        next_cursor = response.context["pagination_range"]["next_cursor"]
+
+        self.assertEqual(len(response.context["recipes"]), 4)
+        self.assertIn(f"?after={next_cursor}", content)
+
+
+class CachedCountProviderTest(DjangoTestCase, RecipeMixin):
+    def setUp(self):
+        cache.clear()
+        self.provider = CachedCountProvider(tags=("recipes",), timeout=60)
+        self.recipes = self.make_recipe_in_batch(qtd=3)
+        return super().setUp()
+
+    def test_second_count_is_served_from_cache(self):
+        queryset = Recipe.objects.published()
+
+        self.assertEqual(self.provider.count(queryset), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.provider.count(queryset), 3)
+
+        self.assertEqual(
+            self.provider.stats(), {"hits": 1, "misses": 1, "estimates": 0}
+        )
+
+    def test_counts_are_cached_per_filter_signature(self):
+        category = self.recipes[0].category
+
+        self.assertEqual(self.provider.count(Recipe.objects.published()), 3)
+        self.assertEqual(
+            self.provider.count(
+                Recipe.objects.published().filter(category=category)
+            ),
+            1,
+        )
+        self.assertEqual(self.provider.stats()["misses"], 2)
+
+    def test_recipe_save_and_delete_invalidate_the_count(self):
+        queryset = Recipe.objects.published()
+        self.assertEqual(self.provider.count(queryset), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].is_published = False
+            self.recipes[0].save()
+        self.assertEqual(self.provider.count(queryset), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[1].delete()
+        self.assertEqual(self.provider.count(queryset), 1)
+
+        self.assertEqual(self.provider.stats()["hits"], 0)
+
+    def test_estimates_are_only_used_on_postgresql(self):
+        with self.assertNumQueries(1):
+            self.provider.count(Recipe.objects.published(), estimate=True)
+
+        self.assertEqual(self.provider.stats()["estimates"], 0)
+
+    def test_planner_estimate_replaces_count_for_large_sets(self):
+        with patch.object(self.provider, "estimate", return_value=1_000_000):
+            count = self.provider.count(
+                Recipe.objects.published(), estimate=True
+            )
+
+        self.assertEqual(count, 1_000_000)
+        self.assertEqual(self.provider.stats()["estimates"], 1)
+
+    def test_paginator_uses_the_count_provider(self):
+        request = RequestFactory().get("/")
+        make_pagination(
+            request,
+            Recipe.objects.published().order_by("-id"),
+            per_page=2,
+            count_provider=self.provider,
+        )
+
+        with self.assertNumQueries(1):
+            page_obj, _ = make_pagination(
+                request,
+                Recipe.objects.published().order_by("-id"),
+                per_page=2,
+                count_provider=self.provider,
+            )
+            self.assertEqual(page_obj.paginator.num_pages, 2)
+            list(page_obj)
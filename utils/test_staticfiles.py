@@ -0,0 +1,173 @@
+import gzip
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from utils.staticfiles import brotli, get_bundle_urls, minify_css
+
+STORAGE = "utils.staticfiles.CompressedManifestStaticFilesStorage"
+LOCAL_ASSET = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+class MinifyCSSTest(unittest.TestCase):
+    def test_comments_and_whitespace_are_removed(self):
+        css = """
+            /* colors */
+            .a > .b ,
+            .c {
+                color : red;
+                margin: calc(1rem + 2px);
+            }
+        """
+        self.assertEqual(
+            minify_css(css),
+            ".a>.b,.c{color : red;margin: calc(1rem + 2px)}",
+        )
+
+    def test_descendant_pseudo_selectors_keep_their_space(self):
+        self.assertEqual(minify_css("a :hover { }"), "a :hover{}")
+
+
+class CollectedStaticFilesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        cls.static_root = Path(static_root.name)
+
+        override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATIC_SERVE=True,
+            PAGE_CACHE_ENABLED=False,
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": STORAGE},
+            },
+        )
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        super().setUpClass()
+
+        # The admin files would only make collectstatic slower
+        call_command(
+            "collectstatic",
+            interactive=False,
+            verbosity=0,
+            ignore_patterns=["admin"],
+        )
+
+    def get_static(self, url, accept_encoding="gzip, deflate, br"):
+        return self.client.get(
+            url, headers={"accept-encoding": accept_encoding}
+        )
+
+    def test_bundle_is_linked_once_with_a_hashed_name(self):
+        urls = get_bundle_urls("global/css/bundle.css")
+
+        self.assertEqual(len(urls), 1)
+        self.assertRegex(urls[0], r"^/static/global/css/bundle\.\w{12}\.css$")
+
+        content = self.client.get("/").content.decode()
+        self.assertIn(urls[0], content)
+        self.assertNotIn("styles.css", content)
+
+    def test_bundle_contains_every_source_minified(self):
+        name = staticfiles_storage.stored_name("global/css/bundle.css")
+        bundle = (self.static_root / name).read_text()
+
+        self.assertIn(".main-content-list{", bundle)
+        self.assertNotIn("\n", bundle)
+
+    def test_hashed_files_are_cached_for_a_year(self):
+        url = get_bundle_urls("global/css/bundle.css")[0]
+
+        response = self.get_static(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_unhashed_files_get_a_short_max_age(self):
+        response = self.get_static("/static/global/css/styles.css")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Cache-Control"],
+            f"public, max-age={settings.STATIC_MAX_AGE}",
+        )
+
+    def test_gzip_variant_is_sent_when_accepted(self):
+        url = get_bundle_urls("global/css/bundle.css")[0]
+
+        response = self.get_static(url, accept_encoding="gzip")
+        body = b"".join(response.streaming_content)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b".main-content-list{", gzip.decompress(body))
+
+    @pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+    def test_brotli_is_preferred_when_accepted(self):
+        url = get_bundle_urls("global/css/bundle.css")[0]
+
+        response = self.get_static(url)
+        body = b"".join(response.streaming_content)
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn(b".main-content-list{", brotli.decompress(body))
+
+    def test_identity_is_sent_without_accept_encoding(self):
+        url = get_bundle_urls("global/css/bundle.css")[0]
+
+        response = self.get_static(url, accept_encoding="")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_conditional_requests_get_a_304(self):
+        url = get_bundle_urls("global/css/bundle.css")[0]
+        last_modified = self.get_static(url)["Last-Modified"]
+
+        response = self.client.get(
+            url, headers={"if-modified-since": last_modified}
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_static_paths_fall_through(self):
+        response = self.get_static("/static/missing.css")
+        self.assertEqual(response.status_code, 404)
+
+    @pytest.mark.slow
+    def test_home_page_transferred_bytes(self):
+        # Before: every asset sent as it is from base_static, one request
+        # per stylesheet
+        before = sum(
+            (settings.BASE_DIR / "base_static" / name).stat().st_size
+            for name in (
+                *settings.STATIC_BUNDLES["global/css/bundle.css"],
+                "global/js/scripts.js",
+            )
+        )
+
+        html = self.client.get("/").content.decode()
+        urls = LOCAL_ASSET.findall(html)
+        after = sum(
+            len(b"".join(self.get_static(url).streaming_content))
+            for url in urls
+        )
+
+        self.assertLess(
+            after,
+            before,
+            f"home page static assets: {before} bytes in 3 requests before, "
+            f"{after} bytes in {len(urls)} requests after",
+        )
@@ -0,0 +1,47 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from utils.templates import get_project_template_names, warm_templates
+
+
+class WarmTemplatesTest(SimpleTestCase):
+    def test_project_templates_are_found(self):
+        names = get_project_template_names()
+
+        self.assertIn("global/base.html", names)
+        self.assertIn("recipes/partials/recipe.html", names)
+        self.assertIn("authors/pages/dashboard.html", names)
+        self.assertNotIn("admin/base.html", names)
+
+    def test_warm_templates_compiles_every_template_slowest_first(self):
+        timings = warm_templates()
+        seconds = [seconds for _, seconds in timings]
+
+        self.assertEqual(
+            sorted(name for name, _ in timings), get_project_template_names()
+        )
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+
+    def test_warm_templates_command_reports_compile_time(self):
+        stdout = StringIO()
+        call_command("warm_templates", "--top", "2", stdout=stdout)
+        output = stdout.getvalue()
+
+        self.assertEqual(output.count(" ms  "), 2)
+        self.assertIn(
+            f"{len(get_project_template_names())} templates compiled", output
+        )
+
+    def test_startup_hook_warms_templates_when_enabled(self):
+        from django.apps import apps
+
+        with (
+            self.settings(TEMPLATES_WARM_ON_STARTUP=True),
+            patch("utils.templates.log_template_warmup") as warmup,
+        ):
+            apps.get_app_config("recipes").ready()
+
+        warmup.assert_called_once()